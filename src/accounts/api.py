@@ -1,10 +1,12 @@
 from django.contrib import auth
+from django.db.models import F
 from django.shortcuts import aget_object_or_404
 from ninja import Router
 from ninja.errors import HttpError
 
 from megazord.api.auth import AuthBearer, BadCredentials, create_jwt
 from megazord.api.codes import ERROR_CODES
+from megazord.api.principals import principals
 from megazord.api.requests import APIRequest
 from megazord.schemas import ErrorSchema, StatusSchema
 from utils.notification import send_notification
@@ -15,6 +17,7 @@ from .schemas import (
     ActivationSchema,
     EmailSchema,
     LoginSchema,
+    PasswordResetSchema,
     RegisterResponseSchema,
     RegisterSchema,
     ResetPasswordSchema,
@@ -74,8 +77,9 @@ async def activate_account(
 
     user.is_active = True
     await user.asave()
+    await principals.invalidate(user.id)
 
-    token = create_jwt(user_id=user.id)
+    token = create_jwt(user_id=user.id, token_version=user.token_version)
 
     return 200, TokenSchema(token=token)
 
@@ -112,7 +116,7 @@ async def signin(request: APIRequest, schema: LoginSchema) -> tuple[int, TokenSc
     if account is None:
         raise BadCredentials()
 
-    token = create_jwt(user_id=account.id)
+    token = create_jwt(user_id=account.id, token_version=account.token_version)
     return 200, TokenSchema(token=token)
 
 
@@ -148,21 +152,27 @@ async def verify_reset_code(
     user = await Account.objects.aget(id=code.user_id)
     await code.adelete()
 
-    token = create_jwt(user_id=user.id)
+    token = create_jwt(user_id=user.id, token_version=user.token_version)
     return 200, TokenSchema(token=token)
 
 
 @router.post(
     path="/reset_password",
-    response={200: StatusSchema, 400: ErrorSchema},
+    response={200: PasswordResetSchema, 400: ErrorSchema},
     auth=AuthBearer(),
 )
 async def reset_password(
     request: APIRequest, reset_schema: ResetPasswordSchema
-) -> tuple[int, StatusSchema | ErrorSchema]:
+) -> tuple[int, PasswordResetSchema | ErrorSchema]:
     account = request.user
 
+    # tokens issued before the reset are revoked
     account.set_password(reset_schema.new_password)
-    await account.asave()
-
-    return 200, StatusSchema()
+    account.token_version = F("token_version") + 1
+    # the cached account may be older than the row
+    await account.asave(update_fields=["password", "token_version"])
+    await account.arefresh_from_db(fields=["token_version"])
+    await principals.invalidate(account.id)
+
+    token = create_jwt(user_id=account.id, token_version=account.token_version)
+    return 200, PasswordResetSchema(token=token)
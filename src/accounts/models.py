@@ -91,6 +91,8 @@ class Account(AbstractBaseUser):
     city = models.CharField(max_length=100, null=True, default=None)
     work_experience = models.IntegerField(null=True, default=None)
     telegram_id = models.IntegerField(null=True, default=None)
+    # tokens issued with an older version are not accepted
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     is_admin = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
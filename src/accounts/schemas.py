@@ -1,6 +1,8 @@
 from ninja import Field, Schema
 from pydantic import EmailStr
 
+from megazord.schemas import StatusSchema
+
 
 class RegisterResponseSchema(Schema):
     username: str
@@ -30,6 +32,10 @@ class TokenSchema(Schema):
     token: str
 
 
+class PasswordResetSchema(StatusSchema):
+    token: str
+
+
 class EmailSchema(Schema):
     email: EmailStr
 
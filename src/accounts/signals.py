@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Account
+from megazord.api.caching import bump_versions, get_version_key
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def account_changed(sender, instance, **kwargs):
+    # responses embedding the account are bumped by the apps serving them
+    bump_versions(get_version_key("account", instance.id))
@@ -1,8 +1,11 @@
+from asgiref.sync import async_to_sync
 from django.db import IntegrityError
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from ninja.testing import TestAsyncClient
 
-from megazord.api.auth import BadCredentials
+from megazord.api.auth import AuthBearer, BadCredentials, InvalidToken, create_jwt
+from megazord.api.principals import principals
+from profiles.api import router as profiles_router
 
 from .api import router
 from .models import Account
@@ -54,3 +57,82 @@ class TestAccountsAPI(TestCase):
 
         with self.assertRaises(BadCredentials):
             await self.api_client.post("/signin", json=login_data)
+
+
+class TestAuthBearer(TestCase):
+    def setUp(self) -> None:
+        principals.clear()
+        self.api_client = TestAsyncClient(router)
+        self.auth = AuthBearer()
+        self.user = Account.objects.create_user(
+            email="user@example.org",
+            username="user",
+            is_organizator=False,
+            password="test",
+        )
+        self.token = create_jwt(user_id=self.user.id)
+
+    def authenticate(self, token: str) -> Account:
+        request = RequestFactory().get("/")
+        async_to_sync(self.auth.authenticate)(request, token)
+        return request.user
+
+    def test_principal_is_cached(self) -> None:
+        self.assertEqual(self.authenticate(self.token), self.user)
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(self.token)
+
+        self.assertEqual(user, self.user)
+        # views get their own instance
+        self.assertIsNot(user, self.authenticate(self.token))
+
+    def test_profile_patch_invalidates_principal(self) -> None:
+        user = self.authenticate(self.token)
+
+        response = async_to_sync(TestAsyncClient(profiles_router).patch)(
+            "/profile", json={"username": "renamed"}, user=user
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.authenticate(self.token).username, "renamed")
+
+    def test_profile_patch_keeps_newer_changes(self) -> None:
+        user = self.authenticate(self.token)
+        Account.objects.filter(id=self.user.id).update(telegram_id=42, is_active=True)
+
+        response = async_to_sync(TestAsyncClient(profiles_router).patch)(
+            "/profile", json={"username": "renamed", "city": "Moscow"}, user=user
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.username, "renamed")
+        self.assertEqual(self.user.city, "Moscow")
+        self.assertEqual(self.user.telegram_id, 42)
+        self.assertTrue(self.user.is_active)
+
+    def test_reset_password_keeps_newer_changes(self) -> None:
+        user = self.authenticate(self.token)
+        Account.objects.filter(id=self.user.id).update(telegram_id=42)
+
+        response = async_to_sync(self.api_client.post)(
+            "/reset_password", json={"new_password": "new_password"}, user=user
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.telegram_id, 42)
+        self.assertTrue(self.user.check_password("new_password"))
+
+    def test_reset_password_revokes_tokens(self) -> None:
+        user = self.authenticate(self.token)
+
+        response = async_to_sync(self.api_client.post)(
+            "/reset_password", json={"new_password": "new_password"}, user=user
+        )
+
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaises(InvalidToken):
+            self.authenticate(self.token)
+        self.assertEqual(self.authenticate(response.json()["token"]), self.user)
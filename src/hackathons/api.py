@@ -1,36 +1,61 @@
+import asyncio
 import logging
 import random
 import uuid
-from typing import Annotated, List
+from itertools import chain
+from typing import Annotated
 
 from asgiref.sync import sync_to_async
-from django.db.models import Count, Q
-from django.http import HttpResponse
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import aget_object_or_404
 from ninja import File, Query, Router, UploadedFile
 
 from accounts.models import Email
 from hackathons.models import NotificationStatus
+from megazord.api.caching import cache_response, get_version_key, shared_scope
 from megazord.api.codes import ERROR_CODES
+from megazord.api.conditional import conditional, get_revisions
+from megazord.api.pagination import CursorPage, ListParams, paginate, render_page
 from megazord.api.requests import APIRequest
+from megazord.db import fetch_first
 from megazord.schemas import ErrorSchema, StatusSchema
+from megazord.settings import TEAM_FORMATION_TIME_BUDGET
+from profiles.schemas import ProfileSchema
 from resumes.models import Resume
 from resumes.schemas import ResumeSchema, TeamWithResumesSchema
 from teams.models import Team
 from teams.schemas import EmailSchema, TeamSchema
 from utils.notification import send_notification
 
-from .models import Hackathon, Role
+from .export import CONTENT_TYPES, ExportFormat, export_participants
+from .formation import TeamsFormationError, commit_teams, preview_teams
+from .images import save_cover
+from .models import Cover, Hackathon, HackathonStats, Role
 from .schemas import (
     AnalyticsSchema,
     EmailsSchema,
+    HackathonBriefSchema,
     HackathonCreateSchema,
     HackathonEditSchema,
     HackathonSchema,
     HackathonSummarySchema,
     NotificationStatusSchema,
+    ParticipantsImportSchema,
+    ProfilesPageSchema,
+    TeamsFormationCommitSchema,
+    TeamsFormationSchema,
 )
-from .services import get_emails_from_csv, make_csv
+from .services import (
+    CSVImportError,
+    change_hackathon_status,
+    get_emails_from_csv,
+    get_my_hackathons,
+    import_participants,
+    is_cover_cached,
+    make_cover_not_modified_response,
+    make_cover_response,
+)
+from .stats import get_stats, rebuild_stats
 
 logger = logging.getLogger(__name__)
 
@@ -63,22 +88,26 @@ async def create_hackathon(
         description=body.description,
         min_participants=body.min_participants,
         max_participants=body.max_participants,
-        image_cover=image_cover.read(),
     )
+    hackathon.set_cover(await save_cover(image_cover.read()))
     await hackathon.asave()
 
     for role in body.roles:
         await hackathon.roles.acreate(name=role)
 
-    participants = set(body.participants)
+    participants = [body.participants]
     if csv_emails is not None:
-        csv_participants = get_emails_from_csv(file=csv_emails)
-        participants |= set(csv_participants)
+        participants = chain(participants, get_emails_from_csv(file=csv_emails))
 
-    for participant in participants:
-        email_obj, created = await Email.objects.aget_or_create(email=participant)
+    try:
+        report = await sync_to_async(import_participants)(
+            hackathon=hackathon, batches=participants
+        )
+    except CSVImportError as e:
+        await hackathon.adelete()
+        return 400, ErrorSchema(detail=str(e))
 
-        await hackathon.emails.aadd(email_obj)
+    logger.info(f"Imported participants to hackathon `{hackathon.id}`: {report}")
 
     return 201, await hackathon.to_entity()
 
@@ -239,40 +268,66 @@ async def change_photo(
             detail="You are not creator and you can not edit this hackathon"
         )
 
-    hackathon.image_cover = image_cover.read()
+    hackathon.set_cover(await save_cover(image_cover.read()))
     await hackathon.asave()
 
     return 200, await hackathon.to_entity()
 
 
+@hackathon_router.get(
+    path="/covers/{cover_hash}",
+    response={200: str, ERROR_CODES: ErrorSchema},
+    auth=None,
+)
+async def get_cover(request: APIRequest, cover_hash: str):
+    if is_cover_cached(request, cover_hash=cover_hash):
+        return make_cover_not_modified_response(cover_hash=cover_hash)
+
+    cover = await aget_object_or_404(Cover, hash=cover_hash)
+
+    return make_cover_response(request, cover=cover)
+
+
 @hackathon_router.get(
     path="/{id}",
     response={200: HackathonSchema, ERROR_CODES: ErrorSchema},
 )
+@conditional(
+    lambda request, id: get_revisions(Hackathon.objects.filter(id=id), required=True),
+    schema=HackathonSchema,
+)
+@cache_response(
+    depends=lambda id: [
+        get_version_key("hackathon", id),
+    ],
+    schema=HackathonSchema,
+    scope=shared_scope,
+)
 async def get_specific_hackathon(
     request: APIRequest, id: uuid.UUID
 ) -> tuple[int, Hackathon]:
-    hackathon = await aget_object_or_404(
-        Hackathon.objects.select_related("creator"), id=id
-    )
-    return 200, await hackathon.to_entity()
+    hackathon = await Hackathon.fetch_entity(id)
+    if hackathon is None:
+        raise Http404
+
+    return 200, hackathon
 
 
 @my_hackathon_router.get(
-    path="/", response={200: list[HackathonSchema], ERROR_CODES: ErrorSchema}
+    path="/",
+    response={200: CursorPage[HackathonBriefSchema], ERROR_CODES: ErrorSchema},
 )
-async def list_my_hackathons(request: APIRequest):
-    user = request.user
-    hackathons_queryset = (
-        Hackathon.objects.filter(Q(creator=user) | Q(participants=user))
-        .select_related("creator")
-        .distinct()
+@conditional(lambda request, params: get_revisions(get_my_hackathons(request.user)))
+async def list_my_hackathons(request: APIRequest, params: Query[ListParams]):
+    hackathons_queryset = get_my_hackathons(request.user)
+
+    include = params.get_include(HackathonBriefSchema, expandable=[])
+    page, next_cursor = await paginate(
+        hackathons_queryset, params, ordering=("name", "id")
     )
-    hackathons = [
-        await hackathon.to_entity() async for hackathon in hackathons_queryset
-    ]
+    hackathons = await Hackathon.to_brief_entities(page)
 
-    return 200, hackathons
+    return render_page(HackathonBriefSchema, hackathons, include, next_cursor)
 
 
 @hackathon_router.get(
@@ -288,7 +343,7 @@ async def get_user_team_in_hackathon(request: APIRequest, id: uuid.UUID):
 
 @hackathon_router.post(
     path="/{hackathon_id}/upload_emails",
-    response={200: StatusSchema, ERROR_CODES: ErrorSchema},
+    response={200: ParticipantsImportSchema, ERROR_CODES: ErrorSchema},
 )
 async def upload_emails_to_hackathon(
     request: APIRequest, hackathon_id: uuid.UUID, csv_file: UploadedFile = File(...)
@@ -304,26 +359,25 @@ async def upload_emails_to_hackathon(
         )
 
     try:
-        emails = get_emails_from_csv(file=csv_file)
-        for email in emails:
-            email_obj, created = await Email.objects.aget_or_create(email=email)
-
-            await hackathon.emails.aadd(email_obj)
-
-        await hackathon.asave()
+        report = await sync_to_async(import_participants)(
+            hackathon=hackathon, batches=get_emails_from_csv(file=csv_file)
+        )
+    except CSVImportError as e:
+        return 400, ErrorSchema(detail=str(e))
 
-    except Exception as e:
-        logger.critical(f"Failed to process CSV file: {str(e)}")
-        return 400, ErrorSchema(detail="Failed to process CSV file")
-
-    return 200, StatusSchema()
+    return 200, report
 
 
 @hackathon_router.get(
     path="/{hackathon_id}/export",
     response={200: str, ERROR_CODES: ErrorSchema},
 )
-async def export_participants_hackathon(request: APIRequest, hackathon_id: uuid.UUID):
+async def export_participants_hackathon(
+    request: APIRequest,
+    hackathon_id: uuid.UUID,
+    file_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.CSV,
+    gzip: bool = False,
+):
     user = request.user
     hackathon = await aget_object_or_404(Hackathon.objects, id=hackathon_id)
 
@@ -332,12 +386,17 @@ async def export_participants_hackathon(request: APIRequest, hackathon_id: uuid.
             detail="You do not have permission to access this hackathon"
         )
 
-    csv_output = await make_csv(hackathon)
+    filename = f"hackathon_{hackathon_id}_participants.{file_format}"
+    content_type = CONTENT_TYPES[file_format]
+    if gzip:
+        filename += ".gz"
+        content_type = "application/gzip"
 
-    response = HttpResponse(csv_output, content_type="text/csv")
-    response["Content-Disposition"] = (
-        f'attachment; filename="hackathon_{hackathon_id}_participants.csv"'
+    response = StreamingHttpResponse(
+        export_participants(hackathon, file_format=file_format, gzip=gzip),
+        content_type=content_type,
     )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
 
 
@@ -354,12 +413,9 @@ async def start_hackathon(request: APIRequest, hackathon_id: uuid.UUID):
             detail="You are not the creator or cannot edit this hackathon"
         )
 
-    hackathon.status = Hackathon.Status.STARTED
-    await hackathon.asave()
-
-    await send_notification(
-        emails=hackathon.emails.all(),
-        context={"hackathon": hackathon},
+    await change_hackathon_status(
+        hackathon=hackathon,
+        status=Hackathon.Status.STARTED,
         mail_template="hackathons/mail/invitation_to_hackathon.html",
         telegram_template="hackathons/telegram/invitation_to_hackathon.html",
     )
@@ -380,12 +436,9 @@ async def end_hackathon(request: APIRequest, hackathon_id: uuid.UUID):
             detail="You are not the creator or cannot edit this hackathon"
         )
 
-    hackathon.status = Hackathon.Status.ENDED
-    await hackathon.asave()
-
-    await send_notification(
-        emails=hackathon.emails.all(),
-        context={"hackathon": hackathon},
+    await change_hackathon_status(
+        hackathon=hackathon,
+        status=Hackathon.Status.ENDED,
         mail_template="hackathons/mail/hackathon_ended.html",
         telegram_template="hackathons/telegram/hackathon_ended.html",
     )
@@ -404,15 +457,11 @@ async def analytics(
     if hackathon.creator_id != request.user.id:
         return 403, ErrorSchema(detail="You are not the creator")
 
-    hackathon_participants_count = await hackathon.participants.acount()
-    users_with_team_count = await Team.team_members.through.objects.filter(
-        team__hackathon=hackathon
-    ).acount()
-
-    if not hackathon_participants_count:
+    stats = await get_stats(hackathon)
+    if not stats.accepted:
         return 200, AnalyticsSchema(procent=100)
 
-    procent = (users_with_team_count / hackathon_participants_count) * 100
+    procent = (stats.people_in_teams / stats.accepted) * 100
 
     return 200, AnalyticsSchema(procent=procent)
 
@@ -422,54 +471,107 @@ async def analytics(
     response={200: HackathonSummarySchema, ERROR_CODES: ErrorSchema},
 )
 async def hackathon_summary(request: APIRequest, hackathon_id: uuid.UUID):
-    hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
+    hackathon, stats = await asyncio.gather(
+        fetch_first(Hackathon.objects.filter(id=hackathon_id)),
+        fetch_first(HackathonStats.objects.filter(hackathon=hackathon_id)),
+    )
+    if hackathon is None:
+        raise Http404
     if hackathon.creator_id != request.user.id:
         return 403, ErrorSchema(detail="You are not the creator")
 
-    total_teams = await Team.objects.filter(hackathon=hackathon).acount()
+    if stats is None:
+        stats = await sync_to_async(rebuild_stats)(hackathon)
+    percent_full_teams = (
+        (stats.full_teams / stats.total_teams) * 100 if stats.total_teams > 0 else 0
+    )
 
-    full_teams = await (
-        Team.objects.filter(hackathon=hackathon)
-        .annotate(num_members=Count("team_members"))
-        .filter(num_members=hackathon.max_participants)
-        .acount()
+    return HackathonSummarySchema(
+        total_teams=stats.total_teams,
+        full_teams=stats.full_teams,
+        percent_full_teams=percent_full_teams,
+        people_without_teams_count=stats.people_without_teams,
+        people_in_teams=stats.people_in_teams,
+        invited_people=stats.invited,
+        accepted_invite=stats.accepted,
     )
 
-    percent_full_teams = (full_teams / total_teams) * 100 if total_teams > 0 else 0
 
+@hackathon_router.get(
+    path="/{hackathon_id}/people_without_teams",
+    response={200: ProfilesPageSchema, ERROR_CODES: ErrorSchema},
+)
+async def get_people_without_teams(
+    request: APIRequest,
+    hackathon_id: uuid.UUID,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+):
+    hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
+    if hackathon.creator_id != request.user.id:
+        return 403, ErrorSchema(detail="You are not the creator")
+
+    stats = await get_stats(hackathon)
     people_without_teams = hackathon.participants.exclude(
         team_members__hackathon=hackathon
+    ).order_by("email")[offset : offset + limit]
+
+    return 200, ProfilesPageSchema(
+        count=stats.people_without_teams,
+        items=[await user.to_entity() async for user in people_without_teams],
     )
 
-    people_in_teams = await (
-        Team.objects.filter(hackathon=hackathon)
-        .values_list("team_members", flat=True)
-        .distinct()
-        .acount()
+
+@hackathon_router.get(
+    path="/{hackathon_id}/participants",
+    response={200: CursorPage[ProfileSchema], ERROR_CODES: ErrorSchema},
+)
+async def get_participants(
+    request: APIRequest, hackathon_id: uuid.UUID, params: Query[ListParams]
+):
+    hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
+    if (
+        hackathon.creator_id != request.user.id
+        and not await hackathon.participants.acontains(request.user)
+    ):
+        return 403, ErrorSchema(detail="You are not a participant")
+
+    include = params.get_include(ProfileSchema, expandable=[])
+    page, next_cursor = await paginate(
+        hackathon.participants.all(), params, ordering=("email",)
     )
+    participants = [await participant.to_entity() async for participant in page]
 
-    invited_people = await hackathon.emails.acount()
+    return render_page(ProfileSchema, participants, include, next_cursor)
 
-    accepted_invite = await hackathon.participants.acount()
 
-    return HackathonSummarySchema(
-        total_teams=total_teams,
-        full_teams=full_teams,
-        percent_full_teams=percent_full_teams,
-        people_without_teams=[
-            await user.to_entity() async for user in people_without_teams
-        ],
-        people_in_teams=people_in_teams,
-        invited_people=invited_people,
-        accepted_invite=accepted_invite,
+@hackathon_router.get(
+    path="/{hackathon_id}/emails",
+    response={200: CursorPage[EmailSchema], ERROR_CODES: ErrorSchema},
+)
+async def get_emails(
+    request: APIRequest, hackathon_id: uuid.UUID, params: Query[ListParams]
+):
+    hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
+    if hackathon.creator_id != request.user.id:
+        return 403, ErrorSchema(detail="You are not the creator")
+
+    include = params.get_include(EmailSchema, expandable=[])
+    page, next_cursor = await paginate(
+        hackathon.emails.all(), params, ordering=("email",)
     )
+    emails = [await email.to_entity() async for email in page]
+
+    return render_page(EmailSchema, emails, include, next_cursor)
 
 
 @hackathon_router.get(
     path="/{hackathon_id}/participants_without_team",
-    response={200: list[ResumeSchema], ERROR_CODES: ErrorSchema},
+    response={200: CursorPage[ResumeSchema], ERROR_CODES: ErrorSchema},
 )
-async def get_participants_without_team(request: APIRequest, hackathon_id: uuid.UUID):
+async def get_participants_without_team(
+    request: APIRequest, hackathon_id: uuid.UUID, params: Query[ListParams]
+):
     hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
     if hackathon.creator_id != request.user.id:
         return 403, ErrorSchema(detail="You are not the creator")
@@ -478,18 +580,25 @@ async def get_participants_without_team(request: APIRequest, hackathon_id: uuid.
         team_members__hackathon=hackathon
     )
 
-    resumes = Resume.objects.select_related("user").filter(
+    resumes = Resume.objects.filter(
         user__in=participants_without_team, hackathon_id=hackathon_id
     )
 
-    return 200, [await resume.to_entity() async for resume in resumes]
+    include = params.get_include(ResumeSchema, expandable=[])
+    page, next_cursor = await paginate(resumes, params, ordering=("user__email", "id"))
+
+    return render_page(
+        ResumeSchema, await Resume.to_entities(page), include, next_cursor
+    )
 
 
 @hackathon_router.get(
     path="/{hackathon_id}/pending_invitations",
-    response={200: list[NotificationStatusSchema], ERROR_CODES: ErrorSchema},
+    response={200: CursorPage[NotificationStatusSchema], ERROR_CODES: ErrorSchema},
 )
-async def pending_invitations(request: APIRequest, hackathon_id: uuid.UUID):
+async def pending_invitations(
+    request: APIRequest, hackathon_id: uuid.UUID, params: Query[ListParams]
+):
     hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
     if hackathon.creator_id != request.user.id:
         return 403, ErrorSchema(detail="You are not the creator")
@@ -497,12 +606,21 @@ async def pending_invitations(request: APIRequest, hackathon_id: uuid.UUID):
     pending_emails = hackathon.emails.exclude(
         email__in=hackathon.participants.values_list("email", flat=True)
     )
+    include = params.get_include(NotificationStatusSchema, expandable=[])
+    pending_emails, next_cursor = await paginate(
+        pending_emails, params, ordering=("email",)
+    )
+
+    notification_statuses = {
+        notification_status.email: notification_status
+        async for notification_status in NotificationStatus.objects.filter(
+            email__in=pending_emails.values("email")
+        )
+    }
 
     result = []
     async for pending_email in pending_emails:
-        notification_status = await NotificationStatus.objects.filter(
-            email=pending_email.email
-        ).afirst()
+        notification_status = notification_statuses.get(pending_email.email)
 
         if notification_status is not None:
             send_tg_status = notification_status.telegram_sent
@@ -519,7 +637,7 @@ async def pending_invitations(request: APIRequest, hackathon_id: uuid.UUID):
             )
         )
 
-    return 200, result
+    return render_page(NotificationStatusSchema, result, include, next_cursor)
 
 
 @hackathon_router.post(
@@ -595,38 +713,87 @@ async def create_teams_by_emails(
     )
 
 
+@hackathon_router.post(
+    path="/{hackathon_id}/form_teams/preview",
+    response={200: TeamsFormationSchema, ERROR_CODES: ErrorSchema},
+)
+async def preview_teams_formation(
+    request: APIRequest,
+    hackathon_id: uuid.UUID,
+    time_budget: Annotated[float, Query(gt=0, le=30)] = TEAM_FORMATION_TIME_BUDGET,
+):
+    hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
+    if hackathon.creator_id != request.user.id:
+        return 403, ErrorSchema(detail="You are not the creator")
+
+    return 200, await preview_teams(hackathon, time_budget=time_budget)
+
+
+@hackathon_router.post(
+    path="/{hackathon_id}/form_teams",
+    response={201: StatusSchema, 400: ErrorSchema, ERROR_CODES: ErrorSchema},
+)
+async def commit_teams_formation(
+    request: APIRequest,
+    hackathon_id: uuid.UUID,
+    formation_schema: TeamsFormationCommitSchema,
+):
+    hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
+    if hackathon.creator_id != request.user.id:
+        return 403, ErrorSchema(detail="You are not the creator")
+
+    try:
+        teams = await sync_to_async(commit_teams)(
+            hackathon,
+            teams=[(team.name, team.members) for team in formation_schema.teams],
+        )
+    except TeamsFormationError as exc:
+        return 400, ErrorSchema(detail=str(exc))
+
+    return 201, StatusSchema(detail=f"{len(teams)} teams created")
+
+
 @hackathon_router.get(
     path="/{hackathon_id}/hand_created_teams",
-    response={200: List[TeamWithResumesSchema], ERROR_CODES: ErrorSchema},
+    response={200: CursorPage[TeamWithResumesSchema], ERROR_CODES: ErrorSchema},
 )
-async def get_hand_created_teams(request: APIRequest, hackathon_id: uuid.UUID):
+async def get_hand_created_teams(
+    request: APIRequest, hackathon_id: uuid.UUID, params: Query[ListParams]
+):
     hackathon = await aget_object_or_404(Hackathon, id=hackathon_id)
 
-    hand_created_teams = Team.objects.filter(hackathon=hackathon, is_hand_create=True)
-
-    team_entities = []
-    async for team in hand_created_teams:
-        team_entity = await team.to_entity()
-
-        resume_entities = []
-        async for member in team.team_members.all():
-            resume = (
-                await Resume.objects.select_related("user")
-                .filter(user=member, hackathon=hackathon)
-                .afirst()
-            )
+    expandable = ["resumes"]
+    include = params.get_include(TeamWithResumesSchema, expandable)
+    expand = params.get_expand(expandable)
+    hand_created_teams, next_cursor = await paginate(
+        Team.objects.filter(hackathon=hackathon, is_hand_create=True),
+        params,
+        ordering=("name", "id"),
+    )
 
-            if resume:
-                resume_entity = await resume.to_entity()
-                resume_entities.append(resume_entity)
+    resumes_by_user = {}
+    if "resumes" in expand:
+        resumes = await Resume.to_entities(
+            Resume.objects.filter(
+                hackathon=hackathon, user__team_members__in=hand_created_teams
+            ).distinct()
+        )
+        resumes_by_user = {resume.user.id: resume for resume in resumes}
 
+    team_entities = []
+    teams_expand = ["team_members"] if "resumes" in expand else []
+    for team_entity in await Team.to_entities(hand_created_teams, teams_expand):
         team_with_resumes = TeamWithResumesSchema(
             id=team_entity.id,
             hackathon_id=team_entity.hackathon_id,
             name=team_entity.name,
             creator_id=team_entity.creator_id,
-            resumes=resume_entities,
+            resumes=[
+                resumes_by_user[member.id]
+                for member in team_entity.team_members
+                if member.id in resumes_by_user
+            ],
         )
         team_entities.append(team_with_resumes)
 
-    return 200, team_entities
+    return render_page(TeamWithResumesSchema, team_entities, include, next_cursor)
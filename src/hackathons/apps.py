@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class HackathonsConfig(AppConfig):
     name = "hackathons"
+
+    def ready(self) -> None:
+        from hackathons import signals  # noqa: F401
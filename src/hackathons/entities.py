@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import StrEnum
 
 from accounts.entities import AccountEntity, EmailEntity
@@ -10,16 +10,61 @@ class HackathonStatus(StrEnum):
     ENDED = "ENDED"
 
 
+class CoverVariant(StrEnum):
+    THUMBNAIL = "thumbnail"
+    CARD = "card"
+    FULL = "full"
+
+
 @dataclass
 class HackathonEntity:
     id: str
     creator: AccountEntity
     name: str
     status: HackathonStatus
-    image_cover: bytes
+    image_cover: dict[CoverVariant, str]
     description: str
     min_participants: int
     max_participants: int
     participants: list[AccountEntity]
     emails: list[EmailEntity]
     roles: list[str]
+
+
+@dataclass
+class HackathonBriefEntity:
+    """
+    Hackathon for lists, participants and emails are only counted.
+    """
+
+    id: str
+    creator: AccountEntity
+    name: str
+    status: HackathonStatus
+    image_cover: dict[CoverVariant, str]
+    description: str
+    min_participants: int
+    max_participants: int
+    participants_count: int
+    emails_count: int
+    roles: list[str]
+
+
+@dataclass
+class ParticipantsImportEntity:
+    added: int = 0
+    duplicates: int = 0
+    invalid: list[str] = field(default_factory=list)
+
+
+@dataclass
+class FormedTeamEntity:
+    name: str
+    members: list[AccountEntity]
+    roles: list[str]
+
+
+@dataclass
+class TeamsFormationEntity:
+    teams: list[FormedTeamEntity]
+    unassigned: list[AccountEntity]
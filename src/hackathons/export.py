@@ -0,0 +1,236 @@
+import csv
+import json
+import re
+import zlib
+from enum import StrEnum
+from io import StringIO
+from typing import AsyncIterator, Sequence
+from xml.sax.saxutils import escape
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from django.db.models import OuterRef, QuerySet, Subquery, Value
+
+from hackathons.models import Hackathon, UserRole
+from resumes.models import Resume
+from teams.models import Team
+
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_COLUMNS = ("team", "email", "full_name", "github", "role")
+EXPORT_HEADER = ("Team", "Email", "Full Name", "GitHub", "Role")
+
+type Row = Sequence[str]
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    JSONL = "jsonl"
+    XLSX = "xlsx"
+
+
+CONTENT_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.JSONL: "application/jsonl",
+    ExportFormat.XLSX: (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    ),
+}
+
+
+def annotate_resume(queryset: QuerySet, hackathon: Hackathon, user: str) -> QuerySet:
+    return queryset.annotate(
+        resume_github=Subquery(
+            Resume.objects.filter(user_id=OuterRef(user), hackathon=hackathon).values(
+                "github"
+            )[:1]
+        ),
+        role_name=Subquery(
+            UserRole.objects.filter(user_id=OuterRef(user), hackathon=hackathon).values(
+                "role__name"
+            )[:1]
+        ),
+    )
+
+
+async def iter_participant_rows(hackathon: Hackathon) -> AsyncIterator[Row]:
+    team_members = Team.team_members.through.objects.filter(team__hackathon=hackathon)
+    members = annotate_resume(team_members, hackathon, user="account_id")
+    participants_without_team = annotate_resume(
+        hackathon.participants.exclude(id__in=team_members.values("account_id")),
+        hackathon,
+        user="id",
+    ).annotate(team_name=Value("No Team"))
+
+    rows = [
+        members.order_by("team__name", "team_id", "account__email").values_list(
+            "team__name",
+            "account__email",
+            "account__username",
+            "resume_github",
+            "role_name",
+        ),
+        participants_without_team.order_by("email").values_list(
+            "team_name", "email", "username", "resume_github", "role_name"
+        ),
+    ]
+    for queryset in rows:
+        async for team, email, username, github, role in queryset:
+            yield team, email, username, github or "N/A", role or "N/A"
+
+
+async def encode_csv(rows: AsyncIterator[Row]) -> AsyncIterator[bytes]:
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_HEADER)
+
+    async for row in rows:
+        writer.writerow(row)
+        if output.tell() >= CHUNK_SIZE:
+            yield output.getvalue().encode()
+            output.seek(0)
+            output.truncate()
+
+    yield output.getvalue().encode()
+
+
+async def encode_jsonl(rows: AsyncIterator[Row]) -> AsyncIterator[bytes]:
+    lines = []
+    size = 0
+    async for row in rows:
+        line = json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(lines).encode()
+            lines.clear()
+            size = 0
+
+    yield "".join(lines).encode()
+
+
+class ChunksBuffer:
+    """
+    Write-only file that hands out what has been written so far,
+    `ZipFile` treats it as an unseekable stream.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        return data
+
+
+XLSX_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+XLSX_RELATIONSHIPS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XLSX_DOCUMENT_RELATIONSHIPS = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+)
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{XLSX_RELATIONSHIPS}">'
+        f'<Relationship Id="rId1" Type="{XLSX_DOCUMENT_RELATIONSHIPS}/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<workbook xmlns="{XLSX_NAMESPACE}" xmlns:r="{XLSX_DOCUMENT_RELATIONSHIPS}">'
+        '<sheets><sheet name="Participants" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{XLSX_RELATIONSHIPS}">'
+        f'<Relationship Id="rId1" Type="{XLSX_DOCUMENT_RELATIONSHIPS}/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+# characters which are not allowed in XML 1.0
+XML_ILLEGAL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def make_xlsx_row(row: Row) -> bytes:
+    cells = "".join(
+        f'<c t="inlineStr"><is><t xml:space="preserve">'
+        f"{escape(XML_ILLEGAL_RE.sub('', value))}</t></is></c>"
+        for value in row
+    )
+    return f"<row>{cells}</row>".encode()
+
+
+async def encode_xlsx(rows: AsyncIterator[Row]) -> AsyncIterator[bytes]:
+    output = ChunksBuffer()
+    with ZipFile(output, "w", compression=ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<worksheet xmlns="{XLSX_NAMESPACE}"><sheetData>'.encode()
+            )
+            sheet.write(make_xlsx_row(EXPORT_HEADER))
+            async for row in rows:
+                sheet.write(make_xlsx_row(row))
+                if output.size >= CHUNK_SIZE:
+                    yield output.pop()
+
+            sheet.write(b"</sheetData></worksheet>")
+
+    yield output.pop()
+
+
+ENCODERS = {
+    ExportFormat.CSV: encode_csv,
+    ExportFormat.JSONL: encode_jsonl,
+    ExportFormat.XLSX: encode_xlsx,
+}
+
+
+async def compress_gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+
+    yield compressor.flush()
+
+
+def export_participants(
+    hackathon: Hackathon, file_format: ExportFormat, gzip: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Stream participants of the hackathon encoded in the given format.
+    """
+    chunks = ENCODERS[file_format](iter_participant_rows(hackathon))
+    if gzip:
+        chunks = compress_gzip(chunks)
+
+    return chunks
@@ -0,0 +1,155 @@
+import asyncio
+import multiprocessing
+import random
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+
+from hackathons.entities import FormedTeamEntity, TeamsFormationEntity
+from hackathons.models import Hackathon, UserRole
+from hackathons.solver import Candidate, solve_teams
+from hackathons.stats import TEAMS_COUNTERS, refresh_stats
+from megazord.settings import TEAM_FORMATION_WORKERS
+from resumes.models import ResumeTerm
+from teams.models import Team
+from utils.notification import enqueue_notification
+
+# the solver is CPU-bound, so it runs in processes to keep the event loop
+# and the other requests free, spawned workers do not inherit the database
+# connections and threads of the server
+executor = ProcessPoolExecutor(
+    max_workers=TEAM_FORMATION_WORKERS,
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+
+class TeamsFormationError(Exception):
+    pass
+
+
+def get_team_name() -> str:
+    return "Team" + "".join(str(random.randint(0, 9)) for _ in range(6))
+
+
+async def preview_teams(
+    hackathon: Hackathon, time_budget: float
+) -> TeamsFormationEntity:
+    """
+    Split participants without a team into teams, nothing is saved.
+    """
+    participants = {
+        str(participant.id): participant
+        async for participant in hackathon.participants.exclude(
+            team_members__hackathon=hackathon
+        ).order_by("email")
+    }
+    roles = {
+        str(user_id): role
+        async for user_id, role in UserRole.objects.filter(
+            hackathon=hackathon
+        ).values_list("user_id", "role__name")
+    }
+    skills = defaultdict(set)
+    async for user_id, term in ResumeTerm.objects.filter(
+        resume__hackathon=hackathon
+    ).values_list("resume__user_id", "term"):
+        skills[str(user_id)].add(term)
+
+    candidates = [
+        Candidate(id=id, role=roles.get(id), skills=frozenset(skills[id]))
+        for id in participants
+    ]
+    loop = asyncio.get_running_loop()
+    assignment = await loop.run_in_executor(
+        executor,
+        solve_teams,
+        candidates,
+        hackathon.min_participants or 1,
+        hackathon.max_participants or len(candidates) or 1,
+        time_budget,
+    )
+
+    return TeamsFormationEntity(
+        teams=[
+            FormedTeamEntity(
+                name=get_team_name(),
+                members=[
+                    await participants[candidate.id].to_entity() for candidate in team
+                ],
+                roles=sorted(
+                    {candidate.role for candidate in team if candidate.role is not None}
+                ),
+            )
+            for team in assignment.teams
+        ],
+        unassigned=[
+            await participants[candidate.id].to_entity()
+            for candidate in assignment.unassigned
+        ],
+    )
+
+
+@transaction.atomic
+def commit_teams(
+    hackathon: Hackathon, teams: list[tuple[str, list[uuid.UUID]]]
+) -> list[Team]:
+    """
+    Save previewed teams at once, members are checked again
+    since they may have joined other teams after the preview.
+    """
+    # concurrent commits for the same hackathon wait for each other
+    hackathon = Hackathon.objects.select_for_update().get(id=hackathon.id)
+    min_size = hackathon.min_participants or 1
+    max_size = hackathon.max_participants
+
+    members = [member for _, team_members in teams for member in team_members]
+    if len(set(members)) != len(members):
+        raise TeamsFormationError("Participant can be a member of only one team")
+
+    for name, team_members in teams:
+        if len(team_members) < min_size or (
+            max_size is not None and len(team_members) > max_size
+        ):
+            raise TeamsFormationError(
+                f"Team `{name}` must have from {min_size} to {max_size} members"
+            )
+
+    accounts = {
+        account.id: account
+        for account in hackathon.participants.exclude(
+            team_members__hackathon=hackathon
+        ).filter(id__in=members)
+    }
+    if missing := [str(member) for member in members if member not in accounts]:
+        raise TeamsFormationError(
+            f"Participants are not available for new teams: {', '.join(missing)}"
+        )
+
+    created = Team.objects.bulk_create(
+        Team(
+            hackathon=hackathon,
+            name=name,
+            creator=accounts[team_members[0]],
+            is_hand_create=True,
+        )
+        for name, team_members in teams
+    )
+    Team.team_members.through.objects.bulk_create(
+        Team.team_members.through(team_id=team.id, account_id=member)
+        for team, (_, team_members) in zip(created, teams)
+        for member in team_members
+    )
+    # bulk inserts do not send signals
+    refresh_stats(hackathon.id, TEAMS_COUNTERS)
+
+    for team, (_, team_members) in zip(created, teams):
+        enqueue_notification(
+            users=[accounts[member] for member in team_members],
+            context={"hackathon": hackathon, "team_name": team.name},
+            mail_template="hackathons/mail/added_to_team.html",
+            telegram_template="hackathons/telegram/added_to_team.html",
+        )
+
+    return created
@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from hackathons.entities import CoverVariant
+from hackathons.models import Cover
+from megazord.settings import COVER_MAX_UPLOAD_SIZE, COVER_PROCESSING_WORKERS
+
+COVER_SIZES = {
+    CoverVariant.THUMBNAIL: (320, 180),
+    CoverVariant.CARD: (800, 450),
+    CoverVariant.FULL: (1920, 1080),
+}
+ALLOWED_FORMATS = frozenset({"JPEG", "PNG", "WEBP", "GIF"})
+MAX_PIXELS = 40_000_000
+
+# Pillow releases the GIL while decoding, resizing and encoding,
+# so threads are enough to keep the event loop free
+executor = ThreadPoolExecutor(
+    max_workers=COVER_PROCESSING_WORKERS, thread_name_prefix="covers"
+)
+
+
+@dataclass
+class ProcessedImage:
+    data: bytes
+    content_type: str
+
+
+def open_image(data: bytes) -> Image.Image:
+    if len(data) > COVER_MAX_UPLOAD_SIZE:
+        raise ValueError(f"Cover is larger than {COVER_MAX_UPLOAD_SIZE} bytes")
+
+    try:
+        with Image.open(BytesIO(data)) as image:
+            # the header is enough to refuse an image before it is decoded
+            if image.format not in ALLOWED_FORMATS:
+                raise ValueError(f"Cover format `{image.format}` is not supported")
+
+            if image.width * image.height > MAX_PIXELS:
+                raise ValueError("Cover resolution is too large")
+
+            image.verify()
+
+        image = Image.open(BytesIO(data))
+    except Image.DecompressionBombError:
+        # Pillow refuses headers claiming far more pixels than MAX_PIXELS
+        raise ValueError("Cover resolution is too large")
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise ValueError("Cover is not a valid image")
+
+    return image
+
+
+def encode_image(image: Image.Image) -> ProcessedImage:
+    output = BytesIO()
+    if features.check("webp"):
+        image.save(output, format="WEBP", quality=80, method=4)
+        return ProcessedImage(data=output.getvalue(), content_type="image/webp")
+
+    image.convert("RGB").save(output, format="JPEG", quality=85, optimize=True)
+    return ProcessedImage(data=output.getvalue(), content_type="image/jpeg")
+
+
+def process_cover(data: bytes) -> dict[CoverVariant, ProcessedImage]:
+    image = open_image(data)
+    # apply EXIF orientation before metadata is stripped
+    image = ImageOps.exif_transpose(image)
+    image.info = {}
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    variants = {}
+    for variant, size in COVER_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.Resampling.LANCZOS)
+        variants[variant] = encode_image(resized)
+
+    return variants
+
+
+async def save_cover(data: bytes) -> dict[CoverVariant, Cover]:
+    loop = asyncio.get_running_loop()
+    variants = await loop.run_in_executor(executor, process_cover, data)
+
+    return {
+        variant: await Cover.from_bytes(
+            data=image.data, content_type=image.content_type
+        )
+        for variant, image in variants.items()
+    }
@@ -0,0 +1,123 @@
+import asyncio
+import statistics
+import time
+from argparse import ArgumentParser
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+async def call(application: ASGIHandler, path: str) -> int:
+    """
+    Send a GET request through the whole ASGI stack, unlike the test
+    clients it closes database connections as a server does.
+    """
+    path, _, query_string = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    body_sent = False
+    disconnected = asyncio.Event()
+    status = 0
+
+    async def receive() -> dict:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return status
+
+
+class Command(BaseCommand):
+    help = "Measure database connections opened by concurrent API requests"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("--requests", type=int, default=1_000)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument(
+            "--path",
+            default="/api/hackathons/covers/missing",
+            help="Path of a GET operation which queries the database",
+        )
+
+    def handle(
+        self, requests: int, concurrency: int, path: str, *args, **kwargs
+    ) -> None:
+        backends = set()
+
+        def connection_opened(sender, connection, **kwargs) -> None:
+            # taking a connection out of the pool is reported as well,
+            # distinct server processes are the connections really opened
+            backends.add(connection.connection.info.backend_pid)
+
+        connection_created.connect(connection_opened)
+        try:
+            started = time.perf_counter()
+            timings, statuses = asyncio.run(
+                self.run_requests(path, requests, concurrency)
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(connection_opened)
+
+        database = connections["default"]
+        if database.pool is not None:
+            mode = f"pool of {database.pool.max_size}"
+        else:
+            mode = f"CONN_MAX_AGE={database.settings_dict['CONN_MAX_AGE']}"
+
+        timings.sort()
+        self.stdout.write(
+            f"{requests} requests by {concurrency} clients ({mode}): "
+            f"{len(backends)} connections opened, "
+            f"{requests / elapsed:.0f} requests/s, "
+            f"p50={statistics.median(timings):.2f}ms, "
+            f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms, "
+            f"statuses {dict(statuses)}"
+        )
+
+    async def run_requests(
+        self, path: str, requests: int, concurrency: int
+    ) -> tuple[list[float], dict[int, int]]:
+        application = ASGIHandler()
+        timings = []
+        statuses = {}
+
+        async def client(count: int) -> None:
+            for _ in range(count):
+                started = time.perf_counter()
+                status = await call(application, path)
+                timings.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        await asyncio.gather(
+            *(
+                client(requests // concurrency + (i < requests % concurrency))
+                for i in range(concurrency)
+            )
+        )
+        return timings, statuses
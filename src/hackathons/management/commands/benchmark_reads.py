@@ -0,0 +1,167 @@
+import asyncio
+import statistics
+import time
+import uuid
+from argparse import ArgumentParser
+from typing import Any, Awaitable, Callable
+
+from django.core.management import BaseCommand, CommandError
+
+from accounts.models import Account, Email
+from hackathons.models import Hackathon, HackathonStats
+from hackathons.stats import get_stats
+from megazord import db
+from megazord.db import close_pools, fetch_first
+from teams.models import Team
+
+type Read = Callable[[], Awaitable[Any]]
+
+
+class Command(BaseCommand):
+    help = "Compare hot reads of the async ORM with native async reads"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("--requests", type=int, default=1_000)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--participants", type=int, default=50)
+        parser.add_argument("--team-size", type=int, default=5)
+
+    def handle(
+        self,
+        requests: int,
+        concurrency: int,
+        participants: int,
+        team_size: int,
+        *args,
+        **kwargs,
+    ) -> None:
+        if not db.DATABASE_ASYNC_READS:
+            raise CommandError("Native async reads are disabled")
+
+        # the rows are committed, native reads do not see other transactions
+        tag = uuid.uuid4().hex[:8]
+        creator = Account.objects.create_user(
+            email=f"benchmark_{tag}@example.org",
+            username=f"benchmark_{tag}",
+            is_organizator=True,
+        )
+        hackathon = Hackathon.objects.create(
+            creator=creator, name=f"benchmark_{tag}", description="benchmark"
+        )
+        accounts = [creator]
+        try:
+            for i in range(participants):
+                account = Account.objects.create_user(
+                    email=f"benchmark_{tag}_{i}@example.org",
+                    username=f"benchmark_{tag}_{i}",
+                    is_organizator=False,
+                )
+                accounts.append(account)
+                hackathon.emails.add(Email.objects.create(email=account.email))
+                hackathon.participants.add(account)
+
+            for i in range(0, participants, team_size):
+                members = accounts[1 + i : 1 + i + team_size]
+                team = Team.objects.create(
+                    hackathon=hackathon, name=f"team_{i}", creator=members[0]
+                )
+                team.team_members.add(*members)
+
+            results = asyncio.run(
+                self.run_reads(
+                    self.get_reads(hackathon, creator), requests, concurrency
+                )
+            )
+        finally:
+            hackathon.delete()
+            Email.objects.filter(email__startswith=f"benchmark_{tag}").delete()
+            Account.objects.filter(id__in=[account.id for account in accounts]).delete()
+
+        for name, timings in results.items():
+            line = [f"{name}:"]
+            for mode, (elapsed, mode_timings) in timings.items():
+                mode_timings.sort()
+                line.append(
+                    f"{mode} {requests / elapsed:.0f} requests/s, "
+                    f"p50={statistics.median(mode_timings):.2f}ms, "
+                    f"p95={mode_timings[int(len(mode_timings) * 0.95) - 1]:.2f}ms;"
+                )
+            self.stdout.write(" ".join(line))
+
+    def get_reads(
+        self, hackathon: Hackathon, creator: Account
+    ) -> dict[str, dict[str, Read]]:
+        """
+        Reads of the operations as made by the ORM before and natively now.
+        """
+        accounts = Account.objects.filter(id=creator.id)
+        teams = Team.objects.filter(hackathon=hackathon).order_by("name", "id")[:20]
+
+        async def orm_hackathon() -> Any:
+            instance = await Hackathon.objects.select_related("creator").aget(
+                id=hackathon.id
+            )
+            return await instance.to_entity()
+
+        async def orm_summary() -> Any:
+            instance = await Hackathon.objects.aget(id=hackathon.id)
+            return await get_stats(instance)
+
+        async def native_summary() -> Any:
+            return await asyncio.gather(
+                fetch_first(Hackathon.objects.filter(id=hackathon.id)),
+                fetch_first(HackathonStats.objects.filter(hackathon=hackathon.id)),
+            )
+
+        return {
+            "auth lookup": {
+                "orm": accounts.afirst,
+                "native": lambda: fetch_first(accounts),
+            },
+            "hackathon detail": {
+                "orm": orm_hackathon,
+                "native": lambda: Hackathon.fetch_entity(hackathon.id),
+            },
+            "team list": {
+                "orm": lambda: Team.to_entities(teams),
+                "native": lambda: Team.fetch_entities(teams),
+            },
+            "summary": {"orm": orm_summary, "native": native_summary},
+        }
+
+    async def run_reads(
+        self, reads: dict[str, dict[str, Read]], requests: int, concurrency: int
+    ) -> dict[str, dict[str, tuple[float, list[float]]]]:
+        results = {}
+        try:
+            for name, modes in reads.items():
+                results[name] = {}
+                for mode, read in modes.items():
+                    # warm up connections of both paths before measuring
+                    await asyncio.gather(*(read() for _ in range(concurrency)))
+                    started = time.perf_counter()
+                    timings = await self.run_read(read, requests, concurrency)
+                    results[name][mode] = (time.perf_counter() - started, timings)
+        finally:
+            await close_pools()
+
+        return results
+
+    async def run_read(
+        self, read: Read, requests: int, concurrency: int
+    ) -> list[float]:
+        timings = []
+
+        async def client(count: int) -> None:
+            for _ in range(count):
+                started = time.perf_counter()
+                await read()
+                timings.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(
+            *(
+                client(requests // concurrency + (i < requests % concurrency))
+                for i in range(concurrency)
+            )
+        )
+        return timings
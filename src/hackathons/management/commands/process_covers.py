@@ -0,0 +1,35 @@
+from asgiref.sync import async_to_sync
+from django.core.management import BaseCommand
+
+from hackathons.images import save_cover
+from hackathons.models import Hackathon
+
+
+class Command(BaseCommand):
+    help = "Generate cover variants for hackathons uploaded before the image pipeline"
+
+    def handle(self, *args, **kwargs) -> None:
+        hackathons = Hackathon.objects.filter(
+            image_cover__isnull=False, image_cover_thumbnail__isnull=True
+        ).select_related("image_cover")
+
+        for hackathon in hackathons.iterator():
+            try:
+                covers = async_to_sync(save_cover)(bytes(hackathon.image_cover.data))
+            except ValueError as exc:
+                self.stderr.write(
+                    self.style.ERROR(f"Skip hackathon `{hackathon.id}`: {exc}")
+                )
+                continue
+
+            hackathon.set_cover(covers)
+            hackathon.save(
+                update_fields=[
+                    "image_cover",
+                    "image_cover_card",
+                    "image_cover_thumbnail",
+                ]
+            )
+            self.stdout.write(f"Processed cover of hackathon `{hackathon.id}`")
+
+        self.stdout.write(self.style.SUCCESS("Successfully processed covers"))
@@ -0,0 +1,27 @@
+from argparse import ArgumentParser
+
+from django.core.management import BaseCommand
+
+from hackathons.models import Hackathon
+from hackathons.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Recount hackathon statistics to repair drifted counters"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            "hackathons", nargs="*", help="Hackathon ids, all hackathons by default"
+        )
+
+    def handle(self, hackathons: list[str], *args, **kwargs) -> None:
+        queryset = Hackathon.objects.all()
+        if hackathons:
+            queryset = queryset.filter(id__in=hackathons)
+
+        rebuilt = 0
+        for hackathon in queryset.iterator():
+            rebuild_stats(hackathon)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats of {rebuilt} hackathons"))
@@ -0,0 +1,82 @@
+import hashlib
+from io import BytesIO
+
+import django.db.models.deletion
+from django.db import migrations, models
+from PIL import Image, UnidentifiedImageError
+
+
+def guess_content_type(data: bytes) -> str:
+    try:
+        with Image.open(BytesIO(data)) as image:
+            return Image.MIME.get(image.format, "application/octet-stream")
+    except UnidentifiedImageError:
+        return "application/octet-stream"
+
+
+def move_covers_to_table(apps, schema_editor):
+    Cover = apps.get_model("hackathons", "Cover")
+    Hackathon = apps.get_model("hackathons", "Hackathon")
+
+    for hackathon in Hackathon.objects.exclude(image_cover=b"").iterator():
+        data = bytes(hackathon.image_cover)
+        hackathon.cover, _ = Cover.objects.get_or_create(
+            hash=hashlib.sha256(data).hexdigest(),
+            defaults={"content_type": guess_content_type(data), "data": data},
+        )
+        hackathon.save(update_fields=["cover"])
+
+
+def move_covers_to_hackathons(apps, schema_editor):
+    Hackathon = apps.get_model("hackathons", "Hackathon")
+
+    for hackathon in Hackathon.objects.select_related("cover").iterator():
+        if hackathon.cover is not None:
+            hackathon.image_cover = hackathon.cover.data
+            hackathon.save(update_fields=["image_cover"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("hackathons", "0002_notificationstatus"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Cover",
+            fields=[
+                (
+                    "hash",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("content_type", models.CharField(max_length=100)),
+                ("data", models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="hackathon",
+            name="cover",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="hackathons",
+                to="hackathons.cover",
+            ),
+        ),
+        # give the old column a default so that the migration can be reversed
+        migrations.AlterField(
+            model_name="hackathon",
+            name="image_cover",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.RunPython(move_covers_to_table, move_covers_to_hackathons),
+        migrations.RemoveField(
+            model_name="hackathon",
+            name="image_cover",
+        ),
+        migrations.RenameField(
+            model_name="hackathon",
+            old_name="cover",
+            new_name="image_cover",
+        ),
+    ]
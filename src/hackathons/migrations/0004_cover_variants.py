@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-18 20:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("hackathons", "0003_cover"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hackathon",
+            name="image_cover_card",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="hackathons.cover",
+            ),
+        ),
+        migrations.AddField(
+            model_name="hackathon",
+            name="image_cover_thumbnail",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="hackathons.cover",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-18 20:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("hackathons", "0004_cover_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HackathonStats",
+            fields=[
+                (
+                    "hackathon",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="hackathons.hackathon",
+                    ),
+                ),
+                ("total_teams", models.PositiveIntegerField(default=0)),
+                ("full_teams", models.PositiveIntegerField(default=0)),
+                ("people_in_teams", models.PositiveIntegerField(default=0)),
+                ("people_without_teams", models.PositiveIntegerField(default=0)),
+                ("invited", models.PositiveIntegerField(default=0)),
+                ("accepted", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
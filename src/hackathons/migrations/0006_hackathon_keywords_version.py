@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("hackathons", "0005_hackathon_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hackathon",
+            name="keywords_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
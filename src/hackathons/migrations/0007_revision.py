@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-18 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("hackathons", "0006_hackathon_keywords_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hackathon",
+            name="revision",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="hackathon",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
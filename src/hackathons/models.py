@@ -1,12 +1,41 @@
+import asyncio
+import hashlib
 import uuid
+from typing import Collection, Iterable
 
 from django.db import models
+from django.db.models import QuerySet
 
 from accounts.models import Account, Email
-from hackathons.entities import HackathonEntity, HackathonStatus
+from hackathons.entities import (
+    CoverVariant,
+    HackathonBriefEntity,
+    HackathonEntity,
+    HackathonStatus,
+)
+from megazord.db import fetch, fetch_first, fetch_rows
+from megazord.models import RevisionModel
 
 
-class Hackathon(models.Model):
+class Cover(models.Model):
+    hash = models.CharField(max_length=64, primary_key=True)
+    content_type = models.CharField(max_length=100)
+    data = models.BinaryField()
+
+    def __str__(self):
+        return self.hash
+
+    @classmethod
+    async def from_bytes(cls, data: bytes, content_type: str) -> "Cover":
+        cover, _ = await Cover.objects.aget_or_create(
+            hash=hashlib.sha256(data).hexdigest(),
+            defaults={"content_type": content_type, "data": data},
+        )
+
+        return cover
+
+
+class Hackathon(RevisionModel):
     class Status(models.TextChoices):
         NOT_STARTED = "NOT_STARTED"
         STARTED = "STARTED"
@@ -19,34 +48,147 @@ class Hackathon(models.Model):
     )
     name = models.CharField(max_length=200, null=False)
     status = models.CharField(choices=Status, default=Status.NOT_STARTED)
-    image_cover = models.BinaryField(null=False)
+    image_cover = models.ForeignKey(
+        Cover, on_delete=models.PROTECT, null=True, related_name="hackathons"
+    )
+    image_cover_card = models.ForeignKey(
+        Cover, on_delete=models.PROTECT, null=True, related_name="+"
+    )
+    image_cover_thumbnail = models.ForeignKey(
+        Cover, on_delete=models.PROTECT, null=True, related_name="+"
+    )
     description = models.TextField(null=False, default="описание хакатона")
     min_participants = models.IntegerField(null=True, default=3)
     max_participants = models.IntegerField(null=True, default=5)
     participants = models.ManyToManyField(Account, related_name="hackathons")
     emails = models.ManyToManyField(Email, related_name="hackathons")
+    # bumped whenever vacancies or their keywords change,
+    # recommendations cached for older versions are not used
+    keywords_version = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
 
-    async def to_entity(self) -> HackathonEntity:
+    def set_cover(self, covers: dict[CoverVariant, Cover]) -> None:
+        self.image_cover = covers[CoverVariant.FULL]
+        self.image_cover_card = covers[CoverVariant.CARD]
+        self.image_cover_thumbnail = covers[CoverVariant.THUMBNAIL]
+
+    def get_cover_hashes(self) -> dict[CoverVariant, str]:
+        hashes = {
+            CoverVariant.FULL: self.image_cover_id,
+            CoverVariant.CARD: self.image_cover_card_id,
+            CoverVariant.THUMBNAIL: self.image_cover_thumbnail_id,
+        }
+        return {variant: hash for variant, hash in hashes.items() if hash is not None}
+
+    async def to_entity(self, expand: Collection[str] | None = None) -> HackathonEntity:
+        """
+        Collections which are not in `expand` are left empty,
+        all of them are loaded by default.
+        """
+        return await self.make_entity(
+            creator=self.creator,
+            participants=[participant async for participant in self.participants.all()]
+            if expand is None or "participants" in expand
+            else [],
+            emails=[email async for email in self.emails.all()]
+            if expand is None or "emails" in expand
+            else [],
+            roles=[role.name async for role in self.roles.all()],
+        )
+
+    async def make_entity(
+        self,
+        creator: Account,
+        participants: Iterable[Account],
+        emails: Iterable[Email],
+        roles: Iterable[str],
+    ) -> HackathonEntity:
         return HackathonEntity(
             id=self.id,
-            creator=await self.creator.to_entity(),
+            creator=await creator.to_entity(),
             name=self.name,
             status=HackathonStatus(self.status),
-            image_cover=self.image_cover,
+            image_cover=self.get_cover_hashes(),
             description=self.description,
             min_participants=self.min_participants,
             max_participants=self.max_participants,
             participants=[
-                await participant.to_entity()
-                async for participant in self.participants.all()
+                await participant.to_entity() for participant in participants
             ],
-            emails=[await email.to_entity() async for email in self.emails.all()],
+            emails=[await email.to_entity() for email in emails],
+            roles=list(roles),
+        )
+
+    @classmethod
+    async def fetch_entity(cls, hackathon_id: uuid.UUID) -> HackathonEntity | None:
+        """
+        Same as `to_entity` with everything loaded, read natively
+        with all the rows queried at the same time.
+        """
+        hackathon, creators, participants, emails, roles = await asyncio.gather(
+            fetch_first(cls.objects.filter(id=hackathon_id)),
+            fetch(Account.objects.filter(creator=hackathon_id)),
+            fetch(Account.objects.filter(hackathons=hackathon_id)),
+            fetch(Email.objects.filter(hackathons=hackathon_id)),
+            fetch_rows(Role.objects.filter(hackathon=hackathon_id).values_list("name")),
+        )
+        if hackathon is None:
+            return None
+
+        return await hackathon.make_entity(
+            creator=creators[0],
+            participants=participants,
+            emails=emails,
+            roles=[name for (name,) in roles],
+        )
+
+    @classmethod
+    async def to_entities(
+        cls, queryset: QuerySet["Hackathon"], expand: Collection[str] | None = None
+    ) -> list[HackathonEntity]:
+        collections = {"participants", "emails"}
+        if expand is not None:
+            collections &= set(expand)
+        hackathons = queryset.select_related("creator").prefetch_related(
+            "roles", *collections
+        )
+        return [await hackathon.to_entity(expand) async for hackathon in hackathons]
+
+    async def to_brief_entity(self) -> HackathonBriefEntity:
+        try:
+            stats = self.stats
+        except HackathonStats.DoesNotExist:
+            participants_count = await self.participants.acount()
+            emails_count = await self.emails.acount()
+        else:
+            participants_count = stats.accepted
+            emails_count = stats.invited
+
+        return HackathonBriefEntity(
+            id=self.id,
+            creator=await self.creator.to_entity(),
+            name=self.name,
+            status=HackathonStatus(self.status),
+            image_cover=self.get_cover_hashes(),
+            description=self.description,
+            min_participants=self.min_participants,
+            max_participants=self.max_participants,
+            participants_count=participants_count,
+            emails_count=emails_count,
             roles=[role.name async for role in self.roles.all()],
         )
 
+    @classmethod
+    async def to_brief_entities(
+        cls, queryset: QuerySet["Hackathon"]
+    ) -> list[HackathonBriefEntity]:
+        hackathons = queryset.select_related("creator", "stats").prefetch_related(
+            "roles"
+        )
+        return [await hackathon.to_brief_entity() async for hackathon in hackathons]
+
 
 class Role(models.Model):
     hackathon = models.ForeignKey(
@@ -76,3 +218,24 @@ class NotificationStatus(models.Model):
 
     def __str__(self):
         return f"NotificationStatus for {self.email} in hackathon"
+
+
+class HackathonStats(models.Model):
+    """
+    Counters for organizer dashboards,
+    they are refreshed on writes by `hackathons.signals`.
+    """
+
+    hackathon = models.OneToOneField(
+        Hackathon, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    total_teams = models.PositiveIntegerField(default=0)
+    full_teams = models.PositiveIntegerField(default=0)
+    people_in_teams = models.PositiveIntegerField(default=0)
+    people_without_teams = models.PositiveIntegerField(default=0)
+    invited = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.hackathon_id}"
@@ -1,28 +1,64 @@
-import base64
 import uuid
 
-from ninja import Schema
+from django.urls import reverse
+from ninja import Field, Schema
 from pydantic import EmailStr
 
-from hackathons.entities import HackathonEntity, HackathonStatus
+from hackathons.entities import (
+    CoverVariant,
+    HackathonBriefEntity,
+    HackathonEntity,
+    HackathonStatus,
+)
 from profiles.schemas import ProfileSchema
 
 
-class HackathonSchema(Schema):
+def get_cover_url(cover_hash: str) -> str:
+    return reverse("api-1.0.0:get_cover", kwargs={"cover_hash": cover_hash})
+
+
+class HackathonBaseSchema(Schema):
     id: uuid.UUID
     creator: ProfileSchema
     name: str
     status: HackathonStatus
-    image_cover: str
+    image_cover: str | None
+    image_cover_variants: dict[CoverVariant, str]
     description: str
     min_participants: int
     max_participants: int
-    participants: list[ProfileSchema]
     roles: list[str]
 
     @staticmethod
-    def resolve_image_cover(obj: HackathonEntity) -> str:
-        return base64.b64encode(obj.image_cover).decode()
+    def resolve_image_cover(obj: HackathonEntity | HackathonBriefEntity) -> str | None:
+        if CoverVariant.FULL not in obj.image_cover:
+            return None
+
+        return get_cover_url(obj.image_cover[CoverVariant.FULL])
+
+    @staticmethod
+    def resolve_image_cover_variants(
+        obj: HackathonEntity | HackathonBriefEntity,
+    ) -> dict[CoverVariant, str]:
+        if CoverVariant.FULL not in obj.image_cover:
+            return {}
+
+        # covers uploaded before variants existed are served in full size
+        return {
+            variant: get_cover_url(
+                obj.image_cover.get(variant, obj.image_cover[CoverVariant.FULL])
+            )
+            for variant in CoverVariant
+        }
+
+
+class HackathonSchema(HackathonBaseSchema):
+    participants: list[ProfileSchema]
+
+
+class HackathonBriefSchema(HackathonBaseSchema):
+    participants_count: int
+    emails_count: int
 
 
 class HackathonCreateSchema(Schema):
@@ -45,12 +81,17 @@ class HackathonSummarySchema(Schema):
     total_teams: int
     full_teams: int
     percent_full_teams: float
-    people_without_teams: list[ProfileSchema]
+    people_without_teams_count: int
     people_in_teams: int
     invited_people: int
     accepted_invite: int
 
 
+class ProfilesPageSchema(Schema):
+    count: int
+    items: list[ProfileSchema]
+
+
 class EmailSchema(Schema):
     email: EmailStr
 
@@ -59,6 +100,31 @@ class EmailsSchema(Schema):
     emails: list[EmailStr]
 
 
+class ParticipantsImportSchema(Schema):
+    added: int
+    duplicates: int
+    invalid: list[str]
+
+
+class FormedTeamSchema(Schema):
+    name: str
+    members: list[ProfileSchema]
+    roles: list[str]
+
+
+class TeamsFormationSchema(Schema):
+    teams: list[FormedTeamSchema]
+    unassigned: list[ProfileSchema]
+
+
+class TeamsFormationCommitSchema(Schema):
+    class Team(Schema):
+        name: str = Field(min_length=1, max_length=200)
+        members: list[uuid.UUID] = Field(min_length=1)
+
+    teams: list[Team] = Field(min_length=1)
+
+
 class AnalyticsSchema(Schema):
     procent: float
 
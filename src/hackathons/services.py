@@ -1,83 +1,261 @@
+import codecs
 import csv
-from io import StringIO
+import re
+from typing import Iterable, Iterator
 
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.utils.http import parse_etags
 from ninja import UploadedFile
+from pydantic.networks import validate_email
+from pydantic_core import PydanticCustomError
 
-from hackathons.models import UserRole
-from resumes.models import Resume
-from teams.models import Team
+from accounts.models import Account, Email
+from hackathons.entities import ParticipantsImportEntity
+from hackathons.models import Cover, Hackathon
+from hackathons.stats import EMAILS_COUNTERS, refresh_stats
+from megazord.models import bump_revisions
+from megazord.settings import PARTICIPANTS_CSV_MAX_ROWS, PARTICIPANTS_CSV_MAX_SIZE
+from utils.notification import enqueue_notification
 
+COVER_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
 
-def get_emails_from_csv(file: UploadedFile) -> list[str]:
-    file_data = file.read().decode("utf-8-sig")
-    csv_reader = csv.reader(StringIO(file_data), delimiter=",")
-    emails = [row[0].strip() for row in csv_reader if row]
 
-    return emails
+class RangeNotSatisfiable(Exception):
+    pass
 
 
-async def make_csv(hackathon) -> str:
-    csv_output = StringIO()
-    csv_writer = csv.writer(csv_output)
+class CSVImportError(Exception):
+    pass
 
-    csv_writer.writerow(["Team", "Email", "Full Name", "GitHub", "Role"])
 
-    teams = Team.objects.filter(hackathon=hackathon).prefetch_related("team_members")
+def iter_csv_lines(file: UploadedFile) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    size = 0
+    tail = ""
 
-    async for team in teams:
-        async for participant in team.team_members.all():
-            try:
-                resume = await Resume.objects.aget(
-                    user=participant, hackathon=hackathon
+    try:
+        for chunk in file.chunks():
+            size += len(chunk)
+            if size > PARTICIPANTS_CSV_MAX_SIZE:
+                raise CSVImportError(
+                    f"CSV file is larger than {PARTICIPANTS_CSV_MAX_SIZE} bytes"
                 )
-                github = resume.github or "N/A"
-            except Resume.DoesNotExist:
-                github = "N/A"
 
-            try:
-                user_role = await UserRole.objects.select_related("role").aget(
-                    user=participant, hackathon=hackathon
+            lines = (tail + decoder.decode(chunk)).splitlines(keepends=True)
+            # the last line may continue in the next chunk
+            tail = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+            yield from lines
+
+        tail += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise CSVImportError("CSV file is not encoded in UTF-8")
+
+    if tail:
+        yield tail
+
+
+def get_emails_from_csv(
+    file: UploadedFile, batch_size: int = 1000
+) -> Iterator[list[str]]:
+    """
+    Read emails from the first column of CSV file in batches,
+    the file is never loaded into memory as a whole.
+    """
+    if file.size is not None and file.size > PARTICIPANTS_CSV_MAX_SIZE:
+        raise CSVImportError(
+            f"CSV file is larger than {PARTICIPANTS_CSV_MAX_SIZE} bytes"
+        )
+
+    rows = 0
+    batch = []
+    try:
+        for row in csv.reader(iter_csv_lines(file), delimiter=","):
+            if not row:
+                continue
+
+            rows += 1
+            if rows > PARTICIPANTS_CSV_MAX_ROWS:
+                raise CSVImportError(
+                    f"CSV file has more than {PARTICIPANTS_CSV_MAX_ROWS} rows"
                 )
-                role = user_role.role.name
-            except UserRole.DoesNotExist:
-                role = "N/A"
-
-            csv_writer.writerow(
-                [
-                    team.name,
-                    participant.email,
-                    participant.username,
-                    github,
-                    role,
-                ]
-            )
-
-    participants_without_team = hackathon.participants.exclude(
-        id__in=teams.values_list("team_members__id", flat=True)
+
+            batch.append(row[0])
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    except csv.Error as exc:
+        raise CSVImportError(f"CSV file is malformed: {exc}")
+
+    if batch:
+        yield batch
+
+
+def normalize_email(email: str) -> str | None:
+    try:
+        _, email = validate_email(email.strip())
+    except PydanticCustomError:
+        return None
+
+    return email
+
+
+def get_my_hackathons(user: Account) -> QuerySet[Hackathon]:
+    return Hackathon.objects.filter(Q(creator=user) | Q(participants=user)).distinct()
+
+
+@transaction.atomic
+def import_participants(
+    hackathon: Hackathon, batches: Iterable[Iterable[str]]
+) -> ParticipantsImportEntity:
+    """
+    Add emails to the hackathon participants with a few queries per batch.
+    """
+    report = ParticipantsImportEntity()
+    through = Hackathon.emails.through
+    seen = set()
+
+    for batch in batches:
+        unique = []
+        for email in batch:
+            normalized = normalize_email(email)
+            if normalized is None:
+                report.invalid.append(email)
+            elif normalized in seen:
+                report.duplicates += 1
+            else:
+                seen.add(normalized)
+                unique.append(normalized)
+
+        Email.objects.bulk_create(
+            [Email(email=email) for email in unique], ignore_conflicts=True
+        )
+        email_ids = set(
+            Email.objects.filter(email__in=unique).values_list("id", flat=True)
+        )
+        email_ids -= set(
+            through.objects.filter(
+                hackathon=hackathon, email_id__in=email_ids
+            ).values_list("email_id", flat=True)
+        )
+        through.objects.bulk_create(
+            [through(hackathon=hackathon, email_id=email_id) for email_id in email_ids],
+            ignore_conflicts=True,
+        )
+        report.added += len(email_ids)
+        report.duplicates += len(unique) - len(email_ids)
+
+    # bulk inserts into the through table do not send `m2m_changed`
+    if report.added:
+        refresh_stats(hackathon.id, EMAILS_COUNTERS)
+        bump_revisions(Hackathon.objects.filter(id=hackathon.id))
+
+    return report
+
+
+@sync_to_async
+@transaction.atomic
+def change_hackathon_status(
+    hackathon: Hackathon,
+    status: Hackathon.Status,
+    mail_template: str,
+    telegram_template: str,
+) -> None:
+    """
+    Notifications are enqueued in the same transaction as the status change.
+    """
+    hackathon.status = status
+    hackathon.save(update_fields=["status"])
+
+    enqueue_notification(
+        emails=hackathon.emails.all(),
+        context={"hackathon": hackathon},
+        mail_template=mail_template,
+        telegram_template=telegram_template,
     )
-    async for participant in participants_without_team:
-        try:
-            resume = await Resume.objects.aget(user=participant, hackathon=hackathon)
-            github = resume.github or "N/A"
-        except Resume.DoesNotExist:
-            github = "N/A"
 
+
+def get_cover_etag(cover_hash: str) -> str:
+    return f'"{cover_hash}"'
+
+
+def is_cover_cached(request: HttpRequest, cover_hash: str) -> bool:
+    """
+    Covers are content-addressed, so a matching `If-None-Match` is enough
+    to answer 304 without touching the database. `*` matches only covers
+    which exist, it is left to the database.
+    """
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is None:
+        return False
+
+    etags = [etag.removeprefix("W/") for etag in parse_etags(if_none_match)]
+    return get_cover_etag(cover_hash) in etags
+
+
+def parse_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single `bytes=start-end` range. Returns `None` for ranges that
+    should be ignored (the whole content is served then).
+    """
+    match = RANGE_RE.match(range_header.strip())
+    if match is None:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        suffix_length = int(end)
+        if suffix_length == 0:
+            raise RangeNotSatisfiable
+        return max(size - suffix_length, 0), size - 1
+
+    first, last = int(start), int(end) if end else size - 1
+    if first >= size:
+        raise RangeNotSatisfiable
+    if first > last:
+        return None
+
+    return first, min(last, size - 1)
+
+
+def make_cover_response(request: HttpRequest, cover: Cover) -> HttpResponse:
+    etag = get_cover_etag(cover.hash)
+    data = bytes(cover.data)
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header is not None and if_range in (None, etag):
         try:
-            user_role = await UserRole.objects.select_related("role").aget(
-                user=participant, hackathon=hackathon
-            )
-            role = user_role.role.name
-        except UserRole.DoesNotExist:
-            role = "N/A"
-
-        csv_writer.writerow(
-            [
-                "No Team",
-                participant.email,
-                participant.username,
-                github,
-                role,
-            ]
+            byte_range = parse_range(range_header, size=len(data))
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{len(data)}"
+            return response
+
+    if byte_range is None:
+        response = HttpResponse(data, content_type=cover.content_type)
+    else:
+        first, last = byte_range
+        response = HttpResponse(
+            data[first : last + 1], content_type=cover.content_type, status=206
         )
+        response["Content-Range"] = f"bytes {first}-{last}/{len(data)}"
+
+    response["ETag"] = etag
+    response["Cache-Control"] = COVER_CACHE_CONTROL
+    response["Accept-Ranges"] = "bytes"
+    return response
+
 
-    return csv_output.getvalue()
+def make_cover_not_modified_response(cover_hash: str) -> HttpResponse:
+    response = HttpResponse(status=304)
+    response["ETag"] = get_cover_etag(cover_hash)
+    response["Cache-Control"] = COVER_CACHE_CONTROL
+    return response
@@ -0,0 +1,176 @@
+import uuid
+from typing import Any, Iterable
+
+from django.db.models import Model, Q, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import Account, Email
+from hackathons.models import Hackathon, HackathonStats, Role
+from hackathons.stats import (
+    COUNTERS,
+    TEAM_SIZE_COUNTERS,
+    change_invites,
+    change_members,
+    change_participants,
+    change_stats,
+    refresh_stats,
+)
+from megazord.api.caching import bump_versions, get_version_key
+from megazord.models import bump_revisions
+from teams.models import Team
+
+# stats are moved by the rows a change adds or removes, they are read
+# before the change, in the same transaction
+SIGNS = {"pre_add": 1, "pre_remove": -1, "pre_clear": -1}
+
+
+def get_changed_rows(
+    sender: type[Model],
+    instance: Model,
+    action: str,
+    reverse: bool,
+    pk_set: set | None,
+    fields: tuple[str, str],
+) -> set[tuple[Any, Any]]:
+    """
+    Rows of the through model an m2m change adds or removes,
+    as pairs of ids of the forward and the reverse side.
+    """
+    forward, backward = fields
+    own, other = (backward, forward) if reverse else (forward, backward)
+    if action == "pre_add":
+        # Django leaves out the rows which exist already
+        rows = [{own: instance.pk, other: pk} for pk in pk_set]
+        return {(row[forward], row[backward]) for row in rows}
+
+    rows = sender.objects.filter(**{own: instance.pk})
+    if action == "pre_remove":
+        rows = rows.filter(**{f"{other}__in": pk_set})
+    return set(rows.values_list(forward, backward))
+
+
+def is_deleted_by(origin: Any, model: type[Model]) -> bool:
+    return (origin.model if isinstance(origin, QuerySet) else type(origin)) is model
+
+
+def bump_hackathons(hackathon_ids: Iterable[uuid.UUID]) -> None:
+    hackathon_ids = set(hackathon_ids)
+    bump_versions(*(get_version_key("hackathon", id) for id in hackathon_ids))
+    bump_revisions(Hackathon.objects.filter(id__in=hackathon_ids))
+
+
+@receiver(m2m_changed, sender=Hackathon.participants.through)
+def participants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in SIGNS:
+        participations = get_changed_rows(
+            sender, instance, action, reverse, pk_set, ("hackathon_id", "account_id")
+        )
+        change_participants(participations, SIGNS[action])
+        bump_hackathons(hackathon_id for hackathon_id, _ in participations)
+
+
+@receiver(m2m_changed, sender=Hackathon.emails.through)
+def emails_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in SIGNS:
+        invites = get_changed_rows(
+            sender, instance, action, reverse, pk_set, ("hackathon_id", "email_id")
+        )
+        change_invites(invites, SIGNS[action])
+        bump_hackathons(hackathon_id for hackathon_id, _ in invites)
+
+
+@receiver(pre_delete, sender=Email)
+def email_deleted(sender, instance, **kwargs):
+    # invites are removed by the cascade, which sends no m2m_changed
+    invites = set(
+        Hackathon.emails.through.objects.filter(email=instance).values_list(
+            "hackathon_id", "email_id"
+        )
+    )
+    change_invites(invites, -1)
+    bump_hackathons(hackathon_id for hackathon_id, _ in invites)
+
+
+@receiver(m2m_changed, sender=Team.team_members.through)
+def team_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in SIGNS:
+        memberships = get_changed_rows(
+            sender, instance, action, reverse, pk_set, ("team_id", "account_id")
+        )
+        change_members(memberships, SIGNS[action])
+
+
+@receiver(post_save, sender=Team)
+def team_saved(sender, instance, created, **kwargs):
+    if created:
+        change_stats(instance.hackathon_id, total_teams=1)
+
+
+@receiver(pre_delete, sender=Team)
+def team_deleted(sender, instance, origin, **kwargs):
+    # stats are deleted together with the hackathon,
+    # deleted accounts recount the stats of their hackathons
+    if is_deleted_by(origin, Team):
+        change_members(
+            set(
+                Team.team_members.through.objects.filter(team=instance).values_list(
+                    "team_id", "account_id"
+                )
+            ),
+            -1,
+        )
+        change_stats(instance.hackathon_id, total_teams=-1)
+
+
+@receiver(post_save, sender=Hackathon)
+def hackathon_saved(sender, instance, created, update_fields, **kwargs):
+    if created:
+        HackathonStats.objects.create(hackathon=instance)
+    elif update_fields is None or "max_participants" in update_fields:
+        refresh_stats(instance.id, TEAM_SIZE_COUNTERS)
+    bump_versions(get_version_key("hackathon", instance.id))
+
+
+@receiver(post_delete, sender=Hackathon)
+def hackathon_deleted(sender, instance, **kwargs):
+    bump_versions(get_version_key("hackathon", instance.id))
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def role_changed(sender, instance, **kwargs):
+    bump_versions(get_version_key("hackathon", instance.hackathon_id))
+    bump_revisions(Hackathon.objects.filter(id=instance.hackathon_id))
+
+
+@receiver(post_save, sender=Account)
+def account_saved(sender, instance, created, **kwargs):
+    # hackathons are served with their creator and participants
+    if not created:
+        bump_hackathons(
+            Hackathon.objects.filter(
+                Q(creator=instance) | Q(participants=instance)
+            ).values_list("id", flat=True)
+        )
+
+
+@receiver(pre_delete, sender=Account)
+def account_deleted(sender, instance, **kwargs):
+    # participations, memberships and created teams go with the account
+    # without m2m_changed, their hackathons are recounted once it is gone,
+    # hackathons of the creator are deleted with it
+    instance._stats_hackathon_ids = set(
+        Hackathon.objects.filter(
+            Q(participants=instance)
+            | Q(team__team_members=instance)
+            | Q(team__creator=instance)
+        ).values_list("id", flat=True)
+    )
+    bump_hackathons(instance._stats_hackathon_ids)
+
+
+@receiver(post_delete, sender=Account)
+def account_removed(sender, instance, **kwargs):
+    for hackathon_id in getattr(instance, "_stats_hackathon_ids", ()):
+        refresh_stats(hackathon_id, COUNTERS)
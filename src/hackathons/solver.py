@@ -0,0 +1,140 @@
+"""
+Team formation solver. The module does not touch Django,
+so that it can be imported by the processes of `formation.executor`.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+
+# one more covered role is worth more than any number of extra skills
+ROLE_WEIGHT = 1000
+# the search stops when this many swaps in a row have not improved teams
+MAX_STALE_SWAPS = 2000
+
+
+@dataclass(frozen=True)
+class Candidate:
+    id: str
+    role: str | None = None
+    skills: frozenset[str] = frozenset()
+
+
+@dataclass
+class Assignment:
+    teams: list[list[Candidate]] = field(default_factory=list)
+    unassigned: list[Candidate] = field(default_factory=list)
+
+
+def get_team_sizes(count: int, min_size: int, max_size: int) -> list[int]:
+    """
+    Sizes of as few teams as possible which together fit the most candidates,
+    every size is between `min_size` and `max_size` and they differ by one at most.
+    """
+    if count < min_size:
+        return []
+
+    teams = -(-count // max_size)
+    if teams * min_size > count:
+        teams = count // min_size
+
+    base, extra = divmod(min(count, teams * max_size), teams)
+    return [base + 1] * extra + [base] * (teams - extra)
+
+
+def score_team(team: list[Candidate]) -> int:
+    roles = {candidate.role for candidate in team if candidate.role is not None}
+    skills = set().union(*(candidate.skills for candidate in team))
+    return len(roles) * ROLE_WEIGHT + len(skills)
+
+
+def assign_greedy(candidates: list[Candidate], sizes: list[int]) -> Assignment:
+    """
+    Deal candidates with the scarcest roles first,
+    each to the emptiest team which does not have their role yet.
+    """
+    role_counts: dict[str | None, int] = {}
+    for candidate in candidates:
+        role_counts[candidate.role] = role_counts.get(candidate.role, 0) + 1
+
+    ordered = sorted(
+        candidates,
+        key=lambda candidate: (
+            candidate.role is None,
+            role_counts[candidate.role],
+            -len(candidate.skills),
+            candidate.id,
+        ),
+    )
+
+    assignment = Assignment(teams=[[] for _ in sizes])
+    for candidate in ordered:
+        free = [i for i, size in enumerate(sizes) if len(assignment.teams[i]) < size]
+        if not free:
+            assignment.unassigned.append(candidate)
+            continue
+
+        without_role = [
+            i
+            for i in free
+            if all(member.role != candidate.role for member in assignment.teams[i])
+        ]
+        best = min(
+            without_role or free,
+            key=lambda i: (len(assignment.teams[i]) - sizes[i], i),
+        )
+        assignment.teams[best].append(candidate)
+
+    return assignment
+
+
+def improve(assignment: Assignment, deadline: float, rng: random.Random) -> None:
+    """
+    Swap candidates between teams, or with unassigned ones,
+    while the swaps improve the teams and there is time left.
+    """
+    groups = assignment.teams + [assignment.unassigned]
+    teams = len(assignment.teams)
+    if teams == 0 or (teams == 1 and not assignment.unassigned):
+        return
+
+    scores = [score_team(team) for team in assignment.teams] + [0]
+    stale = 0
+    while stale < MAX_STALE_SWAPS and time.monotonic() < deadline:
+        stale += 1
+        first = rng.randrange(teams)
+        second = rng.randrange(len(groups))
+        if first == second or not groups[second]:
+            continue
+
+        i = rng.randrange(len(groups[first]))
+        j = rng.randrange(len(groups[second]))
+        groups[first][i], groups[second][j] = groups[second][j], groups[first][i]
+
+        first_score = score_team(groups[first])
+        second_score = score_team(groups[second]) if second < teams else 0
+        if first_score + second_score > scores[first] + scores[second]:
+            scores[first], scores[second] = first_score, second_score
+            stale = 0
+        else:
+            groups[first][i], groups[second][j] = groups[second][j], groups[first][i]
+
+
+def solve_teams(
+    candidates: list[Candidate],
+    min_size: int,
+    max_size: int,
+    time_budget: float,
+    seed: int = 0,
+) -> Assignment:
+    """
+    Split candidates into teams covering as many roles and skills as possible,
+    candidates that do not fit into teams of allowed sizes stay unassigned.
+    """
+    deadline = time.monotonic() + time_budget
+    assignment = assign_greedy(
+        candidates, get_team_sizes(len(candidates), min_size, max_size)
+    )
+    improve(assignment, deadline=deadline, rng=random.Random(seed))
+
+    return assignment
@@ -0,0 +1,198 @@
+import uuid
+from collections import Counter, defaultdict
+from typing import Callable, Iterable
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from hackathons.models import Hackathon, HackathonStats
+from teams.models import Team
+
+
+def count_full_teams(hackathon: Hackathon) -> int:
+    return (
+        Team.objects.filter(hackathon=hackathon)
+        .annotate(num_members=Count("team_members"))
+        .filter(num_members=hackathon.max_participants)
+        .count()
+    )
+
+
+def count_people_in_teams(hackathon: Hackathon) -> int:
+    return (
+        Team.team_members.through.objects.filter(team__hackathon=hackathon)
+        .values("account_id")
+        .distinct()
+        .count()
+    )
+
+
+def count_people_without_teams(hackathon: Hackathon) -> int:
+    return hackathon.participants.exclude(team_members__hackathon=hackathon).count()
+
+
+COUNTERS: dict[str, Callable[[Hackathon], int]] = {
+    "total_teams": lambda hackathon: Team.objects.filter(hackathon=hackathon).count(),
+    "full_teams": count_full_teams,
+    "people_in_teams": count_people_in_teams,
+    "people_without_teams": count_people_without_teams,
+    "invited": lambda hackathon: hackathon.emails.count(),
+    "accepted": lambda hackathon: hackathon.participants.count(),
+}
+
+# counters affected by each kind of change
+TEAMS_COUNTERS = (
+    "total_teams",
+    "full_teams",
+    "people_in_teams",
+    "people_without_teams",
+)
+PARTICIPANTS_COUNTERS = ("accepted", "people_without_teams")
+EMAILS_COUNTERS = ("invited",)
+TEAM_SIZE_COUNTERS = ("full_teams",)
+
+
+def rebuild_stats(hackathon: Hackathon) -> HackathonStats:
+    stats, _ = HackathonStats.objects.update_or_create(
+        hackathon=hackathon,
+        defaults={name: count(hackathon) for name, count in COUNTERS.items()},
+    )
+    return stats
+
+
+def refresh_stats(hackathon_id: uuid.UUID, counters: Iterable[str]) -> None:
+    """
+    Recount only the given counters, the whole row is built
+    if the hackathon has no stats yet. Used by bulk changes,
+    single rows move the counters with `change_stats`.
+    """
+    hackathon = Hackathon.objects.filter(id=hackathon_id).first()
+    if hackathon is None:
+        return
+
+    updated = HackathonStats.objects.filter(hackathon=hackathon).update(
+        updated_at=timezone.now(),
+        **{name: COUNTERS[name](hackathon) for name in counters},
+    )
+    if not updated:
+        rebuild_stats(hackathon)
+
+
+def change_stats(hackathon_id: uuid.UUID, **deltas: int) -> None:
+    """
+    Move counters by deltas in place, concurrent changes add up instead of
+    overwriting each other. Hackathons without stats get them on the first
+    read.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    HackathonStats.objects.filter(hackathon_id=hackathon_id).update(
+        updated_at=timezone.now(),
+        # a drifted counter does not fail writes, `rebuild_stats` repairs it
+        **{name: Greatest(F(name) + delta, 0) for name, delta in deltas.items()},
+    )
+
+
+def change_participants(
+    participations: set[tuple[uuid.UUID, uuid.UUID]], sign: int
+) -> None:
+    """
+    Count (hackathon id, account id) participations joining (`sign` 1)
+    or leaving (-1) before the change is made.
+    """
+    if not participations:
+        return
+
+    in_teams = set(
+        Team.team_members.through.objects.filter(
+            team__hackathon_id__in={hackathon_id for hackathon_id, _ in participations},
+            account_id__in={account_id for _, account_id in participations},
+        ).values_list("team__hackathon_id", "account_id")
+    )
+    deltas = defaultdict(Counter)
+    for participation in participations:
+        hackathon_id, _ = participation
+        deltas[hackathon_id]["accepted"] += sign
+        if participation not in in_teams:
+            deltas[hackathon_id]["people_without_teams"] += sign
+
+    for hackathon_id, counters in deltas.items():
+        change_stats(hackathon_id, **counters)
+
+
+def change_invites(invites: set[tuple[uuid.UUID, int]], sign: int) -> None:
+    """
+    Count (hackathon id, email id) invites made (`sign` 1) or withdrawn (-1).
+    """
+    for hackathon_id, count in Counter(
+        hackathon_id for hackathon_id, _ in invites
+    ).items():
+        change_stats(hackathon_id, invited=sign * count)
+
+
+def change_members(memberships: set[tuple[uuid.UUID, uuid.UUID]], sign: int) -> None:
+    """
+    Count (team id, account id) memberships added (`sign` 1)
+    or removed (-1) before the change is made.
+    """
+    if not memberships:
+        return
+
+    teams = {
+        team_id: (hackathon_id, max_participants, size)
+        for team_id, hackathon_id, max_participants, size in Team.objects.filter(
+            id__in={team_id for team_id, _ in memberships}
+        )
+        .annotate(size=Count("team_members"))
+        .values_list("id", "hackathon_id", "hackathon__max_participants", "size")
+    }
+    hackathon_ids = {hackathon_id for hackathon_id, _, _ in teams.values()}
+    account_ids = {account_id for _, account_id in memberships}
+
+    # teams of the hackathons the accounts are members of before the change
+    teams_before = defaultdict(set)
+    for hackathon_id, account_id, team_id in Team.team_members.through.objects.filter(
+        team__hackathon_id__in=hackathon_ids, account_id__in=account_ids
+    ).values_list("team__hackathon_id", "account_id", "team_id"):
+        teams_before[hackathon_id, account_id].add(team_id)
+    participations = set(
+        Hackathon.participants.through.objects.filter(
+            hackathon_id__in=hackathon_ids, account_id__in=account_ids
+        ).values_list("hackathon_id", "account_id")
+    )
+
+    deltas = defaultdict(Counter)
+    changed_teams = defaultdict(set)
+    for team_id, account_id in memberships:
+        changed_teams[teams[team_id][0], account_id].add(team_id)
+
+    for team_id, count in Counter(team_id for team_id, _ in memberships).items():
+        hackathon_id, max_participants, size = teams[team_id]
+        deltas[hackathon_id]["full_teams"] += (
+            size + sign * count == max_participants
+        ) - (size == max_participants)
+
+    for participation, team_ids in changed_teams.items():
+        hackathon_id, _ = participation
+        before = teams_before[participation]
+        after = before | team_ids if sign > 0 else before - team_ids
+        # an account counts once however many teams of a hackathon it is in
+        moved = bool(after) - bool(before)
+        deltas[hackathon_id]["people_in_teams"] += moved
+        if participation in participations:
+            deltas[hackathon_id]["people_without_teams"] -= moved
+
+    for hackathon_id, counters in deltas.items():
+        change_stats(hackathon_id, **counters)
+
+
+async def get_stats(hackathon: Hackathon) -> HackathonStats:
+    stats = await HackathonStats.objects.filter(hackathon=hackathon).afirst()
+    if stats is None:
+        stats = await sync_to_async(rebuild_stats)(hackathon)
+
+    return stats
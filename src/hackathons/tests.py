@@ -0,0 +1,971 @@
+import csv
+import gzip
+import json
+import struct
+import uuid
+import zlib
+from io import BytesIO, StringIO
+from unittest.mock import patch
+from xml.etree import ElementTree
+from zipfile import ZipFile
+
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestAsyncClient
+from PIL import Image
+
+from accounts.models import Account, Email
+from hackathons.api import (
+    export_participants_hackathon,
+    hackathon_router,
+    my_hackathon_router,
+)
+from hackathons.entities import CoverVariant
+from hackathons.export import XLSX_NAMESPACE, ExportFormat
+from hackathons.images import COVER_SIZES, process_cover
+from hackathons.models import Cover, Hackathon, HackathonStats, UserRole
+from hackathons.services import (
+    CSVImportError,
+    get_emails_from_csv,
+    import_participants,
+)
+from hackathons.solver import Candidate, get_team_sizes, solve_teams
+from hackathons.stats import COUNTERS
+from megazord.context import context_request
+from megazord.db import close_pools
+from megazord.queries import log_queries
+from resumes.models import Resume
+from teams.models import Team
+
+
+class TestMyHackathonsAPI(TestCase):
+    def setUp(self) -> None:
+        self.api_client = TestAsyncClient(my_hackathon_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+
+    def create_hackathon(self, name: str) -> Hackathon:
+        hackathon = Hackathon.objects.create(
+            creator=self.user, name=name, description="test"
+        )
+        for i in range(3):
+            participant = Account.objects.create_user(
+                email=f"{name}_{i}@example.org",
+                username=f"{name}_{i}",
+                is_organizator=False,
+                password="test",
+            )
+            hackathon.participants.add(participant)
+            hackathon.emails.add(Email.objects.create(email=participant.email))
+            hackathon.roles.create(name=f"role_{i}")
+
+        return hackathon
+
+    def count_list_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(self.api_client.get)("/", user=self.user)
+
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    async def test_list_my_hackathons(self) -> None:
+        hackathon = await Hackathon.objects.acreate(
+            creator=self.user, name="single", description="test"
+        )
+        await hackathon.roles.acreate(name="backend")
+
+        response = await self.api_client.get("/", user=self.user)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["next_cursor"])
+        [hackathon_data] = response.json()["items"]
+        self.assertEqual(hackathon_data["id"], str(hackathon.id))
+        self.assertEqual(hackathon_data["roles"], ["backend"])
+        self.assertEqual(hackathon_data["creator"]["id"], str(self.user.id))
+        self.assertEqual(hackathon_data["participants_count"], 0)
+        self.assertNotIn("participants", hackathon_data)
+
+    def test_list_my_hackathons_pages(self) -> None:
+        for name in ("c", "a", "d", "b", "e"):
+            self.create_hackathon(name)
+
+        names = []
+        path = "/?limit=2"
+        while path is not None:
+            response = async_to_sync(self.api_client.get)(path, user=self.user)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page["items"]), 2)
+            names += [hackathon["name"] for hackathon in page["items"]]
+            path = page["next_cursor"] and f"/?limit=2&cursor={page['next_cursor']}"
+
+        self.assertEqual(names, ["a", "b", "c", "d", "e"])
+
+    def test_list_my_hackathons_fields(self) -> None:
+        self.create_hackathon("first")
+
+        response = async_to_sync(self.api_client.get)(
+            "/?fields=id,name,participants_count,emails_count", user=self.user
+        )
+
+        self.assertEqual(response.status_code, 200)
+        [hackathon_data] = response.json()["items"]
+        self.assertEqual(
+            hackathon_data,
+            {
+                "id": hackathon_data["id"],
+                "name": "first",
+                "participants_count": 3,
+                "emails_count": 3,
+            },
+        )
+
+    def test_hackathon_participants_and_emails(self) -> None:
+        hackathon = self.create_hackathon("first")
+        participant = hackathon.participants.first()
+        client = TestAsyncClient(hackathon_router)
+
+        participants = async_to_sync(client.get)(
+            f"/{hackathon.id}/participants?limit=2", user=participant
+        ).json()
+        self.assertEqual(
+            [profile["email"] for profile in participants["items"]],
+            ["first_0@example.org", "first_1@example.org"],
+        )
+        participants = async_to_sync(client.get)(
+            f"/{hackathon.id}/participants?cursor={participants['next_cursor']}",
+            user=participant,
+        ).json()
+        self.assertEqual(
+            [profile["email"] for profile in participants["items"]],
+            ["first_2@example.org"],
+        )
+
+        emails = async_to_sync(client.get)(
+            f"/{hackathon.id}/emails", user=self.user
+        ).json()
+        self.assertEqual(len(emails["items"]), 3)
+        response = async_to_sync(client.get)(
+            f"/{hackathon.id}/emails", user=participant
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_my_hackathons_queries_do_not_grow(self) -> None:
+        self.create_hackathon("first")
+        one_hackathon_queries = self.count_list_queries()
+
+        self.create_hackathon("second")
+        self.create_hackathon("third")
+        three_hackathons_queries = self.count_list_queries()
+
+        self.assertEqual(one_hackathon_queries, three_hackathons_queries)
+
+    def test_hackathon_not_modified(self) -> None:
+        client = TestAsyncClient(hackathon_router)
+        hackathon = self.create_hackathon("first")
+
+        def get(path: str, etag: str) -> int:
+            response = async_to_sync(client.get)(
+                path, headers={"If-None-Match": etag}, user=self.user
+            )
+            return response.status_code
+
+        etag = async_to_sync(client.get)(f"/{hackathon.id}", user=self.user)["ETag"]
+        self.assertEqual(get(f"/{hackathon.id}", etag), 304)
+
+        hackathon.participants.remove(hackathon.participants.first())
+        self.assertEqual(get(f"/{hackathon.id}", etag), 200)
+
+        revision = hackathon.revision
+        hackathon.name = "renamed"
+        hackathon.save(update_fields=["name"])
+        hackathon.refresh_from_db()
+        self.assertEqual(hackathon.revision, revision + 1)
+
+        etag = async_to_sync(self.api_client.get)("/", user=self.user)["ETag"]
+        self.assertEqual(
+            async_to_sync(self.api_client.get)(
+                "/", headers={"If-None-Match": etag}, user=self.user
+            ).status_code,
+            304,
+        )
+
+
+class TestCoversAPI(TestCase):
+    def setUp(self) -> None:
+        self.api_client = TestAsyncClient(hackathon_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.data = b"0123456789"
+
+    async def test_change_photo(self) -> None:
+        hackathon = await Hackathon.objects.acreate(
+            creator=self.user, name="test", description="test"
+        )
+        cover = SimpleUploadedFile(
+            "cover.png", make_image(size=(2400, 1200)), content_type="image/png"
+        )
+
+        response = await self.api_client.post(
+            f"/{hackathon.id}/change_photo",
+            FILES={"image_cover": cover},
+            user=self.user,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        variants = response.json()["image_cover_variants"]
+        self.assertEqual(set(variants), set(CoverVariant))
+        self.assertEqual(variants[CoverVariant.FULL], response.json()["image_cover"])
+        self.assertEqual(await Cover.objects.acount(), 3)
+
+    async def test_get_cover(self) -> None:
+        cover = await Cover.from_bytes(data=self.data, content_type="image/png")
+        hackathon = await Hackathon.objects.acreate(
+            creator=self.user, name="test", description="test", image_cover=cover
+        )
+        await Hackathon.objects.acreate(
+            creator=self.user,
+            name="duplicate",
+            description="test",
+            image_cover=await Cover.from_bytes(
+                data=self.data, content_type="image/png"
+            ),
+        )
+        self.assertEqual(await Cover.objects.acount(), 1)
+
+        response = await self.api_client.get(f"/{hackathon.id}", user=self.user)
+        cover_url = response.json()["image_cover"]
+        self.assertTrue(cover_url.endswith(f"/hackathons/covers/{cover.hash}"))
+
+        response = await self.api_client.get(f"/covers/{cover.hash}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.data)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["ETag"], f'"{cover.hash}"')
+        self.assertIn("immutable", response["Cache-Control"])
+
+    async def test_get_cover_not_modified(self) -> None:
+        cover = await Cover.from_bytes(data=self.data, content_type="image/png")
+
+        response = await self.api_client.get(
+            f"/covers/{cover.hash}", headers={"If-None-Match": f'"{cover.hash}"'}
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    async def test_get_cover_any_etag(self) -> None:
+        response = await self.api_client.get(
+            f"/covers/{'0' * 64}", headers={"If-None-Match": "*"}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_get_cover_range(self) -> None:
+        cover = await Cover.from_bytes(data=self.data, content_type="image/png")
+
+        response = await self.api_client.get(
+            f"/covers/{cover.hash}", headers={"Range": "bytes=2-4"}
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, b"234")
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+
+        response = await self.api_client.get(
+            f"/covers/{cover.hash}", headers={"Range": "bytes=-3"}
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, b"789")
+
+        response = await self.api_client.get(
+            f"/covers/{cover.hash}", headers={"Range": "bytes=20-"}
+        )
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+
+class TestParticipantsImport(TestCase):
+    def setUp(self) -> None:
+        self.api_client = TestAsyncClient(hackathon_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user, name="test", description="test"
+        )
+
+    def test_import_participants(self) -> None:
+        self.hackathon.emails.add(Email.objects.create(email="linked@example.org"))
+        Email.objects.create(email="existing@example.org")
+
+        report = import_participants(
+            hackathon=self.hackathon,
+            batches=[
+                [" new@example.org", "new@EXAMPLE.org", "existing@example.org"],
+                ["linked@example.org", "not an email", "new@example.org"],
+            ],
+        )
+
+        self.assertEqual(report.added, 2)
+        self.assertEqual(report.duplicates, 3)
+        self.assertEqual(report.invalid, ["not an email"])
+        self.assertEqual(
+            set(self.hackathon.emails.values_list("email", flat=True)),
+            {"new@example.org", "existing@example.org", "linked@example.org"},
+        )
+
+    def test_import_participants_queries_do_not_grow(self) -> None:
+        def count_queries(count: int) -> int:
+            emails = [f"user_{count}_{i}@example.org" for i in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                import_participants(hackathon=self.hackathon, batches=[emails])
+            return len(queries)
+
+        self.assertEqual(count_queries(1), count_queries(500))
+
+    async def test_upload_emails(self) -> None:
+        csv_file = SimpleUploadedFile(
+            "emails.csv",
+            "\ufeffone@example.org\ntwo@example.org\none@example.org\nbroken\n".encode(),
+            content_type="text/csv",
+        )
+
+        response = await self.api_client.post(
+            f"/{self.hackathon.id}/upload_emails",
+            FILES={"csv_file": csv_file},
+            user=self.user,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {"added": 2, "duplicates": 1, "invalid": ["broken"]}
+        )
+        self.assertEqual(await self.hackathon.emails.acount(), 2)
+
+    async def test_upload_emails_too_many_rows(self) -> None:
+        csv_file = SimpleUploadedFile(
+            "emails.csv", b"one@example.org\ntwo@example.org\n", content_type="text/csv"
+        )
+
+        with patch("hackathons.services.PARTICIPANTS_CSV_MAX_ROWS", 1):
+            response = await self.api_client.post(
+                f"/{self.hackathon.id}/upload_emails",
+                FILES={"csv_file": csv_file},
+                user=self.user,
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "CSV file has more than 1 rows")
+        # the import is rolled back as a whole
+        self.assertEqual(await self.hackathon.emails.acount(), 0)
+
+
+class TestEmailsCSV(SimpleTestCase):
+    def read(self, data: bytes, chunk_size: int = 4, **kwargs) -> list[list[str]]:
+        file = SimpleUploadedFile("emails.csv", data, content_type="text/csv")
+        file.DEFAULT_CHUNK_SIZE = chunk_size
+        return list(get_emails_from_csv(file, **kwargs))
+
+    def test_read_in_chunks(self) -> None:
+        data = '\ufeffone@example.org,One\r\n\r\n"two@example.org","Two\nлиния"\nthree@пример.рф'
+
+        self.assertEqual(
+            self.read(data.encode(), batch_size=2),
+            [["one@example.org", "two@example.org"], ["three@пример.рф"]],
+        )
+
+    def test_invalid_encoding(self) -> None:
+        with self.assertRaisesMessage(CSVImportError, "not encoded in UTF-8"):
+            self.read("one@example.org\n".encode("utf-16"))
+
+    @patch("hackathons.services.PARTICIPANTS_CSV_MAX_SIZE", 8)
+    def test_too_large(self) -> None:
+        with self.assertRaisesMessage(CSVImportError, "larger than 8 bytes"):
+            self.read(b"one@example.org\n")
+
+
+class TestExportAPI(TestCase):
+    def setUp(self) -> None:
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user, name="test", description="test"
+        )
+        self.role = self.hackathon.roles.create(name="backend")
+        self.add_team("first", members=2)
+
+    def add_participant(self, email: str) -> Account:
+        participant = Account.objects.create_user(
+            email=email,
+            username=email.split("@")[0],
+            is_organizator=False,
+            password="test",
+        )
+        self.hackathon.participants.add(participant)
+        Resume.objects.create(
+            user=participant,
+            hackathon=self.hackathon,
+            bio="test",
+            github=f"https://github.com/{participant.username}",
+        )
+        UserRole.objects.create(
+            role=self.role, user=participant, hackathon=self.hackathon
+        )
+        return participant
+
+    def add_team(self, name: str, members: int) -> None:
+        team = Team.objects.create(
+            hackathon=self.hackathon, name=name, creator=self.user
+        )
+        for i in range(members):
+            team.team_members.add(self.add_participant(f"{name}_{i}@example.org"))
+        self.add_participant(f"{name}_alone@example.org")
+
+    def export(self, **params) -> bytes:
+        request = RequestFactory().get("/")
+        request.user = self.user
+
+        async def read() -> bytes:
+            response = await export_participants_hackathon(
+                request, hackathon_id=self.hackathon.id, **params
+            )
+            self.assertIsInstance(response, StreamingHttpResponse)
+            return b"".join([chunk async for chunk in response])
+
+        return async_to_sync(read)()
+
+    def test_export_csv(self) -> None:
+        rows = list(csv.reader(StringIO(self.export().decode())))
+
+        self.assertEqual(
+            rows,
+            [
+                ["Team", "Email", "Full Name", "GitHub", "Role"],
+                [
+                    "first",
+                    "first_0@example.org",
+                    "first_0",
+                    "https://github.com/first_0",
+                    "backend",
+                ],
+                [
+                    "first",
+                    "first_1@example.org",
+                    "first_1",
+                    "https://github.com/first_1",
+                    "backend",
+                ],
+                [
+                    "No Team",
+                    "first_alone@example.org",
+                    "first_alone",
+                    "https://github.com/first_alone",
+                    "backend",
+                ],
+            ],
+        )
+
+    def test_export_queries_do_not_grow(self) -> None:
+        with CaptureQueriesContext(connection) as one_team_queries:
+            self.export()
+
+        self.add_team("second", members=5)
+        with CaptureQueriesContext(connection) as two_teams_queries:
+            self.export()
+
+        self.assertEqual(len(one_team_queries), len(two_teams_queries))
+
+    def test_export_gzip(self) -> None:
+        self.assertEqual(gzip.decompress(self.export(gzip=True)), self.export())
+
+    def test_export_jsonl(self) -> None:
+        lines = self.export(file_format=ExportFormat.JSONL).decode().splitlines()
+
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            json.loads(lines[-1]),
+            {
+                "team": "No Team",
+                "email": "first_alone@example.org",
+                "full_name": "first_alone",
+                "github": "https://github.com/first_alone",
+                "role": "backend",
+            },
+        )
+
+    def test_export_xlsx(self) -> None:
+        data = self.export(file_format=ExportFormat.XLSX)
+
+        with ZipFile(BytesIO(data)) as archive:
+            self.assertIn("xl/workbook.xml", archive.namelist())
+            sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+
+        namespace = {"x": XLSX_NAMESPACE}
+        rows = [
+            [cell.text for cell in row.iterfind("x:c/x:is/x:t", namespace)]
+            for row in sheet.iterfind("x:sheetData/x:row", namespace)
+        ]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0], ["Team", "Email", "Full Name", "GitHub", "Role"])
+        self.assertEqual(rows[1][:2], ["first", "first_0@example.org"])
+
+
+class TestHackathonStats(TestCase):
+    def setUp(self) -> None:
+        self.api_client = TestAsyncClient(hackathon_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user, name="test", description="test", max_participants=2
+        )
+        self.participants = [self.add_participant(i) for i in range(4)]
+
+    def add_participant(self, number: int) -> Account:
+        participant = Account.objects.create_user(
+            email=f"participant_{number}@example.org",
+            username=f"participant_{number}",
+            is_organizator=False,
+            password="test",
+        )
+        self.hackathon.emails.add(Email.objects.create(email=participant.email))
+        self.hackathon.participants.add(participant)
+        return participant
+
+    def get_stats(self) -> dict[str, int]:
+        stats = HackathonStats.objects.get(hackathon=self.hackathon)
+        return {name: getattr(stats, name) for name in COUNTERS}
+
+    def assert_stats_are_fresh(self) -> None:
+        self.assertEqual(
+            self.get_stats(),
+            {name: count(self.hackathon) for name, count in COUNTERS.items()},
+        )
+
+    def test_stats_follow_changes(self) -> None:
+        self.assertEqual(
+            self.get_stats(),
+            {
+                "total_teams": 0,
+                "full_teams": 0,
+                "people_in_teams": 0,
+                "people_without_teams": 4,
+                "invited": 4,
+                "accepted": 4,
+            },
+        )
+
+        team = Team.objects.create(
+            hackathon=self.hackathon, name="first", creator=self.participants[0]
+        )
+        team.team_members.add(*self.participants[:2])
+        self.assert_stats_are_fresh()
+        self.assertEqual(self.get_stats()["full_teams"], 1)
+
+        team.team_members.remove(self.participants[1])
+        self.assert_stats_are_fresh()
+
+        self.participants[2].team_members.add(team)
+        self.assert_stats_are_fresh()
+
+        self.hackathon.max_participants = 3
+        self.hackathon.save()
+        self.assert_stats_are_fresh()
+        self.assertEqual(self.get_stats()["full_teams"], 0)
+
+        self.hackathon.participants.remove(self.participants[3])
+        self.assert_stats_are_fresh()
+
+        import_participants(hackathon=self.hackathon, batches=[["invited@example.org"]])
+        self.assert_stats_are_fresh()
+
+        team.delete()
+        self.assert_stats_are_fresh()
+        self.assertEqual(self.get_stats()["total_teams"], 0)
+
+    def test_stats_follow_removals_from_other_sides(self) -> None:
+        first = Team.objects.create(
+            hackathon=self.hackathon, name="first", creator=self.participants[0]
+        )
+        first.team_members.add(*self.participants[:2])
+        second = Team.objects.create(
+            hackathon=self.hackathon, name="second", creator=self.participants[2]
+        )
+        second.team_members.add(self.participants[2])
+
+        self.participants[1].hackathons.clear()
+        self.assert_stats_are_fresh()
+
+        self.participants[2].team_members.clear()
+        self.assert_stats_are_fresh()
+
+        Email.objects.get(email=self.participants[3].email).delete()
+        self.assert_stats_are_fresh()
+
+        # memberships and the created team go with the account
+        self.participants[0].delete()
+        self.assert_stats_are_fresh()
+        self.assertEqual(self.get_stats()["total_teams"], 1)
+
+        second.delete()
+        self.assert_stats_are_fresh()
+
+    def test_membership_changes_do_not_recount(self) -> None:
+        team = Team.objects.create(
+            hackathon=self.hackathon, name="first", creator=self.participants[0]
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            team.team_members.add(self.participants[0])
+
+        # only the size of the changed team is counted
+        counts = [query["sql"] for query in queries if "COUNT(" in query["sql"]]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('"size"', counts[0])
+        self.assert_stats_are_fresh()
+
+    def test_rebuild_stats(self) -> None:
+        HackathonStats.objects.filter(hackathon=self.hackathon).update(
+            accepted=0, invited=0
+        )
+
+        out = StringIO()
+        call_command("rebuild_hackathon_stats", str(self.hackathon.id), stdout=out)
+
+        self.assertIn("Rebuilt stats of 1 hackathons", out.getvalue())
+        self.assert_stats_are_fresh()
+
+    def test_summary_queries_do_not_grow(self) -> None:
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as queries:
+                response = async_to_sync(self.api_client.get)(
+                    f"/{self.hackathon.id}/summary", user=self.user
+                )
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        few_participants_queries = count_queries()
+        for i in range(4, 20):
+            self.add_participant(i)
+
+        self.assertEqual(few_participants_queries, count_queries())
+
+    async def test_people_without_teams(self) -> None:
+        team = await Team.objects.acreate(
+            hackathon=self.hackathon, name="first", creator=self.participants[0]
+        )
+        await team.team_members.aadd(self.participants[0])
+
+        response = await self.api_client.get(
+            f"/{self.hackathon.id}/people_without_teams?limit=2&offset=1",
+            user=self.user,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual(page["count"], 3)
+        self.assertEqual(
+            [profile["email"] for profile in page["items"]],
+            ["participant_2@example.org", "participant_3@example.org"],
+        )
+
+        response = await self.api_client.get(
+            f"/{self.hackathon.id}/summary", user=self.user
+        )
+        self.assertEqual(response.json()["people_without_teams_count"], 3)
+
+
+@patch("megazord.db.DATABASE_ASYNC_READS", True)
+class TestNativeReads(TransactionTestCase):
+    """
+    Native reads do not see the transactions of test cases,
+    the rows are committed here.
+    """
+
+    def setUp(self) -> None:
+        self.api_client = TestAsyncClient(hackathon_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user, name="test", description="test", max_participants=2
+        )
+        self.hackathon.roles.create(name="backend")
+        for i in range(3):
+            participant = Account.objects.create_user(
+                email=f"participant_{i}@example.org",
+                username=f"participant_{i}",
+                is_organizator=False,
+                password="test",
+            )
+            self.hackathon.emails.add(Email.objects.create(email=participant.email))
+            self.hackathon.participants.add(participant)
+            team = Team.objects.create(
+                hackathon=self.hackathon, name=f"team_{i}", creator=participant
+            )
+            team.team_members.add(participant, self.user)
+
+    async def test_hackathon_entity(self) -> None:
+        entity = await Hackathon.fetch_entity(self.hackathon.id)
+        missing = await Hackathon.fetch_entity(uuid.uuid4())
+        await close_pools()
+
+        hackathon = await Hackathon.objects.select_related("creator").aget(
+            id=self.hackathon.id
+        )
+        self.assertEqual(entity, await hackathon.to_entity())
+        self.assertIsNone(missing)
+
+    async def test_team_entities(self) -> None:
+        teams = Team.objects.filter(hackathon=self.hackathon).order_by("name")
+
+        expands = (None, [], ["team_members"])
+        entities = [await Team.fetch_entities(teams, expand) for expand in expands]
+        await close_pools()
+
+        for expand, expand_entities in zip(expands, entities):
+            self.assertEqual(expand_entities, await Team.to_entities(teams, expand))
+
+    async def test_queries_are_logged(self) -> None:
+        with log_queries() as query_log:
+            await Hackathon.fetch_entity(self.hackathon.id)
+        await close_pools()
+
+        self.assertEqual(query_log.count, 5)
+        self.assertGreater(query_log.duration, 0)
+        self.assertFalse(query_log.get_duplicates())
+
+    async def test_summary(self) -> None:
+        response = await self.api_client.get(
+            f"/{self.hackathon.id}/summary", user=self.user
+        )
+        await close_pools()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["people_without_teams_count"], 0)
+        self.assertEqual(response.json()["total_teams"], 3)
+
+
+class TestTeamsSolver(SimpleTestCase):
+    def test_team_sizes(self) -> None:
+        self.assertEqual(get_team_sizes(10, min_size=3, max_size=5), [5, 5])
+        self.assertEqual(get_team_sizes(11, min_size=3, max_size=5), [4, 4, 3])
+        self.assertEqual(get_team_sizes(7, min_size=4, max_size=4), [4])
+        self.assertEqual(get_team_sizes(2, min_size=3, max_size=5), [])
+
+    def test_teams_cover_roles(self) -> None:
+        candidates = [
+            Candidate(id=f"{role}_{i}", role=role, skills=frozenset({f"skill_{i}"}))
+            for role in ("backend", "frontend", "design")
+            for i in range(3)
+        ] + [Candidate(id="no_role")]
+
+        assignment = solve_teams(candidates, min_size=3, max_size=3, time_budget=1)
+
+        self.assertEqual([len(team) for team in assignment.teams], [3, 3, 3])
+        self.assertEqual(assignment.unassigned, [Candidate(id="no_role")])
+        for team in assignment.teams:
+            self.assertEqual(
+                {candidate.role for candidate in team},
+                {"backend", "frontend", "design"},
+            )
+
+
+class TestTeamsFormationAPI(TestCase):
+    def setUp(self) -> None:
+        context_request.set(
+            RequestFactory().get("/", HTTP_ORIGIN="https://megazord.example")
+        )
+        self.api_client = TestAsyncClient(hackathon_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user,
+            name="test",
+            description="test",
+            min_participants=2,
+            max_participants=2,
+        )
+        self.participants = []
+        for i, role in enumerate(["backend", "backend", "frontend", "frontend", None]):
+            participant = Account.objects.create_user(
+                email=f"participant_{i}@example.org",
+                username=f"participant_{i}",
+                is_organizator=False,
+                password="test",
+            )
+            self.hackathon.participants.add(participant)
+            if role is not None:
+                UserRole.objects.create(
+                    role=self.hackathon.roles.get_or_create(name=role)[0],
+                    user=participant,
+                    hackathon=self.hackathon,
+                )
+            self.participants.append(participant)
+
+    def test_preview_teams(self) -> None:
+        response = async_to_sync(self.api_client.post)(
+            f"/{self.hackathon.id}/form_teams/preview?time_budget=0.5",
+            user=self.user,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        formation = response.json()
+        self.assertEqual(len(formation["teams"]), 2)
+        for team in formation["teams"]:
+            self.assertEqual(team["roles"], ["backend", "frontend"])
+        self.assertEqual(
+            [profile["email"] for profile in formation["unassigned"]],
+            ["participant_4@example.org"],
+        )
+        self.assertFalse(Team.objects.filter(hackathon=self.hackathon).exists())
+
+    def commit(self, teams: list[tuple[str, list[Account]]]):
+        return async_to_sync(self.api_client.post)(
+            f"/{self.hackathon.id}/form_teams",
+            json={
+                "teams": [
+                    {"name": name, "members": [str(member.id) for member in members]}
+                    for name, members in teams
+                ]
+            },
+            user=self.user,
+        )
+
+    def test_commit_teams(self) -> None:
+        first, second, third, fourth, _ = self.participants
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.commit(
+                [("first", [first, third]), ("second", [second, fourth])]
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            {
+                team.name: {member.email for member in team.team_members.all()}
+                for team in Team.objects.filter(hackathon=self.hackathon)
+            },
+            {
+                "first": {first.email, third.email},
+                "second": {second.email, fourth.email},
+            },
+        )
+        self.assertEqual(
+            HackathonStats.objects.get(hackathon=self.hackathon).full_teams, 2
+        )
+        self.assertEqual(
+            sum(
+                "INSERT" in query["sql"] and "teams_team" in query["sql"]
+                for query in queries
+            ),
+            2,
+        )
+
+    def test_commit_teams_checks_members(self) -> None:
+        first, second, third, *_ = self.participants
+        self.commit([("first", [first, second])])
+
+        response = self.commit([("second", [second, third])])
+        self.assertEqual(response.status_code, 400)
+
+        response = self.commit([("third", [third])])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Team.objects.filter(hackathon=self.hackathon).count(), 1)
+
+
+def make_image(size: tuple[int, int], format: str = "PNG", **params) -> bytes:
+    output = BytesIO()
+    Image.new("RGB", size, color="red").save(output, format=format, **params)
+    return output.getvalue()
+
+
+def make_png_header(size: tuple[int, int]) -> bytes:
+    """
+    A PNG which only claims its size, the pixels are never there.
+    """
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    header = struct.pack(">IIBBBBB", *size, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b""))
+        + chunk(b"IEND", b"")
+    )
+
+
+class TestCoverProcessing(SimpleTestCase):
+    def test_process_cover(self) -> None:
+        exif = Image.Exif()
+        exif[0x010F] = "camera"  # Make
+        data = make_image(size=(4000, 3000), format="JPEG", exif=exif.tobytes())
+
+        variants = process_cover(data)
+
+        self.assertEqual(set(variants), set(CoverVariant))
+        for variant, processed in variants.items():
+            with Image.open(BytesIO(processed.data)) as image:
+                max_width, max_height = COVER_SIZES[variant]
+                self.assertLessEqual(image.width, max_width)
+                self.assertLessEqual(image.height, max_height)
+                self.assertNotIn("exif", image.info)
+
+    def test_process_cover_does_not_upscale(self) -> None:
+        variants = process_cover(make_image(size=(100, 50)))
+
+        with Image.open(BytesIO(variants[CoverVariant.FULL].data)) as image:
+            self.assertEqual(image.size, (100, 50))
+
+    def test_process_invalid_cover(self) -> None:
+        with self.assertRaises(ValueError):
+            process_cover(b"not an image")
+
+    def test_process_cover_too_many_pixels(self) -> None:
+        for size in ((8000, 8000), (20000, 20000)):
+            with self.assertRaisesMessage(ValueError, "Cover resolution is too large"):
+                process_cover(make_png_header(size))
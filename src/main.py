@@ -1,10 +1,18 @@
+from pathlib import Path
+
 import uvicorn
 
 from megazord import settings
 
+# values of the previous run must not be summed up with the new ones
+if settings.PROMETHEUS_MULTIPROC_DIR:
+    for values in Path(settings.PROMETHEUS_MULTIPROC_DIR).glob("*.db"):
+        values.unlink()
+
 uvicorn.run(
     app="megazord.asgi:application",
     reload=settings.RELOAD,
     host=settings.SERVER_HOST,
     port=settings.SERVER_PORT,
+    workers=settings.SERVER_WORKERS,
 )
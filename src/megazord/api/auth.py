@@ -2,12 +2,11 @@ import uuid
 from datetime import datetime, timedelta, timezone
 
 import jwt
-from django.core.exceptions import ObjectDoesNotExist
 from ninja.security import HttpBearer
 
-from accounts.models import Account
 from megazord.settings import SECRET_KEY
 
+from .principals import principals
 from .requests import APIRequest
 
 JWT_ALGORITHM = "HS256"
@@ -44,9 +43,14 @@ class AuthBearer(HttpBearer):
         if not user_id:
             raise InvalidToken
 
-        try:
-            user = await Account.objects.aget(id=user_id)
-        except ObjectDoesNotExist:
+        token_version = jwt_data.get("ver", 0)
+        user = await principals.get(user_id)
+        if user is not None and user.token_version < token_version:
+            # the token is newer than the cached account
+            await principals.invalidate(user_id)
+            user = await principals.get(user_id)
+
+        if user is None or user.token_version != token_version:
             raise InvalidToken
 
         request.user = user
@@ -55,11 +59,14 @@ class AuthBearer(HttpBearer):
 
 
 def create_jwt(
-    user_id: uuid.UUID, expires_delta: timedelta = timedelta(weeks=4)
+    user_id: uuid.UUID,
+    token_version: int = 0,
+    expires_delta: timedelta = timedelta(weeks=4),
 ) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
     jwt_data = {
         "user_id": str(user_id),
+        "ver": token_version,
         "iat": datetime.now(timezone.utc).timestamp(),
         "exp": expire,
     }
@@ -0,0 +1,119 @@
+import functools
+import hashlib
+import json
+import uuid
+from typing import Any, Awaitable, Callable, Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from ninja import Schema
+from pydantic_core import to_jsonable_python
+
+from megazord.api.requests import APIRequest
+from megazord.settings import RESPONSE_CACHE_TIMEOUT
+
+
+def get_version_key(name: str, *ids: Any) -> str:
+    return ":".join(["version", name, *map(str, ids)])
+
+
+def bump_versions(*keys: str) -> None:
+    """
+    Give the rows new versions once the change is committed, responses
+    cached for the old ones are not read anymore and expire.
+    """
+    # a request reading the rows before the commit would cache them
+    # under the new version
+    transaction.on_commit(
+        lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+    )
+
+
+async def get_versions(keys: list[str]) -> list[str]:
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        # a version that has been evicted starts over from a new one
+        if key not in versions:
+            version = uuid.uuid4().hex
+            if not await cache.aadd(key, version, timeout=None):
+                version = await cache.aget(key, version)
+            versions[key] = version
+
+    return [versions[key] for key in keys]
+
+
+def render_result(result: Any, schema: type[Schema] | None) -> Any:
+    """
+    Render a successful result of an operation to a JSON response,
+    other results are left to ninja.
+    """
+    if isinstance(result, HttpResponse):
+        return result
+
+    status, data = result if isinstance(result, tuple) else (200, result)
+    if status != 200:
+        return result
+
+    content = json.dumps(schema.model_validate(data).model_dump(mode="json"))
+    return HttpResponse(content, content_type="application/json")
+
+
+def is_cacheable(response: HttpResponse) -> bool:
+    return response.status_code == 200 and not response.streaming
+
+
+def shared_scope(request: APIRequest) -> str:
+    """
+    Every user gets the same response.
+    """
+    return "shared"
+
+
+def user_scope(request: APIRequest) -> str:
+    return f"user:{request.user.id}"
+
+
+def cache_response(
+    depends: Callable[..., Iterable[str]],
+    schema: type[Schema] | None = None,
+    scope: Callable[[APIRequest], str] = user_scope,
+    timeout: int = RESPONSE_CACHE_TIMEOUT,
+) -> Callable[[Callable[..., Awaitable]], Callable[..., Awaitable]]:
+    """
+    Cache successful responses of a GET operation as JSON.
+
+    The key is made of the operation, its parameters, the scope of
+    the user and the versions of the rows named by `depends`, which gets
+    the parameters of the operation. `schema` serializes results which
+    are not responses already.
+    """
+
+    def decorator(view: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        @functools.wraps(view)
+        async def wrapper(request: APIRequest, **kwargs) -> Any:
+            versions = await get_versions(list(depends(**kwargs)))
+            digest = hashlib.sha256(
+                "\0".join(
+                    [
+                        scope(request),
+                        json.dumps(to_jsonable_python(kwargs), sort_keys=True),
+                        *versions,
+                    ]
+                ).encode()
+            ).hexdigest()
+            key = f"response:{view.__module__}.{view.__name__}:{digest}"
+
+            content = await cache.aget(key)
+            if content is not None:
+                return HttpResponse(content, content_type="application/json")
+
+            response = render_result(await view(request, **kwargs), schema)
+            if isinstance(response, HttpResponse) and is_cacheable(response):
+                await cache.aset(key, response.content, timeout=timeout)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,104 @@
+import functools
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from django.db.models import Count, Max, QuerySet, Sum
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+from ninja import Schema
+from pydantic_core import to_jsonable_python
+
+from megazord.api.caching import render_result
+from megazord.api.requests import APIRequest
+
+
+class Revisions(NamedTuple):
+    """
+    State of the rows a response is built from.
+    """
+
+    values: list[Any]
+    updated_at: datetime | None
+
+    def get_etag(self) -> str:
+        data = json.dumps(to_jsonable_python(self.values))
+        return f'"{hashlib.sha256(data.encode()).hexdigest()[:32]}"'
+
+
+async def get_revisions(
+    *querysets: QuerySet, required: bool = False
+) -> Revisions | None:
+    """
+    Number of rows, sum of their revisions and the last change
+    of every queryset, each of them is a single query. With `required`
+    there are no revisions when the first queryset is empty.
+    """
+    values = []
+    updated_at = None
+    for queryset in querysets:
+        state = await queryset.aaggregate(
+            count=Count("pk"), revision=Sum("revision"), updated_at=Max("updated_at")
+        )
+        if required and not values and not state["count"]:
+            return None
+
+        values.extend(state.values())
+        if state["updated_at"] is not None:
+            updated_at = max(updated_at or state["updated_at"], state["updated_at"])
+
+    return Revisions(values, updated_at)
+
+
+def is_not_modified(request: APIRequest, etag: str) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is None:
+        return False
+
+    etags = [etag.removeprefix("W/") for etag in parse_etags(if_none_match)]
+    return "*" in etags or etag in etags
+
+
+def set_validators(response: HttpResponse, revisions: Revisions) -> HttpResponse:
+    response["ETag"] = revisions.get_etag()
+    if revisions.updated_at is not None:
+        response["Last-Modified"] = http_date(revisions.updated_at.timestamp())
+    return response
+
+
+def conditional(
+    state: Callable[..., Awaitable[Revisions | None]],
+    schema: type[Schema] | None = None,
+) -> Callable[[Callable[..., Awaitable]], Callable[..., Awaitable]]:
+    """
+    Answer GET operations with strong ETags built from revisions of rows.
+
+    `state` gets the request and the parameters of the operation and
+    returns the revisions of the rows the response is built from, or `None`
+    when there is nothing to compare (the operation then answers as usual,
+    e.g. with 404).
+    A matching `If-None-Match` is answered with 304 before the operation
+    runs. `Last-Modified` is sent for information only, deletions do not
+    move it, so `If-Modified-Since` is not used.
+    """
+
+    def decorator(view: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        @functools.wraps(view)
+        async def wrapper(request: APIRequest, **kwargs) -> Any:
+            revisions = await state(request, **kwargs)
+            if revisions is None:
+                return await view(request, **kwargs)
+
+            if is_not_modified(request, revisions.get_etag()):
+                return set_validators(HttpResponseNotModified(), revisions)
+
+            response = render_result(await view(request, **kwargs), schema)
+            if isinstance(response, HttpResponse) and response.status_code == 200:
+                set_validators(response, revisions)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,134 @@
+import base64
+import binascii
+import json
+from typing import Any, Collection, Generic, Iterable, Sequence, TypeVar
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, Q, QuerySet
+from django.http import JsonResponse
+from ninja import Field, Schema
+
+from megazord.db import fetch_rows
+
+T = TypeVar("T")
+
+
+class InvalidListParams(ValueError):
+    pass
+
+
+class CursorPage(Schema, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+
+
+class ListParams(Schema):
+    cursor: str | None = Field(None, description="`next_cursor` of the previous page")
+    limit: int = Field(20, ge=1, le=100)
+    fields: str | None = Field(None, description="Comma separated fields to return")
+    expand: str | None = Field(
+        None, description="Comma separated nested collections to return"
+    )
+
+    def get_expand(self, expandable: Collection[str]) -> set[str]:
+        expand = split_names(self.expand)
+        if unknown := expand - set(expandable):
+            raise InvalidListParams(f"Cannot expand {', '.join(sorted(unknown))}")
+
+        return expand
+
+    def get_include(
+        self, schema: type[Schema], expandable: Collection[str]
+    ) -> set[str]:
+        """
+        Fields of the schema to return, nested collections
+        are returned only when they are expanded.
+        """
+        if self.fields is None:
+            fields = set(schema.model_fields)
+        elif unknown := split_names(self.fields) - set(schema.model_fields):
+            raise InvalidListParams(f"Unknown fields {', '.join(sorted(unknown))}")
+        else:
+            fields = split_names(self.fields)
+
+        return fields - (set(expandable) - self.get_expand(expandable))
+
+
+def split_names(names: str | None) -> set[str]:
+    if not names:
+        return set()
+
+    return {name.strip() for name in names.split(",") if name.strip()}
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    data = json.dumps(list(values), cls=DjangoJSONEncoder).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error):
+        raise InvalidListParams("Cursor is not valid")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidListParams("Cursor is not valid")
+
+    return values
+
+
+def after(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+    """
+    Rows following the given ordering values,
+    (a, b) > (x, y) is a > x or a = x and b > y.
+    """
+    condition = Q(**{f"{ordering[-1]}__gt": values[-1]})
+    for field, value in zip(ordering[-2::-1], values[-2::-1]):
+        condition = Q(**{f"{field}__gt": value}) | Q(**{field: value}) & condition
+
+    return condition
+
+
+async def paginate[M: Model](
+    queryset: QuerySet[M], params: ListParams, ordering: Sequence[str]
+) -> tuple[QuerySet[M], str | None]:
+    """
+    Keyset pagination, `ordering` must end with a unique field.
+    Returns the page queryset and the cursor of the next page.
+    """
+    queryset = queryset.order_by(*ordering)
+    if params.cursor is not None:
+        queryset = queryset.filter(
+            after(ordering, decode_cursor(params.cursor, len(ordering)))
+        )
+
+    # only the ordering columns are read to find the page
+    keys = await fetch_rows(queryset.values_list("pk", *ordering)[: params.limit + 1])
+    next_cursor = None
+    if len(keys) > params.limit:
+        keys = keys[: params.limit]
+        next_cursor = encode_cursor(keys[-1][1:])
+
+    page = queryset.model.objects.filter(pk__in=[key[0] for key in keys])
+    return page.order_by(*ordering), next_cursor
+
+
+def render_page(
+    schema: type[Schema],
+    items: Iterable[Any],
+    include: set[str],
+    next_cursor: str | None,
+) -> JsonResponse:
+    """
+    Response with a page of items, where every item has only included fields.
+    """
+    return JsonResponse(
+        {
+            "items": [
+                schema.model_validate(item).model_dump(mode="json", include=include)
+                for item in items
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
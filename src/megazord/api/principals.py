@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from django.core.cache import BaseCache, caches
+
+from accounts.models import Account
+from megazord.db import fetch_first
+from megazord.settings import (
+    PRINCIPAL_CACHE_SHARED,
+    PRINCIPAL_CACHE_SIZE,
+    PRINCIPAL_CACHE_TTL,
+)
+
+type Row = list[Any]
+
+
+def dump_account(account: Account) -> Row:
+    return [getattr(account, field.attname) for field in Account._meta.concrete_fields]
+
+
+def load_account(row: Row) -> Account:
+    # every request gets its own instance, so changes made by a view
+    # do not leak into the cache
+    return Account.from_db(
+        "default", [field.attname for field in Account._meta.concrete_fields], row
+    )
+
+
+class PrincipalCache:
+    """
+    Accounts of authenticated requests by id, kept for `ttl` seconds
+    in a per-process LRU and, when `shared` names a cache, in that cache.
+    Invalidation clears the local and the shared entries, other processes
+    may serve their local entry until it expires.
+    """
+
+    def __init__(self, ttl: float, size: int, shared: str | None = None) -> None:
+        self.ttl = ttl
+        self.size = size
+        self.shared = shared
+        self._rows: OrderedDict[str, tuple[float, Row]] = OrderedDict()
+
+    @staticmethod
+    def get_key(user_id: str) -> str:
+        return f"principal:{user_id}"
+
+    def get_shared(self) -> BaseCache | None:
+        return caches[self.shared] if self.shared else None
+
+    def get_local(self, user_id: str) -> Row | None:
+        entry = self._rows.get(user_id)
+        if entry is None:
+            return None
+
+        expires, row = entry
+        if expires < time.monotonic():
+            del self._rows[user_id]
+            return None
+
+        self._rows.move_to_end(user_id)
+        return row
+
+    def set_local(self, user_id: str, row: Row) -> None:
+        self._rows[user_id] = (time.monotonic() + self.ttl, row)
+        self._rows.move_to_end(user_id)
+        while len(self._rows) > self.size:
+            self._rows.popitem(last=False)
+
+    async def get(self, user_id: str) -> Account | None:
+        row = self.get_local(user_id)
+        shared = self.get_shared()
+        if row is None and shared is not None:
+            row = await shared.aget(self.get_key(user_id))
+            if row is not None:
+                self.set_local(user_id, row)
+
+        if row is None:
+            account = await fetch_first(Account.objects.filter(id=user_id))
+            if account is None:
+                return None
+
+            row = dump_account(account)
+            self.set_local(user_id, row)
+            if shared is not None:
+                await shared.aset(self.get_key(user_id), row, timeout=self.ttl)
+
+        return load_account(row)
+
+    async def invalidate(self, user_id: Any) -> None:
+        self._rows.pop(str(user_id), None)
+        if (shared := self.get_shared()) is not None:
+            await shared.adelete(self.get_key(str(user_id)))
+
+    def clear(self) -> None:
+        self._rows.clear()
+
+
+principals = PrincipalCache(
+    ttl=PRINCIPAL_CACHE_TTL,
+    size=PRINCIPAL_CACHE_SIZE,
+    shared=PRINCIPAL_CACHE_SHARED or None,
+)
@@ -0,0 +1,144 @@
+"""
+Native async reads. Querysets are compiled by Django and run on
+a psycopg connection of the running event loop, without the thread hop
+of the async ORM methods. Async code does not run transactions, they
+are made by sync code, which reads through the ORM.
+"""
+
+import asyncio
+import time
+import weakref
+from typing import Any
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.db.models.sql.compiler import SQLCompiler
+from psycopg import AsyncClientCursor, AsyncConnection
+from psycopg_pool import AsyncConnectionPool
+
+from megazord.queries import current_query_log
+from megazord.settings import (
+    DATABASE_ASYNC_READS,
+    DATABASE_POOL_MAX_IDLE,
+    DATABASE_POOL_MAX_SIZE,
+    DATABASE_POOL_MIN_SIZE,
+    DATABASE_POOL_TIMEOUT,
+)
+
+type Row = tuple[Any, ...]
+
+# pools can not be shared by event loops, every loop gets its own
+_pools: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, asyncio.Task[AsyncConnectionPool]]
+] = weakref.WeakKeyDictionary()
+
+
+def uses_orm() -> bool:
+    return not DATABASE_ASYNC_READS
+
+
+async def open_pool(alias: str) -> AsyncConnectionPool:
+    wrapper = connections[alias]
+    # the same parameters and type adapters as the connections of the ORM
+    params = wrapper.get_connection_params()
+    params["cursor_factory"] = AsyncClientCursor
+    params["autocommit"] = True
+
+    async def configure(connection: AsyncConnection) -> None:
+        if wrapper.timezone_name:
+            await connection.execute(
+                wrapper.ops.set_time_zone_sql(), [wrapper.timezone_name]
+            )
+        if role_name := wrapper.settings_dict["OPTIONS"].get("assume_role"):
+            await connection.execute(
+                wrapper.ops.compose_sql("SET ROLE %s", [role_name])
+            )
+
+    # connections are checked when taken out, as those of the ORM,
+    # a dead one is replaced instead of failing the read
+    pool = AsyncConnectionPool(
+        kwargs=params,
+        open=False,
+        configure=configure,
+        check=AsyncConnectionPool.check_connection,
+        min_size=DATABASE_POOL_MIN_SIZE,
+        max_size=DATABASE_POOL_MAX_SIZE,
+        timeout=DATABASE_POOL_TIMEOUT,
+        max_idle=DATABASE_POOL_MAX_IDLE,
+        name=f"async-{alias}",
+    )
+    await pool.open()
+    return pool
+
+
+async def get_pool(alias: str) -> AsyncConnectionPool:
+    pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    if alias not in pools:
+        # concurrent callers wait for the same pool to open
+        pools[alias] = asyncio.ensure_future(open_pool(alias))
+    return await pools[alias]
+
+
+async def execute(queryset: QuerySet) -> tuple[SQLCompiler, list[Row]]:
+    compiler = queryset.query.get_compiler(queryset.db)
+    try:
+        sql, params = compiler.as_sql()
+    except EmptyResultSet:
+        return compiler, []
+
+    pool = await get_pool(queryset.db)
+    async with pool.connection() as connection:
+        # the pool is not a connection of Django, its queries are
+        # recorded here the same way `record_query` does
+        query_log = current_query_log.get()
+        start = time.perf_counter()
+        try:
+            cursor = await connection.execute(sql, params)
+            return compiler, await cursor.fetchall()
+        finally:
+            if query_log is not None:
+                query_log.add(sql, time.perf_counter() - start)
+
+
+async def fetch_rows(queryset: QuerySet) -> list[Row]:
+    """
+    Rows of a `values_list` queryset.
+    """
+    if uses_orm():
+        return [row async for row in queryset]
+
+    _, rows = await execute(queryset)
+    return rows
+
+
+async def fetch[M: Model](queryset: QuerySet[M]) -> list[M]:
+    """
+    Instances of a queryset, related objects are not loaded.
+    """
+    if uses_orm():
+        return [instance async for instance in queryset]
+
+    compiler, rows = await execute(queryset)
+    if not rows:
+        return []
+
+    # the columns of the model, as ModelIterable picks them
+    fields = compiler.klass_info["select_fields"]
+    start, end = fields[0], fields[-1] + 1
+    names = [column.target.attname for column, *_ in compiler.select[start:end]]
+    return [queryset.model.from_db(queryset.db, names, row[start:end]) for row in rows]
+
+
+async def fetch_first[M: Model](queryset: QuerySet[M]) -> M | None:
+    instances = await fetch(queryset[:1])
+    return instances[0] if instances else None
+
+
+async def close_pools() -> None:
+    """
+    Close the pools of the running event loop.
+    """
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await (await pool).close()
@@ -0,0 +1,89 @@
+"""
+Prometheus metrics. With several workers `PROMETHEUS_MULTIPROC_DIR`
+must point to a directory shared by them, every process writes its
+values there and `/metrics` of any worker sums them up.
+"""
+
+from django.http import HttpRequest, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from megazord.settings import PROMETHEUS_MULTIPROC_DIR
+
+# routes that are not matched are counted together,
+# so unknown paths can not blow up the number of series
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_DURATION = Histogram(
+    "megazord_request_duration_seconds",
+    "Time to build the response of a request",
+    ["operation", "method", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "megazord_requests_in_progress",
+    "Requests being handled",
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Histogram(
+    "megazord_db_queries",
+    "Database queries made by a request",
+    ["operation"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+DB_DURATION = Histogram(
+    "megazord_db_duration_seconds",
+    "Time a request spent in the database",
+    ["operation"],
+)
+NOTIFICATIONS_SENT = Counter(
+    "megazord_notifications_sent",
+    "Notifications sent to a channel",
+    ["channel", "result"],
+)
+NOTIFICATION_SEND_DURATION = Histogram(
+    "megazord_notification_send_duration_seconds",
+    "Time to send a notification to a channel",
+    ["channel"],
+)
+TELEGRAM_RATE_LIMITED = Counter(
+    "megazord_telegram_rate_limited",
+    "Telegram requests rejected with 429 Too Many Requests",
+)
+TELEGRAM_LIMITER_WAIT = Histogram(
+    "megazord_telegram_limiter_wait_seconds",
+    "Time a Telegram request waited for the rate limiter",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def get_route(request: HttpRequest) -> str:
+    # ninja names urls after the operation functions
+    return getattr(request.resolver_match, "url_name", None) or UNMATCHED_ROUTE
+
+
+def observe_notification(channel: str, sent: bool, duration: float) -> None:
+    NOTIFICATIONS_SENT.labels(channel, "sent" if sent else "failed").inc()
+    NOTIFICATION_SEND_DURATION.labels(channel).observe(duration)
+
+
+def get_registry() -> CollectorRegistry:
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
@@ -1,10 +1,40 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+
 from megazord.api.requests import APIRequest
 from megazord.context import context_request
+from megazord.metrics import (
+    DB_DURATION,
+    DB_QUERIES,
+    REQUEST_DURATION,
+    REQUESTS_IN_PROGRESS,
+    get_route,
+)
+from megazord.queries import QueryLog, log_queries
+from megazord.settings import (
+    QUERY_BUDGET,
+    QUERY_BUDGET_FAIL,
+    QUERY_BUDGETS,
+    QUERY_DUPLICATES_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
 
 
 class ContextRequestMiddleware:
+    sync_capable = async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request: APIRequest) -> None:
         context_request.set(request)
@@ -12,3 +42,131 @@ class ContextRequestMiddleware:
         response = self.get_response(request)
 
         return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Count queries and database time of every request, they are reported
+    in the `Server-Timing` header and logged. Queries made while
+    a streaming response is consumed are not counted.
+    """
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: APIRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with log_queries() as query_log:
+            response = self.get_response(request)
+
+        return self.report(request, response, query_log)
+
+    async def __acall__(self, request: APIRequest) -> HttpResponse:
+        # the log is found through the context, queries of `sync_to_async`
+        # threads of the view are recorded as well
+        with log_queries() as query_log:
+            response = await self.get_response(request)
+
+        return self.report(request, response, query_log)
+
+    def report(
+        self, request: APIRequest, response: HttpResponse, query_log: QueryLog
+    ) -> HttpResponse:
+        route = getattr(request.resolver_match, "url_name", None) or request.path
+        budget = QUERY_BUDGETS.get(route, QUERY_BUDGET)
+        duplicates = query_log.get_duplicates(QUERY_DUPLICATES_THRESHOLD)
+        db_time = query_log.duration * 1000
+
+        operation = get_route(request)
+        DB_QUERIES.labels(operation).observe(query_log.count)
+        DB_DURATION.labels(operation).observe(query_log.duration)
+
+        timing = f'db;dur={db_time:.1f};desc="{query_log.count} queries"'
+        if "Server-Timing" in response:
+            timing = f"{response['Server-Timing']}, {timing}"
+        response["Server-Timing"] = timing
+
+        stats = {
+            "route": route,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": query_log.count,
+            "db_time": round(db_time, 1),
+            "query_budget": budget,
+            "duplicate_queries": duplicates,
+        }
+        over_budget = budget and query_log.count > budget
+        if over_budget or duplicates:
+            logger.warning(
+                "%s %s made %d queries in %.1fms (budget %s), %d repeated",
+                request.method,
+                route,
+                query_log.count,
+                db_time,
+                budget or "none",
+                len(duplicates),
+                extra=stats,
+            )
+        else:
+            logger.debug(
+                "%s %s made %d queries in %.1fms",
+                request.method,
+                route,
+                query_log.count,
+                db_time,
+                extra=stats,
+            )
+
+        if over_budget and QUERY_BUDGET_FAIL:
+            raise QueryBudgetExceeded(
+                f"{route} made {query_log.count} queries, budget is {budget}"
+            )
+
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Latency of requests by operation and the number of requests in progress.
+    """
+
+    # the first middleware, a sync one would move every request
+    # of the async views into a thread
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: APIRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        with REQUESTS_IN_PROGRESS.track_inprogress():
+            response = self.get_response(request)
+
+        return self.observe(request, response, start)
+
+    async def __acall__(self, request: APIRequest) -> HttpResponse:
+        start = time.perf_counter()
+        with REQUESTS_IN_PROGRESS.track_inprogress():
+            response = await self.get_response(request)
+
+        return self.observe(request, response, start)
+
+    def observe(
+        self, request: APIRequest, response: HttpResponse, start: float
+    ) -> HttpResponse:
+        REQUEST_DURATION.labels(
+            get_route(request), request.method, response.status_code
+        ).observe(time.perf_counter() - start)
+
+        return response
@@ -0,0 +1,28 @@
+from django.db import models
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+
+class RevisionModel(models.Model):
+    """
+    Rows which count their changes. The revision is bumped on every save,
+    changes of related rows a row is served with bump it by `bump_revisions`.
+    """
+
+    revision = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs) -> None:
+        self.revision += 1
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "revision", "updated_at"}
+
+        super().save(*args, **kwargs)
+
+
+def bump_revisions(queryset: QuerySet[RevisionModel]) -> None:
+    queryset.update(revision=F("revision") + 1, updated_at=timezone.now())
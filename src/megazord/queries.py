@@ -0,0 +1,95 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+FINGERPRINT_REPLACEMENTS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    # lists of any length are the same query
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Query without its parameters, queries differing only in parameters
+    have the same fingerprint.
+    """
+    for pattern, replacement in FINGERPRINT_REPLACEMENTS:
+        sql = pattern.sub(replacement, sql)
+
+    return sql.strip()
+
+
+@dataclass
+class QueryLog:
+    count: int = 0
+    # seconds spent in the database
+    duration: float = 0.0
+    fingerprints: Counter[str] = field(default_factory=Counter)
+
+    def add(self, sql: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(sql)] += 1
+
+    def get_duplicates(self, threshold: int = 2) -> dict[str, int]:
+        """
+        Queries repeated at least `threshold` times, usually a sign of N+1.
+        """
+        return {
+            sql: count
+            for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        }
+
+
+current_query_log: ContextVar[QueryLog | None] = ContextVar(
+    "current_query_log", default=None
+)
+
+
+def record_query(
+    execute: Callable, sql: str, params: Any, many: bool, context: dict
+) -> Any:
+    query_log = current_query_log.get()
+    if query_log is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        query_log.add(sql, time.perf_counter() - start)
+
+
+def install_recorder(connection, **kwargs) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# connections are per thread, the log is found through the context,
+# so queries made in `sync_to_async` threads are recorded as well
+connection_created.connect(install_recorder)
+
+
+@contextmanager
+def log_queries() -> Iterator[QueryLog]:
+    for connection in connections.all():
+        install_recorder(connection)
+
+    query_log = QueryLog()
+    token = current_query_log.set(query_log)
+    try:
+        yield query_log
+    finally:
+        current_query_log.reset(token)
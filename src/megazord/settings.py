@@ -25,6 +25,8 @@ env = environ.Env(
     LOG_LEVEL=(str, "INFO"),
     SERVER_HOST=(str, "0.0.0.0"),
     SERVER_PORT=(int, 8000),
+    SERVER_WORKERS=(int, 1),
+    PROMETHEUS_MULTIPROC_DIR=(str, ""),
     SECRET_KEY=(str, "secret"),
     DEPLOY_DOMAIN=(str, "localhost"),
     DATABASE_DB=(str, "megazord"),
@@ -32,13 +34,48 @@ env = environ.Env(
     DATABASE_PASSWORD=(str, "megazord_super_user"),
     DATABASE_HOST=(str, "localhost"),
     DATABASE_PORT=(int, 5432),
+    DATABASE_POOL=(bool, True),
+    DATABASE_POOL_MIN_SIZE=(int, 2),
+    DATABASE_POOL_MAX_SIZE=(int, 10),
+    DATABASE_POOL_TIMEOUT=(float, 10),
+    DATABASE_POOL_MAX_IDLE=(float, 600),
+    DATABASE_CONN_MAX_AGE=(int, 0),
+    DATABASE_PGBOUNCER=(bool, False),
+    DATABASE_ASYNC_READS=(bool, False),
+    CACHE_URL=(str, "locmemcache://"),
+    RESPONSE_CACHE_TIMEOUT=(int, 60),
     EMAIL_HOST=(str, "smtp.gmail.com"),
     EMAIL_PORT=(int, 587),
     EMAIL_HOST_USER=(str, "email@example.org"),
     EMAIL_HOST_PASSWORD=(str, "password"),
+    EMAIL_TIMEOUT=(int, 30),
+    EMAIL_BATCH_SIZE=(int, 20),
+    EMAIL_CONNECTION_MAX_IDLE=(int, 60),
     CONFIRMATION_CODE_TTL=(int, 2),
     TELEGRAM_BOT_TOKEN=(str, "228"),
     TELEGRAM_BOT_USERNAME=(str, "FindYourMate_bot"),
+    TELEGRAM_API_URL=(str, "https://api.telegram.org"),
+    TELEGRAM_TIMEOUT=(float, 10.0),
+    TELEGRAM_MAX_RETRIES=(int, 3),
+    TELEGRAM_HTTP2=(bool, True),
+    COVER_MAX_UPLOAD_SIZE=(int, 10 * 1024 * 1024),
+    COVER_PROCESSING_WORKERS=(int, 2),
+    PARTICIPANTS_CSV_MAX_SIZE=(int, 5 * 1024 * 1024),
+    PARTICIPANTS_CSV_MAX_ROWS=(int, 50_000),
+    NOTIFICATION_MAX_ATTEMPTS=(int, 5),
+    NOTIFICATION_EMAIL_CONCURRENCY=(int, 5),
+    NOTIFICATION_TELEGRAM_CONCURRENCY=(int, 10),
+    TEAM_FORMATION_WORKERS=(int, 1),
+    TEAM_FORMATION_TIME_BUDGET=(float, 2.0),
+    SKILL_SYNONYMS=(dict, {}),
+    SKILL_WEIGHTS_TIMEOUT=(int, 5 * 60),
+    PRINCIPAL_CACHE_TTL=(int, 30),
+    PRINCIPAL_CACHE_SIZE=(int, 1024),
+    PRINCIPAL_CACHE_SHARED=(str, ""),
+    QUERY_BUDGET=(int, 50),
+    QUERY_BUDGETS=({"value": int}, {}),
+    QUERY_BUDGET_FAIL=(bool, False),
+    QUERY_DUPLICATES_THRESHOLD=(int, 5),
 )
 env.read_env(BASE_DIR.parent / ".env")
 
@@ -50,6 +87,13 @@ RELOAD = env("RELOAD")
 
 SERVER_HOST = env("SERVER_HOST")
 SERVER_PORT = env("SERVER_PORT")
+SERVER_WORKERS = env("SERVER_WORKERS")
+
+# Prometheus metrics, several workers share their values through the directory,
+# `prometheus_client` reads it from the environment when it is imported
+PROMETHEUS_MULTIPROC_DIR = env("PROMETHEUS_MULTIPROC_DIR")
+if PROMETHEUS_MULTIPROC_DIR:
+    Path(PROMETHEUS_MULTIPROC_DIR).mkdir(parents=True, exist_ok=True)
 
 SECRET_KEY = env("SECRET_KEY")
 
@@ -77,9 +121,11 @@ INSTALLED_APPS = [
     "teams",
     "accounts",
     "vacancies",
+    "notifications",
 ]
 
 MIDDLEWARE = [
+    "megazord.middlewares.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -88,6 +134,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "megazord.middlewares.QueryBudgetMiddleware",
     "megazord.middlewares.ContextRequestMiddleware",
 ]
 
@@ -121,9 +168,47 @@ DATABASES = {
         "PASSWORD": env("DATABASE_PASSWORD"),
         "HOST": env("DATABASE_HOST"),
         "PORT": env("DATABASE_PORT"),
+        # a dead connection is replaced instead of failing the request,
+        # with the pool it is checked whenever it is taken out of the pool
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
     }
 }
 
+# Every process keeps its own pool of the ORM and, with native async
+# reads (see `megazord.db`), a second one, all of them must fit into
+# max_connections of the server
+DATABASE_POOL_MIN_SIZE = env("DATABASE_POOL_MIN_SIZE")
+DATABASE_POOL_MAX_SIZE = env("DATABASE_POOL_MAX_SIZE")
+DATABASE_POOL_TIMEOUT = env("DATABASE_POOL_TIMEOUT")
+DATABASE_POOL_MAX_IDLE = env("DATABASE_POOL_MAX_IDLE")
+# opt-in, native reads do not see rows of an open transaction of the ORM,
+# as in test cases
+DATABASE_ASYNC_READS = env("DATABASE_ASYNC_READS")
+
+if env("DATABASE_PGBOUNCER"):
+    # a pooler in transaction mode hands the same server connection to
+    # different clients, cursors must not outlive a transaction
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+elif env("DATABASE_POOL"):
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": DATABASE_POOL_MIN_SIZE,
+        "max_size": DATABASE_POOL_MAX_SIZE,
+        "timeout": DATABASE_POOL_TIMEOUT,
+        "max_idle": DATABASE_POOL_MAX_IDLE,
+    }
+else:
+    # persistent connections are not reused by async requests, which run
+    # in threads of their own, so they only help commands and WSGI
+    DATABASES["default"]["CONN_MAX_AGE"] = env("DATABASE_CONN_MAX_AGE")
+
+# Cache, a shared one (e.g. redis://) is needed for several workers
+# to see invalidations made by each other
+CACHES = {"default": env.cache("CACHE_URL")}
+
+# Seconds responses of read-heavy operations are cached, see `megazord.api.caching`
+RESPONSE_CACHE_TIMEOUT = env("RESPONSE_CACHE_TIMEOUT")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -132,6 +217,12 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Authorization
 AUTH_USER_MODEL = "accounts.Account"
 
+# Accounts of authenticated requests are cached in every process,
+# and in the cache with this alias when it is set
+PRINCIPAL_CACHE_TTL = env("PRINCIPAL_CACHE_TTL")
+PRINCIPAL_CACHE_SIZE = env("PRINCIPAL_CACHE_SIZE")
+PRINCIPAL_CACHE_SHARED = env("PRINCIPAL_CACHE_SHARED")
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -167,6 +258,55 @@ CONFIRMATION_CODE_TTL = env("CONFIRMATION_CODE_TTL")
 # telegram bot settings
 TELEGRAM_BOT_TOKEN = env("TELEGRAM_BOT_TOKEN")
 TELEGRAM_BOT_USERNAME = env("TELEGRAM_BOT_USERNAME")
+TELEGRAM_API_URL = env("TELEGRAM_API_URL")
+TELEGRAM_TIMEOUT = env("TELEGRAM_TIMEOUT")
+TELEGRAM_MAX_RETRIES = env("TELEGRAM_MAX_RETRIES")
+TELEGRAM_HTTP2 = env("TELEGRAM_HTTP2")
+
+# Hackathon covers processing
+COVER_MAX_UPLOAD_SIZE = env("COVER_MAX_UPLOAD_SIZE")
+COVER_PROCESSING_WORKERS = env("COVER_PROCESSING_WORKERS")
+
+# Participants import from CSV
+PARTICIPANTS_CSV_MAX_SIZE = env("PARTICIPANTS_CSV_MAX_SIZE")
+PARTICIPANTS_CSV_MAX_ROWS = env("PARTICIPANTS_CSV_MAX_ROWS")
+
+# Automatic team formation
+TEAM_FORMATION_WORKERS = env("TEAM_FORMATION_WORKERS")
+TEAM_FORMATION_TIME_BUDGET = env("TEAM_FORMATION_TIME_BUDGET")
+
+# Skill matching, aliases are matched as the skill they point to
+SKILL_SYNONYMS = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "golang": "go",
+    "c#": "csharp",
+    "c sharp": "csharp",
+    "cpp": "c++",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nodejs": "node.js",
+    "node": "node.js",
+} | env("SKILL_SYNONYMS")
+SKILL_WEIGHTS_TIMEOUT = env("SKILL_WEIGHTS_TIMEOUT")
+
+# Queries per request, routes are named by their operation,
+# requests over the budget are logged or fail with QUERY_BUDGET_FAIL
+QUERY_BUDGET = env("QUERY_BUDGET")
+QUERY_BUDGETS = env("QUERY_BUDGETS")
+QUERY_BUDGET_FAIL = env("QUERY_BUDGET_FAIL")
+QUERY_DUPLICATES_THRESHOLD = env("QUERY_DUPLICATES_THRESHOLD")
+
+# Notification outbox
+NOTIFICATION_MAX_ATTEMPTS = env("NOTIFICATION_MAX_ATTEMPTS")
+NOTIFICATION_EMAIL_CONCURRENCY = env("NOTIFICATION_EMAIL_CONCURRENCY")
+NOTIFICATION_TELEGRAM_CONCURRENCY = env("NOTIFICATION_TELEGRAM_CONCURRENCY")
 
 # Email settings
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -177,6 +317,11 @@ EMAIL_HOST = env("EMAIL_HOST")
 EMAIL_PORT = env("EMAIL_PORT")
 EMAIL_HOST_USER = env("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
+EMAIL_TIMEOUT = env("EMAIL_TIMEOUT")
+
+# SMTP sessions are kept open between messages, see `utils.mail`
+EMAIL_BATCH_SIZE = env("EMAIL_BATCH_SIZE")
+EMAIL_CONNECTION_MAX_IDLE = env("EMAIL_CONNECTION_MAX_IDLE")
 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 SERVER_EMAIL = EMAIL_HOST_USER
@@ -21,7 +21,10 @@ from django.contrib import admin
 from django.urls import path
 
 from megazord.api.api import api
+from megazord.metrics import metrics_view
 
-urlpatterns = [path("admin/", admin.site.urls), path("api/", api.urls)] + static(
-    settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-)
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    path("api/", api.urls),
+    path("metrics", metrics_view, name="metrics"),
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,73 @@
+import asyncio
+from argparse import ArgumentParser
+
+from django.core.management import BaseCommand
+from prometheus_client import start_http_server
+
+from megazord.metrics import get_registry
+from notifications.services import dispatch_notifications
+from utils.mail import mail_pool
+from utils.telegram import telegram
+
+
+class Command(BaseCommand):
+    help = "Send notifications from the outbox"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the outbox is empty",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Dispatch a single batch and exit"
+        )
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            default=None,
+            help="Port to serve Prometheus metrics of the dispatcher on",
+        )
+
+    def handle(
+        self,
+        batch_size: int,
+        poll_interval: float,
+        once: bool,
+        metrics_port: int | None,
+        *args,
+        **kwargs,
+    ) -> None:
+        if metrics_port is not None:
+            start_http_server(metrics_port, registry=get_registry())
+
+        try:
+            asyncio.run(
+                self.dispatch(
+                    batch_size=batch_size, poll_interval=poll_interval, once=once
+                )
+            )
+        finally:
+            mail_pool.close()
+
+    async def dispatch(self, batch_size: int, poll_interval: float, once: bool):
+        try:
+            await self.dispatch_batches(
+                batch_size=batch_size, poll_interval=poll_interval, once=once
+            )
+        finally:
+            await telegram.aclose()
+
+    async def dispatch_batches(
+        self, batch_size: int, poll_interval: float, once: bool
+    ) -> None:
+        while True:
+            report = await dispatch_notifications(batch_size=batch_size)
+            if once:
+                self.stdout.write(self.style.SUCCESS(f"Dispatched: {report}"))
+                return
+
+            if not report.deliveries:
+                await asyncio.sleep(poll_interval)
@@ -0,0 +1,41 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    context = models.JSONField(default=dict)
+    mail_template = models.CharField(max_length=200, null=True)
+    telegram_template = models.CharField(max_length=200, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class NotificationDelivery(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        PROCESSING = "PROCESSING"
+        SENT = "SENT"
+        FAILED = "FAILED"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    notification = models.ForeignKey(
+        Notification, on_delete=models.CASCADE, related_name="deliveries"
+    )
+    email = models.EmailField()
+    status = models.CharField(choices=Status, default=Status.PENDING)
+    # `None` means that the channel has not been used yet
+    email_sent = models.BooleanField(null=True, default=None)
+    telegram_sent = models.BooleanField(null=True, default=None)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, default=None)
+    processed_at = models.DateTimeField(null=True, default=None)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "available_at"])]
+
+    def __str__(self):
+        return f"Delivery of notification {self.notification_id} to {self.email}"
@@ -0,0 +1,145 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from typing import Any, Callable
+
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import get_template, render_to_string
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from mail_templated import EmailMessage
+
+from accounts.models import Account
+from notifications.models import Notification
+
+# context that differs between recipients of the same notification,
+# everything else is shared by the whole broadcast
+RECIPIENT_CONTEXT = frozenset({"current_user"})
+
+
+@cache
+def get_sources(template_name: str) -> tuple[str, ...] | None:
+    """
+    Sources of the template and all templates it extends or includes,
+    None when some of them are known only at render time.
+    """
+    template = get_template(template_name).template
+    sources = [template.source]
+    for node in template.nodelist.get_nodes_by_type((ExtendsNode, IncludeNode)):
+        name = (
+            node.parent_name if isinstance(node, ExtendsNode) else node.template
+        ).var
+        if not isinstance(name, str):
+            return None
+
+        nested = get_sources(name)
+        if nested is None:
+            return None
+        sources.extend(nested)
+
+    return tuple(sources)
+
+
+@cache
+def is_personal(template_name: str) -> bool:
+    sources = get_sources(template_name)
+    if sources is None:
+        return True
+
+    return any(name in source for source in sources for name in RECIPIENT_CONTEXT)
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    subject: str
+    body: str
+    content_subtype: str
+    alternatives: tuple[tuple[str, str], ...]
+
+    def make_message(self, recipient_list: list[str]) -> EmailMultiAlternatives:
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            to=recipient_list,
+            alternatives=list(self.alternatives),
+        )
+        message.content_subtype = self.content_subtype
+        return message
+
+
+def render_email(template_name: str, context: dict[str, Any]) -> RenderedEmail:
+    message = EmailMessage(template_name, context, render=True)
+    return RenderedEmail(
+        subject=message.subject,
+        body=message.body,
+        content_subtype=message.content_subtype,
+        alternatives=tuple(message.alternatives),
+    )
+
+
+class NotificationRenderer:
+    """
+    Renders notification templates once per broadcast. Templates which use
+    the recipient context are rendered once per recipient instead.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.renders = 0
+        self._rendered: OrderedDict[tuple, Any] = OrderedDict()
+
+    def get_or_render[T](
+        self,
+        notification: Notification,
+        template_name: str,
+        user: Account | None,
+        render: Callable[[], T],
+    ) -> T:
+        recipient = user.pk if user is not None and is_personal(template_name) else None
+        key = (notification.id, template_name, recipient)
+        if key in self._rendered:
+            self._rendered.move_to_end(key)
+            return self._rendered[key]
+
+        rendered = self._rendered[key] = render()
+        self.renders += 1
+        if len(self._rendered) > self.max_size:
+            self._rendered.popitem(last=False)
+
+        return rendered
+
+    def render_email(
+        self,
+        notification: Notification,
+        context: dict[str, Any],
+        user: Account | None,
+        recipient_list: list[str],
+    ) -> EmailMultiAlternatives:
+        template_name = notification.mail_template
+        rendered = self.get_or_render(
+            notification=notification,
+            template_name=template_name,
+            user=user,
+            render=lambda: render_email(
+                template_name, context | {"current_user": user}
+            ),
+        )
+        return rendered.make_message(recipient_list)
+
+    def render_telegram(
+        self,
+        notification: Notification,
+        context: dict[str, Any],
+        user: Account | None,
+    ) -> str:
+        template_name = notification.telegram_template
+        return self.get_or_render(
+            notification=notification,
+            template_name=template_name,
+            user=user,
+            render=lambda: render_to_string(
+                template_name=template_name, context=context | {"current_user": user}
+            ),
+        )
+
+
+renderer = NotificationRenderer(max_size=1024)
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Awaitable
+
+from asgiref.sync import sync_to_async
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import Account
+from hackathons.models import NotificationStatus
+from megazord.settings import (
+    NOTIFICATION_MAX_ATTEMPTS,
+    NOTIFICATION_TELEGRAM_CONCURRENCY,
+)
+from notifications.models import NotificationDelivery
+from notifications.rendering import renderer
+from utils.mail import mail_pool
+from utils.notification import deserialize_context
+from utils.telegram import telegram
+
+logger = logging.getLogger(__name__)
+
+# deliveries claimed by a dispatcher that died are claimed again after timeout
+CLAIM_TIMEOUT = timedelta(minutes=5)
+RETRY_DELAY = timedelta(seconds=30)
+
+
+def claim_deliveries(batch_size: int) -> list[NotificationDelivery]:
+    now = timezone.now()
+    claimable = Q(
+        status=NotificationDelivery.Status.PENDING, available_at__lte=now
+    ) | Q(
+        status=NotificationDelivery.Status.PROCESSING,
+        claimed_at__lt=now - CLAIM_TIMEOUT,
+    )
+
+    with transaction.atomic():
+        deliveries = list(
+            NotificationDelivery.objects.select_for_update(
+                skip_locked=True, of=("self",)
+            )
+            .select_related("notification")
+            .filter(claimable)
+            .order_by("available_at")[:batch_size]
+        )
+        for delivery in deliveries:
+            delivery.status = NotificationDelivery.Status.PROCESSING
+            delivery.claimed_at = now
+            delivery.attempts += 1
+        NotificationDelivery.objects.bulk_update(
+            deliveries, fields=["status", "claimed_at", "attempts"]
+        )
+
+    return deliveries
+
+
+def load_contexts(
+    deliveries: list[NotificationDelivery],
+) -> dict[uuid.UUID, dict[str, Any]]:
+    notifications = {delivery.notification for delivery in deliveries}
+
+    return {
+        notification.id: deserialize_context(notification.context)
+        for notification in notifications
+    }
+
+
+async def send_safely(delivery: NotificationDelivery, sending: Awaitable[bool]) -> bool:
+    try:
+        return await sending
+    except Exception as exc:
+        logger.exception(f"Failed to deliver notification to `{delivery.email}`")
+        delivery.error = str(exc)
+        return False
+
+
+@dataclass
+class DispatchReport:
+    deliveries: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    channels: Counter[str] = field(default_factory=Counter)
+
+    def add(self, delivery: NotificationDelivery, results: dict[str, bool]) -> None:
+        self.deliveries += 1
+        match delivery.status:
+            case NotificationDelivery.Status.SENT:
+                self.sent += 1
+            case NotificationDelivery.Status.PENDING:
+                self.retried += 1
+            case NotificationDelivery.Status.FAILED:
+                self.failed += 1
+
+        for channel, sent in results.items():
+            self.channels[f"{channel}_{'sent' if sent else 'failed'}"] += 1
+
+    def __str__(self) -> str:
+        channels = ", ".join(f"{key}={value}" for key, value in self.channels.items())
+        return (
+            f"deliveries={self.deliveries}, sent={self.sent}, "
+            f"retried={self.retried}, failed={self.failed} ({channels})"
+        )
+
+
+@dataclass
+class RenderedMessages:
+    emails: dict[uuid.UUID, EmailMultiAlternatives] = field(default_factory=dict)
+    telegram: dict[uuid.UUID, str] = field(default_factory=dict)
+
+
+def render_messages(
+    deliveries: list[NotificationDelivery],
+    contexts: dict[uuid.UUID, dict[str, Any]],
+    users: dict[str, Account],
+) -> RenderedMessages:
+    messages = RenderedMessages()
+    for delivery in deliveries:
+        notification = delivery.notification
+        context = contexts[delivery.notification_id]
+        user = users.get(delivery.email)
+        # channels that have been sent on previous attempts are skipped
+        if notification.mail_template is not None and not delivery.email_sent:
+            try:
+                messages.emails[delivery.id] = renderer.render_email(
+                    notification=notification,
+                    context=context,
+                    user=user,
+                    recipient_list=[delivery.email],
+                )
+            except Exception as exc:
+                logger.exception(f"Failed to render email to `{delivery.email}`")
+                delivery.error = str(exc)
+                delivery.email_sent = False
+
+        if (
+            notification.telegram_template is not None
+            and user is not None
+            and user.telegram_id is not None
+            and not delivery.telegram_sent
+        ):
+            try:
+                messages.telegram[delivery.id] = renderer.render_telegram(
+                    notification=notification, context=context, user=user
+                )
+            except Exception as exc:
+                logger.exception(
+                    f"Failed to render telegram message to `{delivery.email}`"
+                )
+                delivery.error = str(exc)
+                delivery.telegram_sent = False
+
+    return messages
+
+
+async def deliver_emails(
+    deliveries: list[NotificationDelivery],
+    messages: dict[uuid.UUID, EmailMultiAlternatives],
+    results: dict[uuid.UUID, dict[str, bool]],
+) -> None:
+    deliveries = [delivery for delivery in deliveries if delivery.id in messages]
+    errors = await mail_pool.send_messages(
+        [messages[delivery.id] for delivery in deliveries]
+    )
+
+    for delivery, error in zip(deliveries, errors):
+        if error is not None:
+            delivery.error = str(error)
+        delivery.email_sent = error is None
+        results[delivery.id]["email"] = delivery.email_sent
+
+
+async def deliver_telegram(
+    delivery: NotificationDelivery,
+    text: str,
+    chat_id: int,
+    limit: asyncio.Semaphore,
+    results: dict[uuid.UUID, dict[str, bool]],
+) -> None:
+    async with limit:
+        delivery.telegram_sent = await send_safely(
+            delivery, telegram.send_message(chat_id=chat_id, text=text)
+        )
+    results[delivery.id]["telegram"] = delivery.telegram_sent
+
+
+def finish_delivery(delivery: NotificationDelivery) -> None:
+    now = timezone.now()
+    if delivery.email_sent is False or delivery.telegram_sent is False:
+        if delivery.attempts >= NOTIFICATION_MAX_ATTEMPTS:
+            delivery.status = NotificationDelivery.Status.FAILED
+        else:
+            delivery.status = NotificationDelivery.Status.PENDING
+            delivery.available_at = now + RETRY_DELAY * 2 ** (delivery.attempts - 1)
+    else:
+        delivery.status = NotificationDelivery.Status.SENT
+    delivery.processed_at = now
+
+
+@transaction.atomic
+def save_results(deliveries: list[NotificationDelivery]) -> None:
+    NotificationDelivery.objects.bulk_update(
+        deliveries,
+        fields=[
+            "status",
+            "email_sent",
+            "telegram_sent",
+            "error",
+            "available_at",
+            "processed_at",
+        ],
+    )
+
+    emails = {delivery.email for delivery in deliveries}
+    NotificationStatus.objects.filter(email__in=emails).delete()
+    NotificationStatus.objects.bulk_create(
+        NotificationStatus(
+            email=delivery.email,
+            email_sent=delivery.email_sent is not False,
+            telegram_sent=delivery.telegram_sent is not False,
+        )
+        for delivery in deliveries
+        if delivery.email_sent is False or delivery.telegram_sent is False
+    )
+
+
+async def dispatch_notifications(batch_size: int = 100) -> DispatchReport:
+    report = DispatchReport()
+    deliveries = await sync_to_async(claim_deliveries)(batch_size)
+    if not deliveries:
+        return report
+
+    contexts = await sync_to_async(load_contexts)(deliveries)
+    users = {
+        user.email: user
+        async for user in Account.objects.filter(
+            email__in=[delivery.email for delivery in deliveries]
+        )
+    }
+    messages = await sync_to_async(render_messages)(deliveries, contexts, users)
+    results = {delivery.id: {} for delivery in deliveries}
+    telegram_limit = asyncio.Semaphore(NOTIFICATION_TELEGRAM_CONCURRENCY)
+
+    await asyncio.gather(
+        deliver_emails(
+            deliveries=deliveries, messages=messages.emails, results=results
+        ),
+        *(
+            deliver_telegram(
+                delivery=delivery,
+                text=messages.telegram[delivery.id],
+                chat_id=users[delivery.email].telegram_id,
+                limit=telegram_limit,
+                results=results,
+            )
+            for delivery in deliveries
+            if delivery.id in messages.telegram
+        ),
+    )
+    for delivery in deliveries:
+        finish_delivery(delivery)
+    await sync_to_async(save_results)(deliveries)
+
+    for delivery in deliveries:
+        report.add(delivery, results[delivery.id])
+    logger.info(f"Dispatched notifications: {report}")
+
+    return report
@@ -0,0 +1,410 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from smtplib import SMTPServerDisconnected
+from typing import AsyncIterator
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends import locmem
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from accounts.models import Account, Email
+from hackathons.models import Hackathon
+from megazord.context import context_request
+from notifications.models import Notification, NotificationDelivery
+from notifications.rendering import (
+    NotificationRenderer,
+    get_sources,
+    is_personal,
+    renderer,
+)
+from notifications.services import dispatch_notifications
+from utils.mail import SMTPConnectionPool
+from utils.notification import send_notification
+from utils.telegram import TelegramClient, telegram
+
+
+class TestNotificationOutbox(TestCase):
+    def setUp(self) -> None:
+        context_request.set(
+            RequestFactory().get("/", HTTP_ORIGIN="https://megazord.example")
+        )
+
+        self.user = Account.objects.create_user(
+            email="user@example.org",
+            username="user",
+            is_organizator=False,
+            password="test",
+        )
+        self.user.telegram_id = 1
+        self.user.save()
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user, name="test", description="test"
+        )
+
+    async def enqueue(self) -> None:
+        await send_notification(
+            emails=[
+                await Email.objects.acreate(email=self.user.email),
+                await Email.objects.acreate(email="guest@example.org"),
+            ],
+            context={"hackathon": self.hackathon},
+            mail_template="hackathons/mail/invitation_to_hackathon.html",
+            telegram_template="hackathons/telegram/invitation_to_hackathon.html",
+        )
+
+    async def test_send_notification_enqueues(self) -> None:
+        await self.enqueue()
+
+        deliveries = [
+            delivery
+            async for delivery in NotificationDelivery.objects.select_related(
+                "notification"
+            ).order_by("email")
+        ]
+        self.assertEqual(
+            [delivery.email for delivery in deliveries],
+            ["guest@example.org", "user@example.org"],
+        )
+        for delivery in deliveries:
+            self.assertEqual(delivery.status, NotificationDelivery.Status.PENDING)
+            self.assertEqual(
+                delivery.notification.context,
+                {
+                    "hackathon": {
+                        "model": "hackathons.Hackathon",
+                        "pk": str(self.hackathon.id),
+                    },
+                    "frontend_url": "https://megazord.example",
+                },
+            )
+
+    @patch.object(telegram, "send_message", new_callable=AsyncMock)
+    async def test_dispatch_notifications(self, send_telegram) -> None:
+        send_telegram.return_value = True
+        await self.enqueue()
+
+        report = await dispatch_notifications()
+        self.assertEqual(report.deliveries, 2)
+        self.assertEqual(report.sent, 2)
+        self.assertEqual(report.channels, {"email_sent": 2, "telegram_sent": 1})
+        self.assertEqual((await dispatch_notifications()).deliveries, 0)
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["guest@example.org", "user@example.org"],
+        )
+        self.assertIn(self.hackathon.name, mail.outbox[0].subject + mail.outbox[0].body)
+        send_telegram.assert_awaited_once()
+        self.assertEqual(send_telegram.await_args.kwargs["chat_id"], 1)
+        self.assertIn(self.hackathon.name, send_telegram.await_args.kwargs["text"])
+        self.assertFalse(
+            await NotificationDelivery.objects.exclude(
+                status=NotificationDelivery.Status.SENT
+            ).aexists()
+        )
+
+    @patch.object(telegram, "send_message", new_callable=AsyncMock)
+    async def test_dispatch_notifications_retry(self, send_telegram) -> None:
+        send_telegram.side_effect = ConnectionError("telegram is down")
+        await self.enqueue()
+
+        report = await dispatch_notifications()
+        self.assertEqual((report.sent, report.retried), (1, 1))
+        self.assertEqual(report.channels["telegram_failed"], 1)
+
+        delivery = await NotificationDelivery.objects.aget(email=self.user.email)
+        self.assertEqual(delivery.status, NotificationDelivery.Status.PENDING)
+        self.assertTrue(delivery.email_sent)
+        self.assertFalse(delivery.telegram_sent)
+        self.assertEqual(delivery.error, "telegram is down")
+
+        # the failed channel is retried without sending the email again
+        send_telegram.side_effect = None
+        send_telegram.return_value = True
+        await NotificationDelivery.objects.filter(id=delivery.id).aupdate(
+            available_at=delivery.claimed_at
+        )
+        await dispatch_notifications()
+
+        delivery = await NotificationDelivery.objects.aget(email=self.user.email)
+        self.assertEqual(delivery.status, NotificationDelivery.Status.SENT)
+        self.assertEqual(len(mail.outbox), 2)
+
+    @patch.object(telegram, "send_message", new_callable=AsyncMock)
+    async def test_broadcast_is_rendered_once(self, send_telegram) -> None:
+        send_telegram.return_value = True
+        await send_notification(
+            emails=[
+                await Email.objects.acreate(email=f"user_{i}@example.org")
+                for i in range(6)
+            ],
+            context={"hackathon": self.hackathon},
+            mail_template="hackathons/mail/hackathon_ended.html",
+        )
+        renders = renderer.renders
+
+        report = await dispatch_notifications()
+        self.assertEqual(report.sent, 6)
+        self.assertEqual(renderer.renders - renders, 1)
+        self.assertEqual(len({message.subject for message in mail.outbox}), 1)
+        self.assertEqual(len({message.to[0] for message in mail.outbox}), 6)
+
+
+PERSONAL_TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {
+            "loaders": [
+                (
+                    "django.template.loaders.locmem.Loader",
+                    {
+                        "shared.html": "{{ hackathon }} {% include 'footer.html' %}",
+                        "personal.html": "Hi {% include 'greeting.html' %}",
+                        "greeting.html": "{{ current_user.username }}",
+                        "dynamic.html": "{% include footer %}",
+                        "footer.html": "bye",
+                    },
+                )
+            ]
+        },
+    }
+]
+
+
+@override_settings(TEMPLATES=PERSONAL_TEMPLATES)
+class TestNotificationRenderer(SimpleTestCase):
+    def setUp(self) -> None:
+        get_sources.cache_clear()
+        is_personal.cache_clear()
+        self.renderer = NotificationRenderer(max_size=2)
+        self.users = [Account(username=f"user_{i}") for i in range(2)]
+
+    def tearDown(self) -> None:
+        get_sources.cache_clear()
+        is_personal.cache_clear()
+
+    def test_is_personal(self) -> None:
+        self.assertFalse(is_personal("shared.html"))
+        self.assertTrue(is_personal("personal.html"))
+        self.assertTrue(is_personal("dynamic.html"))
+
+    def test_shared_template_is_rendered_once(self) -> None:
+        notification = Notification(telegram_template="shared.html")
+        texts = [
+            self.renderer.render_telegram(
+                notification=notification, context={"hackathon": "test"}, user=user
+            )
+            for user in self.users
+        ]
+
+        self.assertEqual(texts, ["test bye", "test bye"])
+        self.assertEqual(self.renderer.renders, 1)
+
+    def test_personal_template_is_rendered_per_recipient(self) -> None:
+        notification = Notification(telegram_template="personal.html")
+        texts = [
+            self.renderer.render_telegram(
+                notification=notification, context={}, user=user
+            )
+            for user in self.users + self.users
+        ]
+
+        self.assertEqual(texts, ["Hi user_0", "Hi user_1"] * 2)
+        self.assertEqual(self.renderer.renders, 2)
+
+    def test_cache_is_bounded(self) -> None:
+        for _ in range(3):
+            self.renderer.render_telegram(
+                notification=Notification(telegram_template="shared.html"),
+                context={"hackathon": "test"},
+                user=None,
+            )
+
+        self.assertEqual(len(self.renderer._rendered), 2)
+
+
+class FakeSMTPBackend(locmem.EmailBackend):
+    sessions = 0
+    drops = 0
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.connection = None
+
+    def open(self) -> bool:
+        if self.connection is not None:
+            return False
+        FakeSMTPBackend.sessions += 1
+        self.connection = object()
+        return True
+
+    def close(self) -> None:
+        self.connection = None
+
+    def send_messages(self, messages: list[EmailMessage]) -> int:
+        if FakeSMTPBackend.drops:
+            FakeSMTPBackend.drops -= 1
+            raise SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="notifications.tests.FakeSMTPBackend")
+class TestSMTPConnectionPool(SimpleTestCase):
+    def setUp(self) -> None:
+        FakeSMTPBackend.sessions = 0
+        FakeSMTPBackend.drops = 0
+        self.pool = SMTPConnectionPool(size=2, batch_size=3, max_idle=60)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+
+    def make_messages(self, count: int) -> list[EmailMessage]:
+        return [
+            EmailMessage(subject="test", body="test", to=[f"user_{i}@example.org"])
+            for i in range(count)
+        ]
+
+    async def test_sessions_are_reused(self) -> None:
+        errors = await self.pool.send_messages(self.make_messages(12))
+        self.assertEqual(errors, [None] * 12)
+        self.assertEqual(len(mail.outbox), 12)
+        self.assertEqual(FakeSMTPBackend.sessions, 2)
+
+        await self.pool.send_messages(self.make_messages(3))
+        self.assertEqual(FakeSMTPBackend.sessions, 2)
+
+    async def test_reconnect_on_disconnect(self) -> None:
+        await self.pool.send_messages(self.make_messages(1))
+        FakeSMTPBackend.drops = 1
+
+        errors = await self.pool.send_messages(self.make_messages(2))
+        self.assertEqual(errors, [None, None])
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(FakeSMTPBackend.sessions, 2)
+
+    async def test_disconnect_twice_fails_message(self) -> None:
+        FakeSMTPBackend.drops = 2
+
+        errors = await self.pool.send_messages(self.make_messages(2))
+        self.assertIsInstance(errors[0], SMTPServerDisconnected)
+        self.assertIsNone(errors[1])
+        self.assertEqual(len(mail.outbox), 1)
+
+    async def test_idle_sessions_are_reopened(self) -> None:
+        self.pool.max_idle = 0
+        await self.pool.send_messages(self.make_messages(1))
+        await asyncio.sleep(0.01)
+        await self.pool.send_messages(self.make_messages(1))
+
+        self.assertEqual(FakeSMTPBackend.sessions, 2)
+
+
+class TelegramStandIn:
+    """
+    Local stand-in for the Bot API, answers with the queued responses
+    and then with success.
+    """
+
+    def __init__(self) -> None:
+        self.responses: list[tuple[int, dict]] = []
+        self.requests: list[dict] = []
+        self.peers: set[tuple] = set()
+        app = web.Application()
+        app.router.add_post("/{bot}/sendMessage", self.send_message)
+        self.server = TestServer(app)
+
+    async def send_message(self, request: web.Request) -> web.Response:
+        self.requests.append(await request.json())
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if self.responses:
+            status, body = self.responses.pop(0)
+            return web.json_response(body, status=status)
+
+        return web.json_response({"ok": True, "result": {}})
+
+
+class TestTelegramClient(SimpleTestCase):
+    @asynccontextmanager
+    async def stand_in(self) -> AsyncIterator[tuple[TelegramStandIn, TelegramClient]]:
+        api = TelegramStandIn()
+        await api.server.start_server()
+        client = TelegramClient(
+            token="test",
+            base_url=str(api.server.make_url("")).rstrip("/"),
+            timeout=5,
+            max_retries=2,
+            max_connections=2,
+            http2=True,
+        )
+        try:
+            yield api, client
+        finally:
+            await client.aclose()
+            await api.server.close()
+
+    async def test_connection_is_reused(self) -> None:
+        async with self.stand_in() as (api, client):
+            for chat_id in range(5):
+                self.assertTrue(await client.send_message(chat_id=chat_id, text="hi"))
+
+        self.assertEqual(
+            [request["chat_id"] for request in api.requests], [0, 1, 2, 3, 4]
+        )
+        self.assertEqual(len(api.peers), 1)
+
+    async def test_retry_after_too_many_requests(self) -> None:
+        async with self.stand_in() as (api, client):
+            api.responses = [
+                (
+                    429,
+                    {
+                        "ok": False,
+                        "error_code": 429,
+                        "parameters": {"retry_after": 0.2},
+                    },
+                )
+            ]
+            started = time.monotonic()
+            self.assertTrue(await client.send_message(chat_id=1, text="hi"))
+            elapsed = time.monotonic() - started
+
+        # the delay comes from the body, `Retry-After` header is not sent
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 1)
+        self.assertEqual(len(api.requests), 2)
+
+    async def test_retries_are_limited(self) -> None:
+        rate_limited = REGISTRY.get_sample_value("megazord_telegram_rate_limited_total")
+        failed = REGISTRY.get_sample_value(
+            "megazord_notifications_sent_total",
+            {"channel": "telegram", "result": "failed"},
+        )
+        async with self.stand_in() as (api, client):
+            api.responses = [(429, {"ok": False, "parameters": {"retry_after": 0}})] * 3
+            self.assertFalse(await client.send_message(chat_id=1, text="hi"))
+
+        self.assertEqual(len(api.requests), 3)
+        self.assertEqual(
+            REGISTRY.get_sample_value("megazord_telegram_rate_limited_total"),
+            rate_limited + 3,
+        )
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "megazord_notifications_sent_total",
+                {"channel": "telegram", "result": "failed"},
+            ),
+            (failed or 0) + 1,
+        )
+
+    async def test_error_is_not_retried(self) -> None:
+        async with self.stand_in() as (api, client):
+            api.responses = [(400, {"ok": False, "description": "chat not found"})]
+            self.assertFalse(await client.send_message(chat_id=1, text="hi"))
+
+        self.assertEqual(len(api.requests), 1)
@@ -6,7 +6,9 @@ from ninja import Router
 from accounts.entities import AccountEntity
 from accounts.models import Account
 from megazord.api.auth import AuthBearer
+from megazord.api.caching import cache_response, get_version_key, shared_scope
 from megazord.api.codes import ERROR_CODES
+from megazord.api.principals import principals
 from megazord.api.requests import APIRequest
 from megazord.schemas import ErrorSchema, StatusSchema
 from megazord.settings import TELEGRAM_BOT_USERNAME
@@ -30,7 +32,11 @@ async def profile_patch(
     me.city = edit_schema.city
     me.username = edit_schema.username
     me.work_experience = edit_schema.work_experience
-    await me.asave()
+    # the cached account may be older than the row, only edited fields
+    # are written and the rest is read back
+    await me.asave(update_fields=["age", "city", "username", "work_experience"])
+    await me.arefresh_from_db()
+    await principals.invalidate(me.id)
 
     return 200, await me.to_entity()
 
@@ -39,6 +45,11 @@ async def profile_patch(
     path="/profiles/{user_id}",
     response={200: ProfileSchema, ERROR_CODES: ErrorSchema},
 )
+@cache_response(
+    depends=lambda user_id: [get_version_key("account", user_id)],
+    schema=ProfileSchema,
+    scope=shared_scope,
+)
 async def get_profile(request: APIRequest, user_id: uuid.UUID) -> AccountEntity:
     user = await aget_object_or_404(Account, id=user_id)
 
@@ -58,6 +69,7 @@ async def link_telegram(request: APIRequest, user_id: uuid.UUID, telegram_id: in
 
     user.telegram_id = telegram_id
     await user.asave()
+    await principals.invalidate(user.id)
 
     return 200, StatusSchema()
 
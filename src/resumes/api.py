@@ -16,7 +16,9 @@ from ninja import File, Router, UploadedFile
 from pypdf import PdfReader
 
 from hackathons.models import Hackathon
+from megazord.api.caching import cache_response, get_version_key, shared_scope
 from megazord.api.codes import ERROR_CODES
+from megazord.api.conditional import conditional, get_revisions
 from megazord.api.requests import APIRequest
 from megazord.schemas import ErrorSchema
 
@@ -56,6 +58,20 @@ async def create_custom_resume(
 
 
 @router.get(path="/get", response={200: ResumeSchema, ERROR_CODES: ErrorSchema})
+@conditional(
+    lambda request, hackathon_id, user_id: get_revisions(
+        Resume.objects.filter(hackathon_id=hackathon_id, user_id=user_id),
+        required=True,
+    ),
+    schema=ResumeSchema,
+)
+@cache_response(
+    depends=lambda hackathon_id, user_id: [
+        get_version_key("resume", hackathon_id, user_id),
+    ],
+    schema=ResumeSchema,
+    scope=shared_scope,
+)
 async def get_resume(
     request: APIRequest, hackathon_id: uuid.UUID, user_id: uuid.UUID
 ) -> ResumeEntity:
@@ -0,0 +1,48 @@
+# Generated by Django 5.1 on 2026-10-18 20:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_skills(apps, schema_editor):
+    ResumeTerm = apps.get_model("resumes", "ResumeTerm")
+    for model_name in ("HardSkillTag", "SoftSkillTag"):
+        tags = apps.get_model("resumes", model_name).objects.values_list(
+            "resume_id", "tag_text"
+        )
+        ResumeTerm.objects.bulk_create(
+            [
+                ResumeTerm(resume_id=resume_id, term=" ".join(text.lower().split()))
+                for resume_id, text in tags.iterator()
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("resumes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumeTerm",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("term", models.CharField(db_index=True, max_length=200)),
+                (
+                    "resume",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="terms",
+                        to="resumes.resume",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("resume", "term")},
+            },
+        ),
+        migrations.RunPython(index_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-18 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("resumes", "0002_resume_terms"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="revision",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,13 +1,15 @@
 import uuid
 
 from django.db import models
+from django.db.models import OuterRef, QuerySet, Subquery
 
 from accounts.models import Account
-from hackathons.models import Hackathon, Role
+from hackathons.models import Hackathon, Role, UserRole
+from megazord.models import RevisionModel
 from resumes.entities import ResumeEntity
 
 
-class Resume(models.Model):
+class Resume(RevisionModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(Account, on_delete=models.CASCADE)
     hackathon = models.ForeignKey(Hackathon, on_delete=models.CASCADE)
@@ -22,13 +24,17 @@ class Resume(models.Model):
         unique_together = (("user", "hackathon"),)
 
     async def to_entity(self) -> ResumeEntity:
-        try:
-            db_role = await Role.objects.aget(
-                hackathon_id=self.hackathon_id, users__id=self.user_id
-            )
-            role = db_role.name
-        except Role.DoesNotExist:
-            role = None
+        if hasattr(self, "role_name"):
+            # role has been annotated by `to_entities`
+            role = self.role_name
+        else:
+            try:
+                db_role = await Role.objects.aget(
+                    hackathon_id=self.hackathon_id, users__id=self.user_id
+                )
+                role = db_role.name
+            except Role.DoesNotExist:
+                role = None
 
         return ResumeEntity(
             id=self.id,
@@ -44,6 +50,18 @@ class Resume(models.Model):
             soft_skills=[skill.tag_text async for skill in self.soft_skills.all()],
         )
 
+    @classmethod
+    async def to_entities(cls, queryset: QuerySet["Resume"]) -> list[ResumeEntity]:
+        user_roles = UserRole.objects.filter(
+            user_id=OuterRef("user_id"), hackathon_id=OuterRef("hackathon_id")
+        )
+        resumes = (
+            queryset.select_related("user")
+            .prefetch_related("hard_skills", "soft_skills")
+            .annotate(role_name=Subquery(user_roles.values("role__name")[:1]))
+        )
+        return [await resume.to_entity() async for resume in resumes]
+
 
 class HardSkillTag(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -59,3 +77,16 @@ class SoftSkillTag(models.Model):
         Resume, on_delete=models.CASCADE, related_name="soft_skills"
     )
     tag_text = models.CharField(max_length=200, blank=False)
+
+
+class ResumeTerm(models.Model):
+    """
+    Inverted index of skill tags, maintained by signals on tag writes.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name="terms")
+    term = models.CharField(max_length=200, db_index=True)
+
+    class Meta:
+        unique_together = (("resume", "term"),)
@@ -0,0 +1,96 @@
+import uuid
+
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Account
+from hackathons.models import Role
+from megazord.api.caching import bump_versions, get_version_key
+from megazord.models import bump_revisions
+from resumes.models import HardSkillTag, Resume, ResumeTerm, SoftSkillTag
+from utils.skills import normalize_term
+
+SKILL_MODELS = (HardSkillTag, SoftSkillTag)
+M2M_ACTIONS = ("post_add", "post_remove", "post_clear")
+
+
+def index_resume(resume_id: uuid.UUID) -> None:
+    terms = {
+        normalize_term(text)
+        for model in SKILL_MODELS
+        for text in model.objects.filter(resume_id=resume_id).values_list(
+            "tag_text", flat=True
+        )
+    }
+    ResumeTerm.objects.filter(resume_id=resume_id).exclude(term__in=terms).delete()
+    ResumeTerm.objects.bulk_create(
+        [ResumeTerm(resume_id=resume_id, term=term) for term in terms],
+        ignore_conflicts=True,
+    )
+
+
+def bump_resumes(resumes: QuerySet[Resume]) -> None:
+    for ids in resumes.values("hackathon_id", "user_id"):
+        bump_versions(get_version_key("resume", ids["hackathon_id"], ids["user_id"]))
+    bump_revisions(resumes)
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_delete, sender=Resume)
+def resume_changed(sender, instance, **kwargs):
+    bump_versions(get_version_key("resume", instance.hackathon_id, instance.user_id))
+
+
+@receiver(m2m_changed, sender=Role.users.through)
+def roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Resumes show the role of their user in the hackathon.
+    """
+    if action not in M2M_ACTIONS:
+        return
+
+    if reverse:
+        hackathon_ids = Role.objects.filter(id__in=pk_set or ()).values_list(
+            "hackathon_id", flat=True
+        )
+        resumes = Resume.objects.filter(user=instance, hackathon_id__in=hackathon_ids)
+    else:
+        resumes = Resume.objects.filter(
+            hackathon_id=instance.hackathon_id, user_id__in=pk_set or ()
+        )
+
+    bump_resumes(resumes)
+
+
+@receiver(post_save, sender=HardSkillTag)
+@receiver(post_save, sender=SoftSkillTag)
+def skill_saved(sender, instance, created, **kwargs):
+    if created:
+        ResumeTerm.objects.bulk_create(
+            [
+                ResumeTerm(
+                    resume_id=instance.resume_id, term=normalize_term(instance.tag_text)
+                )
+            ],
+            ignore_conflicts=True,
+        )
+    else:
+        index_resume(instance.resume_id)
+    bump_resumes(Resume.objects.filter(id=instance.resume_id))
+
+
+@receiver(post_delete, sender=HardSkillTag)
+@receiver(post_delete, sender=SoftSkillTag)
+def skill_deleted(sender, instance, origin, **kwargs):
+    # terms are deleted together with the resume
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model in SKILL_MODELS:
+        index_resume(instance.resume_id)
+        bump_resumes(Resume.objects.filter(id=instance.resume_id))
+
+
+@receiver(post_save, sender=Account)
+def account_saved(sender, instance, created, **kwargs):
+    if not created:
+        bump_resumes(Resume.objects.filter(user=instance))
@@ -1,11 +1,13 @@
+from asgiref.sync import async_to_sync
 from django.db import IntegrityError
 from django.test import TestCase
 from ninja.testing import TestAsyncClient
 
 from accounts.models import Account
-from hackathons.models import Hackathon
+from hackathons.models import Hackathon, Role
 from profiles.schemas import ProfileSchema
 from resumes.api import router
+from resumes.models import ResumeTerm
 
 
 class TestResumesAPI(TestCase):
@@ -93,3 +95,38 @@ class TestResumesAPI(TestCase):
 
         del response_data["id"]
         self.assertEqual(response_data, new_resume)
+
+    def test_resume_get_follows_changes(self) -> None:
+        get = async_to_sync(self.api_client.get)
+        async_to_sync(self.api_client.post)(
+            path="/create/custom", json=self.resume_schema, user=self.user
+        )
+        path = f"/get?user_id={self.user.id}&hackathon_id={self.hackathon.id}"
+        get(path=path, user=self.user)
+
+        new_resume = self.resume_schema | {"tech": ["python"]}
+        with self.captureOnCommitCallbacks(execute=True):
+            async_to_sync(self.api_client.patch)(
+                path="/edit", json=new_resume, user=self.user
+            )
+        response = get(path=path, user=self.user)
+        self.assertEqual(response.json()["tech"], ["python"])
+
+        role = Role.objects.create(hackathon=self.hackathon, name="backend")
+        with self.captureOnCommitCallbacks(execute=True):
+            role.users.add(self.user, through_defaults={"hackathon": self.hackathon})
+        response = get(path=path, user=self.user)
+        self.assertEqual(response.json()["role"], "backend")
+
+    async def test_resume_edit_updates_terms(self) -> None:
+        await self.api_client.post(
+            path="/create/custom", json=self.resume_schema, user=self.user
+        )
+        new_resume = self.resume_schema | {"tech": [" Python", "python"], "soft": []}
+
+        await self.api_client.patch(path="/edit", json=new_resume, user=self.user)
+
+        terms = ResumeTerm.objects.filter(resume__user=self.user).values_list(
+            "term", flat=True
+        )
+        self.assertEqual([term async for term in terms], ["python"])
@@ -1,6 +1,7 @@
 import uuid
+from dataclasses import asdict
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
 import jwt
 from django.db.models import Q
@@ -9,16 +10,19 @@ from ninja import Query, Router
 
 from accounts.models import Account
 from hackathons.models import Hackathon
+from megazord.api.caching import cache_response, get_version_key, shared_scope
 from megazord.api.codes import ERROR_CODES
+from megazord.api.conditional import conditional, get_revisions
+from megazord.api.pagination import CursorPage, ListParams, paginate, render_page
 from megazord.api.requests import APIRequest
 from megazord.schemas import ErrorSchema, StatusSchema
 from megazord.settings import SECRET_KEY
 from resumes.models import Resume
 from utils.notification import send_notification
-from vacancies.entities import VacancyEntity
 from vacancies.models import Apply, Keyword, Vacancy
 
 from .entities import TeamEntity
+from .matching import rank_candidates, recommend_vacancies
 from .models import Team, Token
 from .schemas import (
     ApplySchema,
@@ -274,16 +278,24 @@ async def edit_team(
     return 200, await team.to_entity()
 
 
-@team_router.get(path="/", response={200: list[TeamSchema], ERROR_CODES: ErrorSchema})
+@team_router.get(
+    path="/", response={200: CursorPage[TeamSchema], ERROR_CODES: ErrorSchema}
+)
+@conditional(
+    # the hackathon has the roles teams are filtered by
+    lambda request, hackathon_id, **_: get_revisions(
+        Team.objects.filter(hackathon_id=hackathon_id),
+        Hackathon.objects.filter(id=hackathon_id),
+    )
+)
 async def get_teams(
     request: APIRequest,
     hackathon_id: uuid.UUID,
+    params: Query[ListParams],
     include_roles: Optional[List[str]] = Query(None),
     not_include_roles: Optional[List[str]] = Query(None),
-) -> tuple[int, list[TeamSchema]]:
-    teams_query_set = Team.objects.filter(hackathon_id=hackathon_id).prefetch_related(
-        "team_members", "vacancies__keywords", "hackathon__roles"
-    )
+):
+    teams_query_set = Team.objects.filter(hackathon_id=hackathon_id)
 
     if include_roles:
         for role in include_roles:
@@ -297,22 +309,42 @@ async def get_teams(
                 Q(hackathon__roles__name__iexact=role)
             ).distinct()
 
-    teams = [await team.to_entity() async for team in teams_query_set]
+    expandable = ["team_members"]
+    include = params.get_include(TeamSchema, expandable)
+    page, next_cursor = await paginate(teams_query_set, params, ordering=("name", "id"))
+    teams = await Team.fetch_entities(page, params.get_expand(expandable))
 
-    return 200, teams
+    return render_page(TeamSchema, teams, include, next_cursor)
 
 
 @team_router.get(
     path="/team_vacancies",
-    response={200: list[VacancySchema], ERROR_CODES: ErrorSchema},
+    response={200: CursorPage[VacancySchema], ERROR_CODES: ErrorSchema},
+)
+@conditional(
+    lambda request, id, params: get_revisions(
+        Team.objects.filter(id=id), Vacancy.objects.filter(team_id=id), required=True
+    )
+)
+@cache_response(
+    depends=lambda id, params: [
+        get_version_key("team", id),
+    ],
+    scope=shared_scope,
 )
 async def get_team_vacancies(
-    request: APIRequest, id: uuid.UUID
-) -> tuple[int, list[VacancyEntity]]:
+    request: APIRequest, id: uuid.UUID, params: Query[ListParams]
+):
     team = await aget_object_or_404(Team.objects, id=id)
-    vacancies = [await vacancy.to_entity() async for vacancy in team.vacancies.all()]
 
-    return 200, vacancies
+    expandable = ["team"]
+    include = params.get_include(VacancySchema, expandable)
+    page, next_cursor = await paginate(
+        team.vacancies.all(), params, ordering=("name", "id")
+    )
+    vacancies = await Vacancy.to_entities(page, params.get_expand(expandable))
+
+    return render_page(VacancySchema, vacancies, include, next_cursor)
 
 
 @team_router.get(
@@ -320,33 +352,28 @@ async def get_team_vacancies(
     response={200: UsersSuggestionForVacancySchema, ERROR_CODES: ErrorSchema},
 )
 async def get_suggest_users_for_specific_vacancy(
-    request: APIRequest, vacansion_id: uuid.UUID
+    request: APIRequest,
+    vacansion_id: uuid.UUID,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
 ):
-    vacancy = await aget_object_or_404(Vacancy, id=vacansion_id)
-    keywords = {keyword.text.lower() async for keyword in vacancy.keywords.all()}
-    hackathon = await Hackathon.objects.aget(team__id=vacancy.team_id)
-
-    participants_without_team = hackathon.participants.exclude(
-        team_members__hackathon=hackathon
+    vacancy = await aget_object_or_404(
+        Vacancy.objects.select_related("team"), id=vacansion_id
     )
-    matching = {}
-    async for participant in participants_without_team:
-        try:
-            resume = await Resume.objects.aget(user=participant)
-        except Resume.DoesNotExist:
-            continue
-
-        skills = set()
-        async for skill in resume.soft_skills.all():
-            skills.add(skill.tag_text.lower())
-        async for skill in resume.hard_skills.all():
-            skills.add(skill.tag_text.lower())
-
-        matching[participant] = len(skills & keywords)
-
-    rating = sorted(matching.items(), key=lambda item: item[1], reverse=True)
+    count, candidates = await rank_candidates(
+        vacancy, hackathon_id=vacancy.team.hackathon_id, limit=limit, offset=offset
+    )
+
     return 200, UsersSuggestionForVacancySchema(
-        users=[await user.to_entity() for user, rate in rating]
+        count=count,
+        users=[
+            UsersSuggestionForVacancySchema.ProfileWithKeywords(
+                **asdict(await candidate.resume.user.to_entity()),
+                keywords=candidate.keywords,
+                score=candidate.score,
+            )
+            for candidate in candidates
+        ],
     )
 
 
@@ -359,37 +386,32 @@ async def get_suggest_vacancies_for_specific_user(
     resume_id: uuid.UUID,
     include_roles: Optional[str] = None,
     not_include_roles: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
 ):
-    include_roles = include_roles.split(",") if include_roles else []
-    not_include_roles = not_include_roles.split(",") if not_include_roles else []
-
     resume = await aget_object_or_404(Resume, id=resume_id)
-    teams = Team.objects.filter(hackathon_id=resume.hackathon_id)
-
-    skills = set()
-    async for soft in resume.soft_skills.all():
-        skills.add(soft.tag_text.lower())
-    async for hard in resume.hard_skills.all():
-        skills.add(hard.tag_text.lower())
-
-    matching = {}
-    async for team in teams:
-        async for vacancy in team.vacancies.all():
-            keywords = {
-                keyword.text.lower() async for keyword in vacancy.keywords.all()
-            }
-            if include_roles:
-                if not all(role.lower() in keywords for role in include_roles):
-                    continue
-            if not_include_roles:
-                if any(role.lower() in keywords for role in not_include_roles):
-                    continue
-            matching[vacancy] = len(keywords & skills)
-
-    rating = sorted(matching.items(), key=lambda item: item[1], reverse=True)
+    count, rating = await recommend_vacancies(
+        resume,
+        include_roles=include_roles.split(",") if include_roles else [],
+        not_include_roles=not_include_roles.split(",") if not_include_roles else [],
+        limit=limit,
+        offset=offset,
+    )
+    vacancies = {
+        vacancy.id: vacancy
+        for vacancy in await Vacancy.to_entities(
+            Vacancy.objects.filter(id__in=[vacancy_id for vacancy_id, _ in rating])
+        )
+    }
 
     return 200, VacancySuggestionForUserSchema(
-        vacantions=[await vacancy.to_entity() for vacancy, rate in rating]
+        count=count,
+        vacantions=[
+            VacancySuggestionForUserSchema.VacancyWithScore(
+                **asdict(vacancies[vacancy_id]), score=score
+            )
+            for vacancy_id, score in rating
+        ],
     )
 
 
@@ -426,19 +448,36 @@ async def apply_for_job(request: APIRequest, vac_id: uuid.UUID):
 
 @team_router.get(
     path="/get_applies_for_team",
-    response={200: list[ApplySchema], ERROR_CODES: ErrorSchema},
+    response={200: CursorPage[ApplySchema], ERROR_CODES: ErrorSchema},
 )
-async def get_team_applies(request: APIRequest, team_id: uuid.UUID):
+async def get_team_applies(
+    request: APIRequest, team_id: uuid.UUID, params: Query[ListParams]
+):
     team = await aget_object_or_404(Team, id=team_id)
     if team.creator_id != request.user.id:
         return 403, ErrorSchema(detail="You are not creator of this team")
 
-    applies = [await apply.to_entity() async for apply in team.applies.all()]
+    include = params.get_include(ApplySchema, expandable=[])
+    page, next_cursor = await paginate(team.applies.all(), params, ordering=("id",))
+    applies = await Apply.to_entities(page)
 
-    return 200, applies
+    return render_page(ApplySchema, applies, include, next_cursor)
 
 
 @team_router.get(path="/{team_id}", response={200: TeamSchema})
+@conditional(
+    lambda request, team_id: get_revisions(
+        Team.objects.filter(id=team_id), required=True
+    ),
+    schema=TeamSchema,
+)
+@cache_response(
+    depends=lambda team_id: [
+        get_version_key("team", team_id),
+    ],
+    schema=TeamSchema,
+    scope=shared_scope,
+)
 async def get_team_by_id(
     request: APIRequest, team_id: uuid.UUID
 ) -> tuple[int, TeamEntity]:
@@ -0,0 +1,74 @@
+import random
+import statistics
+import time
+import uuid
+from argparse import ArgumentParser
+
+from django.core.management import BaseCommand
+
+from teams.matching import score_documents, select_top
+from utils.skills import get_idf
+
+
+class Command(BaseCommand):
+    help = "Measure candidates ranking latency on synthetic resumes"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("--resumes", type=int, default=10_000)
+        parser.add_argument("--skills", type=int, default=10, help="Skills per resume")
+        parser.add_argument("--vocabulary", type=int, default=1_000)
+        parser.add_argument(
+            "--keywords", type=int, default=8, help="Keywords per vacancy"
+        )
+        parser.add_argument("--runs", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(
+        self,
+        resumes: int,
+        skills: int,
+        vocabulary: int,
+        keywords: int,
+        runs: int,
+        seed: int,
+        *args,
+        **kwargs,
+    ) -> None:
+        rng = random.Random(seed)
+        terms = [f"skill_{i}" for i in range(vocabulary)]
+        # a few skills are common and most are rare, like in real resumes
+        popularity = [1 / (rank + 1) for rank in range(vocabulary)]
+
+        documents = [uuid.uuid4() for _ in range(resumes)]
+        resume_terms = {
+            document: set(rng.choices(terms, weights=popularity, k=skills))
+            for document in documents
+        }
+        frequencies = dict.fromkeys(terms, 0)
+        for document_terms in resume_terms.values():
+            for term in document_terms:
+                frequencies[term] += 1
+
+        timings = []
+        for _ in range(runs):
+            query = set(rng.choices(terms, weights=popularity, k=keywords))
+            weights = {term: get_idf(resumes, frequencies[term]) for term in query}
+            # the database returns only postings of the query terms
+            postings = [
+                (document, term)
+                for document in documents
+                for term in resume_terms[document] & query
+            ]
+
+            started = time.perf_counter()
+            scores = score_documents(documents, postings, weights)
+            select_top(scores, limit=20, offset=0)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f"Ranked {resumes} resumes in {runs} runs: "
+            f"p50={statistics.median(timings):.2f}ms, "
+            f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms, "
+            f"max={timings[-1]:.2f}ms"
+        )
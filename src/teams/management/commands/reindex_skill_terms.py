@@ -0,0 +1,30 @@
+from django.core.management import BaseCommand
+from django.db.models import F
+
+from hackathons.models import Hackathon
+from resumes.models import Resume
+from resumes.signals import index_resume
+from vacancies.models import Vacancy
+from vacancies.signals import index_vacancy
+
+
+class Command(BaseCommand):
+    help = "Rebuild skill terms of resumes and vacancies after synonyms have changed"
+
+    def handle(self, *args, **kwargs) -> None:
+        resumes = 0
+        for resume_id in Resume.objects.values_list("id", flat=True).iterator():
+            index_resume(resume_id)
+            resumes += 1
+
+        vacancies = 0
+        for vacancy_id in Vacancy.objects.values_list("id", flat=True).iterator():
+            index_vacancy(vacancy_id)
+            vacancies += 1
+
+        Hackathon.objects.update(keywords_version=F("keywords_version") + 1)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reindexed terms of {resumes} resumes and {vacancies} vacancies"
+            )
+        )
@@ -0,0 +1,274 @@
+import hashlib
+import heapq
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+from django.core.cache import cache
+from django.db.models import Count, QuerySet
+
+from accounts.models import Account
+from hackathons.models import Hackathon
+from megazord.settings import SKILL_WEIGHTS_TIMEOUT
+from resumes.models import Resume, ResumeTerm
+from utils.skills import get_idf, normalize_term
+from vacancies.models import Vacancy, VacancyTerm
+
+# cached entries are keyed on the keywords version of the hackathon,
+# so the timeout only bounds the memory taken by outdated versions
+RECOMMENDATIONS_CACHE_TIMEOUT = 60 * 60
+
+
+def get_participants_without_team(hackathon_id: uuid.UUID) -> QuerySet[Account]:
+    return Account.objects.filter(hackathons__id=hackathon_id).exclude(
+        team_members__hackathon_id=hackathon_id
+    )
+
+
+@dataclass(frozen=True)
+class SkillWeights:
+    """
+    Document frequencies of the skill terms among resumes of a hackathon.
+    """
+
+    documents: int
+    frequencies: dict[str, int]
+
+    @classmethod
+    async def build(cls, hackathon_id: uuid.UUID) -> "SkillWeights":
+        terms = (
+            ResumeTerm.objects.filter(resume__hackathon_id=hackathon_id)
+            .values("term")
+            .annotate(frequency=Count("resume_id"))
+            .values_list("term", "frequency")
+        )
+        return cls(
+            documents=await Resume.objects.filter(hackathon_id=hackathon_id).acount(),
+            frequencies={term: frequency async for term, frequency in terms},
+        )
+
+    def get(self, term: str) -> float:
+        return get_idf(self.documents, self.frequencies.get(term, 0))
+
+
+async def get_skill_weights(hackathon_id: uuid.UUID) -> SkillWeights:
+    key = f"skill-weights:{hackathon_id}"
+    weights = await cache.aget(key)
+    if weights is None:
+        weights = await SkillWeights.build(hackathon_id)
+        await cache.aset(key, weights, timeout=SKILL_WEIGHTS_TIMEOUT)
+
+    return weights
+
+
+def score_documents(
+    documents: Sequence[uuid.UUID],
+    postings: Iterable[tuple[uuid.UUID, str]],
+    weights: dict[str, float],
+) -> list[float]:
+    """
+    Share of the query weight matched by each document, in a single pass
+    over the (document, term) postings of the query terms.
+    """
+    positions = {document: i for i, document in enumerate(documents)}
+    scores = [0.0] * len(documents)
+    for document, term in postings:
+        scores[positions[document]] += weights[term]
+
+    total = sum(weights.values()) or 1.0
+    return [score / total for score in scores]
+
+
+def select_top(scores: Sequence[float], limit: int, offset: int) -> list[int]:
+    """
+    Positions of the requested page of best scores,
+    equal scores keep the original order.
+    """
+    top = heapq.nlargest(
+        offset + limit, range(len(scores)), key=lambda i: (scores[i], -i)
+    )
+    return top[offset:]
+
+
+@dataclass
+class RankedCandidate:
+    resume: Resume
+    score: float
+    keywords: list[str] = field(default_factory=list)
+
+
+async def rank_candidates(
+    vacancy: Vacancy, hackathon_id: uuid.UUID, limit: int, offset: int
+) -> tuple[int, list[RankedCandidate]]:
+    """
+    Resumes of participants without a team ranked by the TF-IDF weight
+    of the vacancy keywords among their skills. Returns the number of
+    candidates and the requested page of them.
+    """
+    resumes = Resume.objects.filter(
+        hackathon_id=hackathon_id,
+        user__in=get_participants_without_team(hackathon_id),
+    )
+    candidates = [
+        id async for id in resumes.order_by("user__email").values_list("id", flat=True)
+    ]
+    skill_weights = await get_skill_weights(hackathon_id)
+    weights = {
+        term: skill_weights.get(term)
+        async for term in vacancy.terms.values_list("term", flat=True)
+    }
+
+    postings = [
+        posting
+        async for posting in ResumeTerm.objects.filter(
+            resume__in=resumes, term__in=weights
+        ).values_list("resume_id", "term")
+    ]
+    scores = score_documents(candidates, postings, weights)
+    top = select_top(scores, limit=limit, offset=offset)
+
+    keywords = defaultdict(list)
+    for resume_id, term in postings:
+        keywords[resume_id].append(term)
+    page = await Resume.objects.select_related("user").ain_bulk(
+        [candidates[i] for i in top]
+    )
+
+    return len(candidates), [
+        RankedCandidate(
+            resume=page[candidates[i]],
+            score=scores[i],
+            keywords=sorted(keywords[candidates[i]]),
+        )
+        for i in top
+    ]
+
+
+@dataclass(frozen=True)
+class KeywordMatrix:
+    """
+    Vacancies of a hackathon with their keyword terms,
+    stored as term -> vacancies to score a resume by its skills only.
+    """
+
+    # vacancies in the order used to break ties between equal scores
+    vacancies: tuple[uuid.UUID, ...]
+    term_vacancies: dict[str, frozenset[uuid.UUID]]
+
+    @classmethod
+    async def build(cls, hackathon_id: uuid.UUID) -> "KeywordMatrix":
+        vacancies = Vacancy.objects.filter(team__hackathon_id=hackathon_id).order_by(
+            "team__name", "name", "id"
+        )
+        terms = VacancyTerm.objects.filter(vacancy__team__hackathon_id=hackathon_id)
+
+        term_vacancies = defaultdict(set)
+        async for vacancy_id, term in terms.values_list("vacancy_id", "term"):
+            term_vacancies[term].add(vacancy_id)
+
+        return cls(
+            vacancies=tuple(
+                [id async for id in vacancies.values_list("id", flat=True)]
+            ),
+            term_vacancies={
+                term: frozenset(vacancies) for term, vacancies in term_vacancies.items()
+            },
+        )
+
+    def get_weight(self, term: str) -> float:
+        return get_idf(len(self.vacancies), len(self.term_vacancies.get(term, ())))
+
+    def select(self, include: Iterable[str], exclude: Iterable[str]) -> set[uuid.UUID]:
+        """
+        Vacancies having all included terms and none of the excluded ones.
+        """
+        selected = set(self.vacancies)
+        for term in include:
+            selected &= self.term_vacancies.get(term, frozenset())
+        for term in exclude:
+            selected -= self.term_vacancies.get(term, frozenset())
+
+        return selected
+
+    def score(
+        self, skills: Iterable[str], selected: set[uuid.UUID]
+    ) -> list[tuple[uuid.UUID, float]]:
+        """
+        Share of the keywords weight of each selected vacancy
+        that is matched by the skills.
+        """
+        matched = dict.fromkeys(selected, 0.0)
+        for term in skills:
+            weight = self.get_weight(term)
+            for vacancy_id in self.term_vacancies.get(term, ()):
+                if vacancy_id in matched:
+                    matched[vacancy_id] += weight
+
+        totals = dict.fromkeys(selected, 0.0)
+        for term, vacancies in self.term_vacancies.items():
+            weight = self.get_weight(term)
+            for vacancy_id in vacancies & selected:
+                totals[vacancy_id] += weight
+
+        return [
+            (vacancy_id, matched[vacancy_id] / (totals[vacancy_id] or 1.0))
+            for vacancy_id in self.vacancies
+            if vacancy_id in matched
+        ]
+
+
+async def get_keyword_matrix(hackathon_id: uuid.UUID, version: int) -> KeywordMatrix:
+    key = f"keyword-matrix:{hackathon_id}:{version}"
+    matrix = await cache.aget(key)
+    if matrix is None:
+        matrix = await KeywordMatrix.build(hackathon_id)
+        await cache.aset(key, matrix, timeout=RECOMMENDATIONS_CACHE_TIMEOUT)
+
+    return matrix
+
+
+def make_scores_key(
+    resume: Resume,
+    version: int,
+    skills: Iterable[str],
+    include: Iterable[str],
+    exclude: Iterable[str],
+) -> str:
+    # skills are a part of the key, so edits of the resume are never stale
+    digest = hashlib.sha256(
+        "\0".join(
+            ["|".join(sorted(terms)) for terms in (skills, include, exclude)]
+        ).encode()
+    ).hexdigest()
+    return f"vacancy-scores:{resume.id}:{version}:{digest}"
+
+
+async def recommend_vacancies(
+    resume: Resume,
+    include_roles: Iterable[str],
+    not_include_roles: Iterable[str],
+    limit: int,
+    offset: int,
+) -> tuple[int, list[tuple[uuid.UUID, float]]]:
+    """
+    Vacancies of the resume hackathon ranked by the TF-IDF weight of the
+    resume skills among their keywords. Returns the number of matching
+    vacancies and the requested page of (vacancy id, score) pairs.
+    """
+    version = await Hackathon.objects.values_list("keywords_version", flat=True).aget(
+        id=resume.hackathon_id
+    )
+    skills = {term async for term in resume.terms.values_list("term", flat=True)}
+    include = {normalize_term(role) for role in include_roles}
+    exclude = {normalize_term(role) for role in not_include_roles}
+
+    key = make_scores_key(resume, version, skills, include, exclude)
+    scores = await cache.aget(key)
+    if scores is None:
+        matrix = await get_keyword_matrix(resume.hackathon_id, version)
+        scores = matrix.score(skills, matrix.select(include, exclude))
+        await cache.aset(key, scores, timeout=RECOMMENDATIONS_CACHE_TIMEOUT)
+
+    top = select_top([score for _, score in scores], limit=limit, offset=offset)
+    return len(scores), [scores[i] for i in top]
@@ -1,18 +1,24 @@
+import asyncio
 import logging
 import uuid
+from collections import defaultdict
+from typing import Collection, Iterable
 
 from asgiref.sync import sync_to_async
 from django.db import models
+from django.db.models import Q, QuerySet
 
 from accounts.models import Account
 from hackathons.models import Hackathon
+from megazord.db import fetch, fetch_rows
+from megazord.models import RevisionModel
 from teams.entities import TeamEntity
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class Team(models.Model):
+class Team(RevisionModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     hackathon = models.ForeignKey(Hackathon, on_delete=models.CASCADE, null=False)
     name = models.CharField(max_length=200, blank=False)
@@ -20,14 +26,31 @@ class Team(models.Model):
     team_members = models.ManyToManyField(Account, related_name="team_members")
     is_hand_create = models.BooleanField(default=False)
 
-    async def to_entity(self) -> TeamEntity:
+    async def to_entity(self, expand: Collection[str] | None = None) -> TeamEntity:
+        if expand is not None and "team_members" not in expand:
+            return TeamEntity(
+                id=self.id,
+                hackathon_id=str(self.hackathon_id),
+                name=self.name,
+                creator_id=str(self.creator_id),
+                team_members=[],
+            )
+
         creator = await sync_to_async(lambda: self.creator)()
+        # filter in place so that prefetched members are reused
+        members = [member async for member in self.team_members.all()]
+        return await self.make_entity(creator, members)
+
+    async def make_entity(
+        self, creator: Account, members: Iterable[Account]
+    ) -> TeamEntity:
         creator_entity = await creator.to_entity()
         logger.info(f"Creator entity: {creator_entity}")
 
         members_entities = [
             await member.to_entity()
-            async for member in self.team_members.exclude(id=self.creator_id)
+            for member in members
+            if member.id != self.creator_id
         ]
         logger.info(f"Members entities: {members_entities}")
         return TeamEntity(
@@ -38,6 +61,50 @@ class Team(models.Model):
             team_members=[creator_entity] + members_entities,
         )
 
+    @classmethod
+    async def to_entities(
+        cls, queryset: QuerySet["Team"], expand: Collection[str] | None = None
+    ) -> list[TeamEntity]:
+        if expand is None or "team_members" in expand:
+            queryset = queryset.select_related("creator").prefetch_related(
+                "team_members"
+            )
+        return [await team.to_entity(expand) async for team in queryset]
+
+    @classmethod
+    async def fetch_entities(
+        cls, queryset: QuerySet["Team"], expand: Collection[str] | None = None
+    ) -> list[TeamEntity]:
+        """
+        Same as `to_entities`, read natively with teams, their creators
+        and members queried at the same time.
+        """
+        if expand is not None and "team_members" not in expand:
+            return [await team.to_entity(expand) for team in await fetch(queryset)]
+
+        teams, accounts, memberships = await asyncio.gather(
+            fetch(queryset),
+            fetch(
+                Account.objects.filter(
+                    Q(team__in=queryset) | Q(team_members__in=queryset)
+                ).distinct()
+            ),
+            fetch_rows(
+                cls.team_members.through.objects.filter(team__in=queryset)
+                .order_by("id")
+                .values_list("team_id", "account_id")
+            ),
+        )
+        accounts_by_id = {account.id: account for account in accounts}
+        members = defaultdict(list)
+        for team_id, account_id in memberships:
+            members[team_id].append(accounts_by_id[account_id])
+
+        return [
+            await team.make_entity(accounts_by_id[team.creator_id], members[team.id])
+            for team in teams
+        ]
+
 
 class Token(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -49,15 +49,21 @@ class VacancySchema(Schema):
     id: uuid.UUID
     name: str
     keywords: list[str]
-    team: TeamSchema
+    team: TeamSchema | None = None
 
 
 class VacancySuggestionForUserSchema(Schema):
-    vacantions: list[VacancySchema]
+    class VacancyWithScore(VacancySchema):
+        score: float = 0
+
+    count: int
+    vacantions: list[VacancyWithScore]
 
 
 class UsersSuggestionForVacancySchema(Schema):
     class ProfileWithKeywords(ProfileSchema):
         keywords: list[str] = []
+        score: float = 0
 
+    count: int
     users: list[ProfileWithKeywords]
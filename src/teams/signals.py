@@ -0,0 +1,46 @@
+from django.db.models import Q, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import Account
+from megazord.api.caching import bump_versions, get_version_key
+from megazord.models import bump_revisions
+from teams.models import Team
+
+M2M_ACTIONS = ("post_add", "post_remove", "post_clear")
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def team_changed(sender, instance, **kwargs):
+    bump_versions(get_version_key("team", instance.id))
+
+
+@receiver(m2m_changed, sender=Team.team_members.through)
+def team_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_ACTIONS:
+        return
+
+    team_ids = (pk_set or ()) if reverse else {instance.id}
+    bump_versions(*(get_version_key("team", team_id) for team_id in team_ids))
+    bump_revisions(Team.objects.filter(id__in=team_ids))
+
+
+def bump_teams(teams: QuerySet[Team]) -> None:
+    team_ids = set(teams.values_list("id", flat=True))
+    bump_versions(*(get_version_key("team", team_id) for team_id in team_ids))
+    bump_revisions(Team.objects.filter(id__in=team_ids))
+
+
+@receiver(post_save, sender=Account)
+def account_saved(sender, instance, created, **kwargs):
+    # teams are served with their creator and members
+    if not created:
+        bump_teams(Team.objects.filter(Q(creator=instance) | Q(team_members=instance)))
+
+
+@receiver(pre_delete, sender=Account)
+def account_deleted(sender, instance, **kwargs):
+    # members are removed by the cascade, which sends no m2m_changed,
+    # teams of the creator are deleted with it
+    bump_teams(Team.objects.filter(team_members=instance))
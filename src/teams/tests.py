@@ -0,0 +1,462 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestAsyncClient
+
+from accounts.models import Account
+from hackathons.models import Hackathon
+from megazord.api.caching import get_version_key, get_versions
+from resumes.models import Resume
+from teams.api import team_router
+from teams.models import Team
+from vacancies.models import Keyword, Vacancy
+
+
+class TestTeamsAPI(TestCase):
+    def setUp(self) -> None:
+        self.api_client = TestAsyncClient(team_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user, name="test", description="test"
+        )
+
+    def create_team(self, name: str) -> Team:
+        creator = Account.objects.create_user(
+            email=f"{name}@example.org",
+            username=name,
+            is_organizator=False,
+            password="test",
+        )
+        team = Team.objects.create(hackathon=self.hackathon, name=name, creator=creator)
+        team.team_members.add(creator)
+        for i in range(2):
+            member = Account.objects.create_user(
+                email=f"{name}_{i}@example.org",
+                username=f"{name}_{i}",
+                is_organizator=False,
+                password="test",
+            )
+            team.team_members.add(member)
+
+            vacancy = Vacancy.objects.create(team=team, name=f"vacancy_{i}")
+            Keyword.objects.create(vacancy=vacancy, text="python")
+
+        return team
+
+    def count_queries(self, path: str) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(self.api_client.get)(path, user=self.user)
+
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    async def test_get_teams(self) -> None:
+        team = await Team.objects.acreate(
+            hackathon=self.hackathon, name="team", creator=self.user
+        )
+        await team.team_members.aadd(self.user)
+
+        response = await self.api_client.get(
+            f"/?hackathon_id={self.hackathon.id}&expand=team_members", user=self.user
+        )
+
+        self.assertEqual(response.status_code, 200)
+        [team_data] = response.json()["items"]
+        self.assertEqual(team_data["id"], str(team.id))
+        self.assertEqual(
+            [member["id"] for member in team_data["team_members"]], [str(self.user.id)]
+        )
+
+    def test_get_teams_pages_equal_names(self) -> None:
+        teams = {
+            str(
+                Team.objects.create(
+                    hackathon=self.hackathon, name="same", creator=self.user
+                ).id
+            )
+            for _ in range(3)
+        }
+
+        first = async_to_sync(self.api_client.get)(
+            f"/?hackathon_id={self.hackathon.id}&limit=2", user=self.user
+        ).json()
+        second = async_to_sync(self.api_client.get)(
+            f"/?hackathon_id={self.hackathon.id}&limit=2"
+            f"&cursor={first['next_cursor']}",
+            user=self.user,
+        ).json()
+
+        self.assertIsNone(second["next_cursor"])
+        self.assertEqual(
+            {team["id"] for team in first["items"] + second["items"]}, teams
+        )
+        self.assertNotIn("team_members", first["items"][0])
+
+    def test_get_teams_queries_do_not_grow(self) -> None:
+        path = f"/?hackathon_id={self.hackathon.id}&expand=team_members"
+
+        self.create_team("first")
+        one_team_queries = self.count_queries(path)
+
+        self.create_team("second")
+        self.create_team("third")
+        three_teams_queries = self.count_queries(path)
+
+        self.assertEqual(one_team_queries, three_teams_queries)
+
+    def test_get_team_vacancies(self) -> None:
+        team = self.create_team("first")
+
+        response = async_to_sync(self.api_client.get)(
+            f"/team_vacancies?id={team.id}&expand=team", user=self.user
+        )
+
+        self.assertEqual(response.status_code, 200)
+        vacancies = response.json()["items"]
+        self.assertEqual(len(vacancies), 2)
+        for vacancy in vacancies:
+            self.assertEqual(vacancy["keywords"], ["python"])
+            self.assertEqual(vacancy["team"]["id"], str(team.id))
+            self.assertEqual(len(vacancy["team"]["team_members"]), 3)
+
+    def test_get_team_is_cached(self) -> None:
+        team = self.create_team("first")
+        path = f"/{team.id}"
+
+        self.assertGreater(self.count_queries(path), 1)
+        # only revisions of the rows are read
+        self.assertEqual(self.count_queries(path), 1)
+
+        member = Account.objects.create_user(
+            email="new@example.org",
+            username="new",
+            is_organizator=False,
+            password="test",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            team.team_members.add(member)
+        response = async_to_sync(self.api_client.get)(path, user=self.user)
+        self.assertEqual(len(response.json()["team_members"]), 4)
+
+        member.username = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            member.save()
+        response = async_to_sync(self.api_client.get)(path, user=self.user)
+        self.assertIn(
+            "renamed", [m["username"] for m in response.json()["team_members"]]
+        )
+
+    def test_other_accounts_do_not_invalidate_cache(self) -> None:
+        team = self.create_team("first")
+        other = self.create_team("second")
+        path = f"/{team.id}"
+        self.count_queries(path)
+
+        other.creator.username = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            other.creator.save()
+
+        self.assertEqual(self.count_queries(path), 1)
+
+    def test_versions_are_bumped_on_commit(self) -> None:
+        team = self.create_team("first")
+        key = get_version_key("team", team.id)
+        [version] = async_to_sync(get_versions)([key])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            team.name = "renamed"
+            team.save()
+            # requests before the commit still read the old rows
+            self.assertEqual(cache.get(key), version)
+
+        self.assertNotEqual(cache.get(key), version)
+
+    def test_deleted_member_invalidates_cache(self) -> None:
+        team = self.create_team("first")
+        path = f"/{team.id}"
+        self.count_queries(path)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            team.team_members.exclude(id=team.creator_id).first().delete()
+
+        response = async_to_sync(self.api_client.get)(path, user=self.user)
+        self.assertEqual(len(response.json()["team_members"]), 2)
+
+    def test_team_vacancies_changes_invalidate_cache(self) -> None:
+        team = self.create_team("first")
+        path = f"/team_vacancies?id={team.id}"
+
+        self.assertGreater(self.count_queries(path), 2)
+        self.assertEqual(self.count_queries(path), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Vacancy.objects.create(team=team, name="vacancy_2")
+        response = async_to_sync(self.api_client.get)(path, user=self.user)
+        self.assertEqual(len(response.json()["items"]), 3)
+
+        # other parameters are cached apart
+        response = async_to_sync(self.api_client.get)(f"{path}&limit=1", user=self.user)
+        self.assertEqual(len(response.json()["items"]), 1)
+
+    def test_get_team_not_modified(self) -> None:
+        team = self.create_team("first")
+        path = f"/{team.id}"
+
+        response = async_to_sync(self.api_client.get)(path, user=self.user)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(self.api_client.get)(
+                path, headers={"If-None-Match": etag}, user=self.user
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(queries), 1)
+
+        member = Account.objects.get(username="first_0")
+        member.username = "renamed"
+        member.save()
+        response = async_to_sync(self.api_client.get)(
+            path, headers={"If-None-Match": etag}, user=self.user
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_get_teams_not_modified(self) -> None:
+        team = self.create_team("first")
+        path = f"/?hackathon_id={self.hackathon.id}"
+
+        response = async_to_sync(self.api_client.get)(path, user=self.user)
+        etag = response["ETag"]
+        response = async_to_sync(self.api_client.get)(
+            path, headers={"If-None-Match": etag}, user=self.user
+        )
+        self.assertEqual(response.status_code, 304)
+
+        team.team_members.remove(team.creator)
+        response = async_to_sync(self.api_client.get)(
+            path, headers={"If-None-Match": etag}, user=self.user
+        )
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        team.delete()
+        response = async_to_sync(self.api_client.get)(
+            path, headers={"If-None-Match": etag}, user=self.user
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["items"], [])
+
+
+class TestSuggestUsersAPI(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.api_client = TestAsyncClient(team_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user, name="test", description="test"
+        )
+        team = Team.objects.create(
+            hackathon=self.hackathon, name="team", creator=self.user
+        )
+        team.team_members.add(self.add_candidate("member", ["python", "django"]))
+        self.vacancy = Vacancy.objects.create(team=team, name="backend")
+        for keyword in ("Python", "Django", "SQL"):
+            Keyword.objects.create(vacancy=self.vacancy, text=keyword)
+
+    def add_candidate(self, name: str, skills: list[str]) -> Account:
+        candidate = Account.objects.create_user(
+            email=f"{name}@example.org",
+            username=name,
+            is_organizator=False,
+            password="test",
+        )
+        self.hackathon.participants.add(candidate)
+        resume = Resume.objects.create(
+            user=candidate, hackathon=self.hackathon, bio="test"
+        )
+        for skill in skills:
+            resume.hard_skills.create(tag_text=skill)
+        resume.soft_skills.create(tag_text="teamwork")
+        return candidate
+
+    def suggest(self, query: str = "") -> dict:
+        response = async_to_sync(self.api_client.get)(
+            f"/suggest_users_for_specific_vacansion/{self.vacancy.id}{query}",
+            user=self.user,
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_suggest_users(self) -> None:
+        self.add_candidate("junior", ["python "])
+        self.add_candidate("senior", ["PYTHON", "sql", "django"])
+        self.add_candidate("designer", ["figma"])
+
+        suggestion = self.suggest()
+
+        self.assertEqual(suggestion["count"], 3)
+        self.assertEqual(
+            [(user["username"], user["keywords"]) for user in suggestion["users"]],
+            [
+                ("senior", ["django", "python", "sql"]),
+                ("junior", ["python"]),
+                ("designer", []),
+            ],
+        )
+        senior, junior, designer = [user["score"] for user in suggestion["users"]]
+        self.assertAlmostEqual(senior, 1)
+        self.assertTrue(0 < junior < 1)
+        self.assertEqual(designer, 0)
+
+        page = self.suggest("?limit=1&offset=1")
+        self.assertEqual(page["count"], 3)
+        self.assertEqual([user["username"] for user in page["users"]], ["junior"])
+
+    def test_keyword_changes_are_indexed(self) -> None:
+        self.add_candidate("designer", ["figma"])
+        self.vacancy.keywords.all().delete()
+        Keyword.objects.create(vacancy=self.vacancy, text="Figma")
+
+        [user] = self.suggest()["users"]
+
+        self.assertEqual((user["username"], user["score"]), ("designer", 1))
+
+    def test_rare_skills_weigh_more(self) -> None:
+        Keyword.objects.create(vacancy=self.vacancy, text="Rust")
+        self.add_candidate("pythonista", ["python"])
+        self.add_candidate("rustacean", ["rust"])
+
+        self.assertEqual(
+            [user["username"] for user in self.suggest()["users"]],
+            ["rustacean", "pythonista"],
+        )
+
+    def test_synonyms(self) -> None:
+        Keyword.objects.create(vacancy=self.vacancy, text="JavaScript")
+        self.add_candidate("frontend", ["JS"])
+
+        [user] = self.suggest()["users"]
+
+        self.assertEqual(user["keywords"], ["javascript"])
+
+    def test_suggest_users_queries_do_not_grow(self) -> None:
+        def count_queries() -> int:
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.suggest()
+            return len(queries)
+
+        self.add_candidate("first", ["python"])
+        one_candidate_queries = count_queries()
+
+        for i in range(10):
+            self.add_candidate(f"candidate_{i}", ["python", "sql"])
+
+        self.assertEqual(one_candidate_queries, count_queries())
+
+
+class TestSuggestVacanciesAPI(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.api_client = TestAsyncClient(team_router)
+
+        self.user = Account.objects.create_user(
+            email="creator@example.org",
+            username="creator",
+            is_organizator=True,
+            password="test",
+        )
+        self.hackathon = Hackathon.objects.create(
+            creator=self.user, name="test", description="test"
+        )
+        self.team = Team.objects.create(
+            hackathon=self.hackathon, name="team", creator=self.user
+        )
+        self.team.team_members.add(self.user)
+        self.resume = Resume.objects.create(
+            user=self.user, hackathon=self.hackathon, bio="test"
+        )
+        for skill in ("Python", "SQL", "Django"):
+            self.resume.hard_skills.create(tag_text=skill)
+
+        self.add_vacancy("frontend", ["typescript", "react", "frontend"])
+        self.add_vacancy("backend", ["python", "django", "backend"])
+        self.add_vacancy("analyst", ["sql", "python", "analytics"])
+
+    def add_vacancy(self, name: str, keywords: list[str]) -> Vacancy:
+        vacancy = Vacancy.objects.create(team=self.team, name=name)
+        for keyword in keywords:
+            Keyword.objects.create(vacancy=vacancy, text=keyword)
+        return vacancy
+
+    def suggest(self, query: str = "") -> dict:
+        response = async_to_sync(self.api_client.get)(
+            f"/suggest_vacansions_for_specific_user/{self.resume.id}{query}",
+            user=self.user,
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def get_rating(self, query: str = "") -> list[str]:
+        return [vacancy["name"] for vacancy in self.suggest(query)["vacantions"]]
+
+    def test_suggest_vacancies(self) -> None:
+        suggestion = self.suggest()
+
+        self.assertEqual(suggestion["count"], 3)
+        analyst, backend, frontend = suggestion["vacantions"]
+        self.assertEqual(
+            [analyst["name"], backend["name"], frontend["name"]],
+            ["analyst", "backend", "frontend"],
+        )
+        self.assertAlmostEqual(analyst["score"], backend["score"])
+        self.assertTrue(0 < backend["score"] < 1)
+        self.assertEqual(frontend["score"], 0)
+        self.assertEqual(analyst["team"]["id"], str(self.team.id))
+
+        self.assertEqual(self.get_rating("?limit=1&offset=1"), ["backend"])
+
+    def test_suggest_vacancies_with_roles(self) -> None:
+        self.assertEqual(self.get_rating("?include_roles=Backend"), ["backend"])
+        self.assertEqual(
+            self.get_rating("?not_include_roles=backend,frontend"), ["analyst"]
+        )
+
+    def test_keyword_changes_invalidate_cache(self) -> None:
+        self.assertEqual(self.get_rating("?limit=1"), ["analyst"])
+
+        backend = Vacancy.objects.get(name="backend")
+        Keyword.objects.create(vacancy=backend, text="sql")
+        self.assertEqual(self.get_rating("?limit=1"), ["backend"])
+
+        backend.delete()
+        self.assertEqual(self.get_rating("?limit=1"), ["analyst"])
+
+    def test_suggest_vacancies_queries_do_not_grow(self) -> None:
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as queries:
+                self.suggest()
+            return len(queries)
+
+        three_vacancies_queries = count_queries()
+
+        for i in range(5):
+            self.add_vacancy(f"vacancy_{i}", ["python"])
+
+        self.assertEqual(three_vacancies_queries, count_queries())
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from itertools import chain
+from smtplib import SMTPException, SMTPServerDisconnected
+from typing import AsyncIterator, Sequence
+
+from asgiref.sync import sync_to_async
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from megazord.metrics import observe_notification
+from megazord.settings import (
+    EMAIL_BATCH_SIZE,
+    EMAIL_CONNECTION_MAX_IDLE,
+    NOTIFICATION_EMAIL_CONCURRENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    def __init__(self, backend: BaseEmailBackend) -> None:
+        self.backend = backend
+        self.last_used = time.monotonic()
+
+    def send(self, message: EmailMessage) -> None:
+        # the server may drop a session at any time,
+        # so the message is sent once more over a fresh one
+        for attempt in range(2):
+            self.backend.open()
+            try:
+                self.backend.send_messages([message])
+                return
+            except SMTPServerDisconnected:
+                self.close()
+                if attempt:
+                    raise
+
+    def send_batch(
+        self, messages: Sequence[EmailMessage], max_idle: float
+    ) -> list[Exception | None]:
+        if time.monotonic() - self.last_used > max_idle:
+            self.close()
+
+        errors = []
+        for message in messages:
+            start = time.perf_counter()
+            try:
+                self.send(message)
+                errors.append(None)
+            except (SMTPException, OSError) as exc:
+                logger.error(f"Failed sent email to `{message.to}`: {exc}")
+                errors.append(exc)
+            observe_notification(
+                "email", errors[-1] is None, time.perf_counter() - start
+            )
+
+        self.last_used = time.monotonic()
+        return errors
+
+    def close(self) -> None:
+        try:
+            self.backend.close()
+        except (SMTPException, OSError):
+            pass
+
+
+class SMTPConnectionPool:
+    """
+    Keeps authenticated SMTP sessions open between messages, so every email
+    does not pay for a TCP connection, TLS handshake and login.
+    """
+
+    def __init__(self, size: int, batch_size: int, max_idle: float) -> None:
+        self.size = size
+        self.batch_size = batch_size
+        self.max_idle = max_idle
+        self._idle: list[PooledConnection] = []
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get_slots(self) -> asyncio.Semaphore:
+        # semaphores are bound to an event loop,
+        # while idle sessions may outlive it
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.size)
+
+        return self._slots
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[PooledConnection]:
+        async with self.get_slots():
+            if self._idle:
+                connection = self._idle.pop()
+            else:
+                connection = PooledConnection(get_connection())
+
+            try:
+                yield connection
+            except BaseException:
+                await sync_to_async(connection.close, thread_sensitive=False)()
+                raise
+            else:
+                self._idle.append(connection)
+
+    async def send_batch(
+        self, messages: Sequence[EmailMessage]
+    ) -> list[Exception | None]:
+        async with self.connection() as connection:
+            # SMTP sessions do not touch the database, so they may run in
+            # parallel instead of queueing on the single thread-sensitive executor
+            return await sync_to_async(connection.send_batch, thread_sensitive=False)(
+                messages, max_idle=self.max_idle
+            )
+
+    async def send_messages(
+        self, messages: Sequence[EmailMessage]
+    ) -> list[Exception | None]:
+        """
+        Send messages in batches over the pooled sessions.
+        Returns an error for every message that has not been sent.
+        """
+        batches = [
+            messages[i : i + self.batch_size]
+            for i in range(0, len(messages), self.batch_size)
+        ]
+        errors = await asyncio.gather(*(self.send_batch(batch) for batch in batches))
+
+        return list(chain.from_iterable(errors))
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
+
+mail_pool = SMTPConnectionPool(
+    size=NOTIFICATION_EMAIL_CONCURRENCY,
+    batch_size=EMAIL_BATCH_SIZE,
+    max_idle=EMAIL_CONNECTION_MAX_IDLE,
+)
@@ -0,0 +1,29 @@
+import math
+
+from megazord.settings import SKILL_SYNONYMS
+
+
+def clean_term(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+SYNONYMS = {
+    clean_term(alias): clean_term(term) for alias, term in SKILL_SYNONYMS.items()
+}
+
+
+def normalize_term(text: str) -> str:
+    """
+    Form in which skill tags and vacancy keywords are matched,
+    so that `Python `, `python` and `PY` are the same term.
+    """
+    term = clean_term(text)
+    return SYNONYMS.get(term, term)
+
+
+def get_idf(documents: int, frequency: int) -> float:
+    """
+    Smoothed inverse document frequency, a term which is found in every
+    document still weighs 1 while rare terms weigh more.
+    """
+    return math.log((1 + documents) / (1 + frequency)) + 1
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from aiolimiter import AsyncLimiter
+from httpx import AsyncClient, Limits, Response, Timeout
+
+from megazord.metrics import (
+    TELEGRAM_LIMITER_WAIT,
+    TELEGRAM_RATE_LIMITED,
+    observe_notification,
+)
+from megazord.settings import (
+    NOTIFICATION_TELEGRAM_CONCURRENCY,
+    TELEGRAM_API_URL,
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_HTTP2,
+    TELEGRAM_MAX_RETRIES,
+    TELEGRAM_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# bot api allows about 30 messages per second
+limiter = AsyncLimiter(max_rate=30, time_period=1.0)
+
+
+def get_retry_after(response: Response) -> float:
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return float(response.headers.get("Retry-After", 1))
+
+
+class TelegramClient:
+    """
+    Process-wide Telegram Bot API client,
+    keeps connections to the api alive between messages.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str,
+        timeout: float,
+        max_retries: int,
+        max_connections: int,
+        http2: bool,
+    ) -> None:
+        self.token = token
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.http2 = http2
+        self._client: AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def client(self) -> AsyncClient:
+        # pooled connections are bound to the event loop they were opened in
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = AsyncClient(
+                base_url=f"{self.base_url}/bot{self.token}",
+                http2=self.http2,
+                timeout=Timeout(self.timeout),
+                limits=Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._loop = loop
+
+        return self._client
+
+    async def call(self, method: str, payload: dict[str, Any]) -> Response:
+        retries = 0
+        while True:
+            waiting_since = time.perf_counter()
+            async with limiter:
+                TELEGRAM_LIMITER_WAIT.observe(time.perf_counter() - waiting_since)
+                response = await self.client.post(f"/{method}", json=payload)
+
+            if response.status_code == 429:
+                TELEGRAM_RATE_LIMITED.inc()
+            if response.status_code != 429 or retries >= self.max_retries:
+                return response
+
+            retries += 1
+            retry_after = get_retry_after(response)
+            logger.warning(f"Too many requests. Retrying after {retry_after} seconds.")
+            await asyncio.sleep(retry_after)
+
+    async def send_message(self, chat_id: int, text: str) -> bool:
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
+        start = time.perf_counter()
+        response = await self.call("sendMessage", payload)
+        observe_notification(
+            "telegram", response.status_code == 200, time.perf_counter() - start
+        )
+
+        if response.status_code != 200:
+            logger.error(
+                f"Failed sent telegram message to `{chat_id}`: {response.text}"
+            )
+            return False
+
+        logger.info(f"Message sent successfully to `{chat_id}`")
+        return True
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+telegram = TelegramClient(
+    token=TELEGRAM_BOT_TOKEN,
+    base_url=TELEGRAM_API_URL,
+    timeout=TELEGRAM_TIMEOUT,
+    max_retries=TELEGRAM_MAX_RETRIES,
+    max_connections=NOTIFICATION_TELEGRAM_CONCURRENCY,
+    http2=TELEGRAM_HTTP2,
+)
@@ -8,7 +8,7 @@ class VacancyEntity:
     id: str
     name: str
     keywords: list[str]
-    team: TeamEntity
+    team: TeamEntity | None
 
 
 @dataclass
@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-18 20:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_keywords(apps, schema_editor):
+    VacancyTerm = apps.get_model("vacancies", "VacancyTerm")
+    keywords = apps.get_model("vacancies", "Keyword").objects.values_list(
+        "vacancy_id", "text"
+    )
+    VacancyTerm.objects.bulk_create(
+        [
+            VacancyTerm(vacancy_id=vacancy_id, term=" ".join(text.lower().split()))
+            for vacancy_id, text in keywords.iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("vacancies", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VacancyTerm",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("term", models.CharField(db_index=True, max_length=100)),
+                (
+                    "vacancy",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="terms",
+                        to="vacancies.vacancy",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("vacancy", "term")},
+            },
+        ),
+        migrations.RunPython(index_keywords, migrations.RunPython.noop),
+    ]
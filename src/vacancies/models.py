@@ -1,25 +1,41 @@
 import uuid
+from typing import Collection
 
 from django.db import models
+from django.db.models import QuerySet
 
 from accounts.models import Account
+from megazord.models import RevisionModel
 from teams.models import Team
 from vacancies.entities import ApplyEntity, VacancyEntity
 
 
-class Vacancy(models.Model):
+class Vacancy(RevisionModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=200, blank=False)
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="vacancies")
 
-    async def to_entity(self) -> VacancyEntity:
+    async def to_entity(self, expand: Collection[str] | None = None) -> VacancyEntity:
         return VacancyEntity(
             id=self.id,
             name=self.name,
             keywords=[keyword.text async for keyword in self.keywords.all()],
-            team=await self.team.to_entity(),
+            team=await self.team.to_entity()
+            if expand is None or "team" in expand
+            else None,
         )
 
+    @classmethod
+    async def to_entities(
+        cls, queryset: QuerySet["Vacancy"], expand: Collection[str] | None = None
+    ) -> list[VacancyEntity]:
+        vacancies = queryset.prefetch_related("keywords")
+        if expand is None or "team" in expand:
+            vacancies = vacancies.select_related("team__creator").prefetch_related(
+                "team__team_members"
+            )
+        return [await vacancy.to_entity(expand) async for vacancy in vacancies]
+
 
 class Keyword(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -42,3 +58,22 @@ class Apply(models.Model):
             vacancy_id=str(self.vac_id),
             who_response_id=str(self.who_responsed_id),
         )
+
+    @classmethod
+    async def to_entities(cls, queryset: QuerySet["Apply"]) -> list[ApplyEntity]:
+        # entities hold only ids of the related rows, the page is read
+        # in one query without joins
+        return [await apply.to_entity() async for apply in queryset]
+
+
+class VacancyTerm(models.Model):
+    """
+    Inverted index of vacancy keywords, maintained by signals on keyword writes.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name="terms")
+    term = models.CharField(max_length=100, db_index=True)
+
+    class Meta:
+        unique_together = (("vacancy", "term"),)
@@ -0,0 +1,81 @@
+import uuid
+
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from hackathons.models import Hackathon
+from megazord.api.caching import bump_versions, get_version_key
+from megazord.models import bump_revisions
+from utils.skills import normalize_term
+from vacancies.models import Keyword, Vacancy, VacancyTerm
+
+
+def bump_keywords_version(**lookups) -> None:
+    Hackathon.objects.filter(**lookups).update(
+        keywords_version=F("keywords_version") + 1
+    )
+
+
+def bump_team_version(**lookups) -> None:
+    """
+    Vacancies are served as a part of their team.
+    """
+    for team_id in Vacancy.objects.filter(**lookups).values_list("team_id", flat=True):
+        bump_versions(get_version_key("team", team_id))
+
+
+def index_vacancy(vacancy_id: uuid.UUID) -> None:
+    terms = {
+        normalize_term(text)
+        for text in Keyword.objects.filter(vacancy_id=vacancy_id).values_list(
+            "text", flat=True
+        )
+    }
+    VacancyTerm.objects.filter(vacancy_id=vacancy_id).exclude(term__in=terms).delete()
+    VacancyTerm.objects.bulk_create(
+        [VacancyTerm(vacancy_id=vacancy_id, term=term) for term in terms],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(post_save, sender=Keyword)
+def keyword_saved(sender, instance, created, **kwargs):
+    if created:
+        VacancyTerm.objects.bulk_create(
+            [
+                VacancyTerm(
+                    vacancy_id=instance.vacancy_id, term=normalize_term(instance.text)
+                )
+            ],
+            ignore_conflicts=True,
+        )
+    else:
+        index_vacancy(instance.vacancy_id)
+    bump_keywords_version(team__vacancies__id=instance.vacancy_id)
+    bump_team_version(id=instance.vacancy_id)
+    bump_revisions(Vacancy.objects.filter(id=instance.vacancy_id))
+
+
+@receiver(post_delete, sender=Keyword)
+def keyword_deleted(sender, instance, origin, **kwargs):
+    # terms are deleted together with the vacancy
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model is Keyword:
+        index_vacancy(instance.vacancy_id)
+        bump_keywords_version(team__vacancies__id=instance.vacancy_id)
+        bump_team_version(id=instance.vacancy_id)
+        bump_revisions(Vacancy.objects.filter(id=instance.vacancy_id))
+
+
+@receiver(post_save, sender=Vacancy)
+def vacancy_saved(sender, instance, created, **kwargs):
+    if created:
+        bump_keywords_version(team__id=instance.team_id)
+    bump_versions(get_version_key("team", instance.team_id))
+
+
+@receiver(post_delete, sender=Vacancy)
+def vacancy_deleted(sender, instance, **kwargs):
+    bump_keywords_version(team__id=instance.team_id)
+    bump_versions(get_version_key("team", instance.team_id))
@@ -0,0 +1,58 @@
+import os
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterator
+
+import django
+import pytest
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "query_budget(queries, duplicates=None): fail the test when it makes "
+        "more queries, or repeats a query more times, than allowed",
+    )
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "megazord.settings")
+    django.setup()
+
+
+def check_query_budget(query_log, queries: int, duplicates: int | None = None) -> None:
+    assert query_log.count <= queries, (
+        f"{query_log.count} queries made, budget is {queries}:\n"
+        + "\n".join(
+            f"{count} x {sql}" for sql, count in query_log.fingerprints.most_common()
+        )
+    )
+    if duplicates is not None:
+        repeated = query_log.get_duplicates(duplicates + 1)
+        assert not repeated, f"Queries repeated over {duplicates} times: {repeated}"
+
+
+@contextmanager
+def assert_query_budget(queries: int, duplicates: int | None = None) -> Iterator:
+    from megazord.queries import log_queries
+
+    with log_queries() as query_log:
+        yield query_log
+
+    check_query_budget(query_log, queries, duplicates)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    with assert_query_budget(*marker.args, **marker.kwargs):
+        return (yield)
+
+
+@pytest.fixture
+def query_budget() -> Callable[..., ContextManager]:
+    """
+    `with query_budget(5, duplicates=1):` fails when the block
+    makes more than five queries or repeats any of them.
+    """
+    return assert_query_budget
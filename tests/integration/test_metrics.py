@@ -0,0 +1,62 @@
+from django.http import HttpResponse
+from django.test import RequestFactory
+from prometheus_client import REGISTRY
+
+from megazord.metrics import metrics_view
+from megazord.middlewares import MetricsMiddleware, QueryBudgetMiddleware
+from megazord.queries import record_query
+
+
+def view(request) -> HttpResponse:
+    assert (
+        REGISTRY.get_sample_value("megazord_requests_in_progress") == 1
+    ), "request is not counted as in progress"
+    record_query(lambda *args: None, "SELECT 1", (), False, {})
+    return HttpResponse(status=201)
+
+
+def get_sample(name: str, labels: dict[str, str]) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_measured():
+    labels = {"operation": "unmatched", "method": "GET", "status": "201"}
+    requests = get_sample("megazord_request_duration_seconds_count", labels)
+    queries = get_sample("megazord_db_queries_sum", {"operation": "unmatched"})
+    middleware = MetricsMiddleware(QueryBudgetMiddleware(view))
+
+    middleware(RequestFactory().get("/unknown"))
+
+    assert get_sample("megazord_request_duration_seconds_count", labels) == (
+        requests + 1
+    )
+    assert get_sample("megazord_db_queries_sum", {"operation": "unmatched"}) == (
+        queries + 1
+    )
+    assert REGISTRY.get_sample_value("megazord_requests_in_progress") == 0
+
+
+async def test_async_requests_are_measured():
+    labels = {"operation": "unmatched", "method": "GET", "status": "201"}
+    requests = get_sample("megazord_request_duration_seconds_count", labels)
+
+    async def async_view(request) -> HttpResponse:
+        return view(request)
+
+    middleware = MetricsMiddleware(async_view)
+    response = await middleware(RequestFactory().get("/unknown"))
+
+    assert response.status_code == 201
+    assert get_sample("megazord_request_duration_seconds_count", labels) == (
+        requests + 1
+    )
+    assert REGISTRY.get_sample_value("megazord_requests_in_progress") == 0
+
+
+def test_metrics_view():
+    response = metrics_view(RequestFactory().get("/metrics"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    assert b"megazord_request_duration_seconds" in response.content
+    assert b"megazord_telegram_limiter_wait_seconds" in response.content
@@ -0,0 +1,104 @@
+import logging
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from megazord import middlewares
+from megazord.middlewares import QueryBudgetExceeded, QueryBudgetMiddleware
+from megazord.queries import fingerprint, log_queries, record_query
+
+
+def run_query(sql: str) -> None:
+    record_query(lambda *args: None, sql, (), False, {})
+
+
+def make_view(queries: int):
+    def view(request) -> HttpResponse:
+        for i in range(queries):
+            run_query(f'SELECT * FROM "teams_team" WHERE "id" = {i}')
+        return HttpResponse()
+
+    return view
+
+
+def test_fingerprint_ignores_parameters():
+    assert fingerprint(
+        'SELECT * FROM "t0" WHERE "id" IN (%s, %s, %s) AND "name" = \'a\''
+    ) == fingerprint('SELECT * FROM "t0" WHERE "id" IN (%s)  AND "name" = %s')
+
+
+def test_queries_are_logged_only_inside_context():
+    run_query("SELECT 1")
+    with log_queries() as query_log:
+        run_query("SELECT 1")
+        run_query("SELECT 2")
+
+    assert query_log.count == 2
+    assert query_log.get_duplicates() == {"SELECT ?": 2}
+
+
+def test_middleware_reports_queries(caplog: pytest.LogCaptureFixture):
+    middleware = QueryBudgetMiddleware(make_view(3))
+
+    with caplog.at_level(logging.WARNING):
+        response = middleware(RequestFactory().get("/api/v1/teams/"))
+
+    assert response["Server-Timing"].startswith("db;dur=")
+    assert 'desc="3 queries"' in response["Server-Timing"]
+    assert not caplog.records
+
+
+async def test_async_middleware_reports_queries():
+    view = make_view(2)
+
+    async def async_view(request) -> HttpResponse:
+        run_query("SELECT 1")
+        return await sync_to_async(view)(request)
+
+    middleware = QueryBudgetMiddleware(async_view)
+    response = await middleware(RequestFactory().get("/api/v1/teams/"))
+
+    assert 'desc="3 queries"' in response["Server-Timing"]
+
+
+def test_middleware_warns_over_budget(
+    caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(middlewares, "QUERY_BUDGET", 2)
+    monkeypatch.setattr(middlewares, "QUERY_DUPLICATES_THRESHOLD", 3)
+    middleware = QueryBudgetMiddleware(make_view(3))
+
+    with caplog.at_level(logging.WARNING):
+        middleware(RequestFactory().get("/api/v1/teams/"))
+
+    [record] = caplog.records
+    assert record.queries == 3
+    assert record.query_budget == 2
+    assert record.duplicate_queries == {'SELECT * FROM "teams_team" WHERE "id" = ?': 3}
+
+
+def test_middleware_fails_over_budget(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(middlewares, "QUERY_BUDGET", 2)
+    monkeypatch.setattr(middlewares, "QUERY_BUDGET_FAIL", True)
+    middleware = QueryBudgetMiddleware(make_view(3))
+
+    with pytest.raises(QueryBudgetExceeded):
+        middleware(RequestFactory().get("/api/v1/teams/"))
+
+
+@pytest.mark.query_budget(2)
+def test_query_budget_marker():
+    run_query("SELECT 1")
+    run_query("SELECT 2")
+
+
+def test_query_budget_fixture(query_budget):
+    with pytest.raises(AssertionError, match="3 queries made, budget is 2"):
+        with query_budget(2):
+            make_view(3)(None)
+
+    with pytest.raises(AssertionError, match="repeated over 1 times"):
+        with query_budget(5, duplicates=1):
+            make_view(2)(None)
@@ -0,0 +1,41 @@
+import pytest
+from asgiref.sync import async_to_sync
+from ninja.testing import TestAsyncClient
+
+from accounts.models import Account
+from hackathons.models import Hackathon
+from teams.api import team_router
+from teams.models import Team
+from vacancies.models import Apply, Vacancy
+
+
+def create_account(name: str) -> Account:
+    return Account.objects.create_user(
+        email=f"{name}@example.org",
+        username=name,
+        is_organizator=False,
+        password="test",
+    )
+
+
+@pytest.mark.django_db
+def test_team_applies_queries_do_not_grow(query_budget):
+    creator = create_account("creator")
+    hackathon = Hackathon.objects.create(
+        creator=creator, name="test", description="test"
+    )
+    team = Team.objects.create(hackathon=hackathon, name="team", creator=creator)
+    vacancy = Vacancy.objects.create(team=team, name="backend")
+    for i in range(5):
+        Apply.objects.create(
+            team=team, vac=vacancy, who_responsed=create_account(f"user_{i}")
+        )
+
+    # the team, keys of the page and the page itself
+    with query_budget(3, duplicates=1):
+        response = async_to_sync(TestAsyncClient(team_router).get)(
+            f"/get_applies_for_team?team_id={team.id}", user=creator
+        )
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5